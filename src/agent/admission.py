@@ -0,0 +1,149 @@
+import asyncio
+from collections import deque
+from collections.abc import Callable
+from enum import Enum
+
+from settings import admission_settings
+
+
+class RejectionReasonEnum(Enum):
+    actor_limit = "actor_limit"
+    queue_full = "queue_full"
+    queue_timeout = "queue_timeout"
+
+
+class AdmissionRejectedError(Exception):
+    """Raised when an invocation is not admitted; maps to 429 with ``Retry-After``."""
+
+    def __init__(self, reason: RejectionReasonEnum, retry_after: int):
+        super().__init__(f"Invocation rejected: {reason.value}")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class Admission:
+    """Slot held by an admitted invocation; ``release`` is idempotent."""
+
+    def __init__(self, actor_id: str, release: Callable[[str], None]):
+        self.actor_id = actor_id
+        self._release = release
+        self.released = False
+
+    def release(self) -> None:
+        if not self.released:
+            self.released = True
+            self._release(self.actor_id)
+
+
+class AdmissionController:
+    """
+    Limits the invocations running at once, globally and per actor.
+
+    Up to ``max_in_flight`` invocations run; further ones wait in a FIFO
+    queue of at most ``max_queue`` for up to ``queue_timeout`` seconds. An
+    actor may have at most ``max_per_actor`` invocations running or queued.
+    Anything over those limits is rejected at once, so overload turns into
+    fast 429s instead of slower answers for everyone. All state is touched
+    only from the event loop, so no locks are needed.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = 32,
+        max_per_actor: int = 4,
+        max_queue: int = 64,
+        queue_timeout: float = 5.0,
+        retry_after: int = 5,
+    ):
+        self.max_in_flight = max_in_flight
+        self.max_per_actor = max_per_actor
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+
+        self.in_flight = 0
+        self._actors: dict[str, int] = {}
+        self._waiters: deque[asyncio.Future] = deque()
+
+        self.admitted = 0
+        self.rejected = {reason: 0 for reason in RejectionReasonEnum}
+
+    def _reject(self, reason: RejectionReasonEnum) -> AdmissionRejectedError:
+        self.rejected[reason] += 1
+        return AdmissionRejectedError(reason, self.retry_after)
+
+    def _leave(self, actor_id: str) -> None:
+        count = self._actors[actor_id] - 1
+        if count:
+            self._actors[actor_id] = count
+        else:
+            del self._actors[actor_id]
+
+    async def acquire(self, actor_id: str) -> Admission:
+        """Wait for a slot for ``actor_id``; raises ``AdmissionRejectedError`` when over a limit."""
+        if self._actors.get(actor_id, 0) >= self.max_per_actor:
+            raise self._reject(RejectionReasonEnum.actor_limit)
+
+        if self.in_flight < self.max_in_flight and not self._waiters:
+            self.in_flight += 1
+            self._actors[actor_id] = self._actors.get(actor_id, 0) + 1
+        elif len(self._waiters) >= self.max_queue:
+            raise self._reject(RejectionReasonEnum.queue_full)
+        else:
+            await self._wait(actor_id)
+        self.admitted += 1
+        return Admission(actor_id, self._release)
+
+    async def _wait(self, actor_id: str) -> None:
+        # 待っている間も actor の上限に数える
+        self._actors[actor_id] = self._actors.get(actor_id, 0) + 1
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            # 枠は _release_slot から in_flight を数えたまま引き渡される
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except BaseException as e:
+            self._leave(actor_id)
+            if waiter.done() and not waiter.cancelled():
+                # 枠を受け取った直後にタイムアウトやキャンセルになった場合は次に回す
+                self._release_slot()
+            if isinstance(e, TimeoutError):
+                raise self._reject(RejectionReasonEnum.queue_timeout) from None
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+    def _release_slot(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def _release(self, actor_id: str) -> None:
+        self._leave(actor_id)
+        self._release_slot()
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "queued": len(self._waiters),
+            "actors": len(self._actors),
+            "admitted": self.admitted,
+            **{
+                f"rejected_{reason.value}": count
+                for reason, count in self.rejected.items()
+            },
+        }
+
+
+admission_controller = AdmissionController(
+    max_in_flight=admission_settings.admission_max_in_flight,
+    max_per_actor=admission_settings.admission_max_per_actor,
+    max_queue=admission_settings.admission_max_queue,
+    queue_timeout=admission_settings.admission_queue_timeout,
+    retry_after=admission_settings.admission_retry_after,
+)
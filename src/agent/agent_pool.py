@@ -0,0 +1,191 @@
+import asyncio
+import threading
+from collections import deque
+from collections.abc import AsyncIterator, Callable, Iterator
+from concurrent.futures import Future
+from contextlib import asynccontextmanager, contextmanager
+
+from strands import Agent
+from strands.agent.state import AgentState
+from strands.telemetry.metrics import EventLoopMetrics
+from utils import logger
+
+
+class AgentPoolTimeoutError(Exception):
+    """Raised when no pooled agent becomes available within the checkout timeout."""
+
+
+def reset_agent(agent: Agent) -> None:
+    """Drop the per-invocation state an agent accumulates between calls."""
+    agent.messages = []
+    agent.state = AgentState()
+    agent.event_loop_metrics = EventLoopMetrics()
+    if hasattr(agent.conversation_manager, "removed_message_count"):
+        agent.conversation_manager.removed_message_count = 0
+
+
+class AgentPool:
+    """
+    Bounded pool of reusable agent instances for a single sub-agent type.
+
+    Agents are created by ``factory`` on demand up to ``max_size`` and handed out
+    exclusively, so concurrent callers never share one stateful ``Agent``.
+    Every checkout starts from an empty conversation. ``prewarm`` agents are
+    created by :meth:`warm`, not by the constructor, so building a pool is cheap.
+
+    Callers waiting for an agent queue up in FIFO order on a future each, which
+    sync callers block on and async callers await without holding a thread. A
+    waiter that gives up (timeout or cancellation) is withdrawn under the lock,
+    and an agent handed to it in the meantime goes back to the pool.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        factory: Callable[[], Agent],
+        max_size: int,
+        prewarm: int = 0,
+        checkout_timeout: float = 30.0,
+    ):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+
+        self.name = name
+        self.max_size = max_size
+        self.checkout_timeout = checkout_timeout
+        self._factory = factory
+        self._idle: list[Agent] = []
+        # 結果は貸し出す Agent、または新しく作ってよい枠を表す None
+        self._waiters: deque[Future[Agent | None]] = deque()
+        self._lock = threading.Lock()
+        self._created = 0
+        self.prewarm = min(prewarm, max_size)
+
+    def warm(self) -> None:
+        """Create agents until ``prewarm`` of them exist (blocking)."""
+        while self._created < self.prewarm and self._reserve_slot():
+            self._hand_over(self._create())
+
+    def _reserve_slot(self) -> bool:
+        with self._lock:
+            if self._created >= self.max_size:
+                return False
+            self._created += 1
+            return True
+
+    def _create(self) -> Agent:
+        logger.info(
+            f"Creating pooled agent: {self.name}",
+            extra={"agent": self.name, "pool_size": self._created},
+        )
+        try:
+            return self._factory()
+        except Exception:
+            # 確保した枠は待っている呼び出しに譲る
+            self._hand_over(None)
+            raise
+
+    def _claim(self) -> Future[Agent | None]:
+        """Return a future for an idle agent, a free slot (``None``) or a queued wait."""
+        waiter: Future[Agent | None] = Future()
+        with self._lock:
+            if self._idle:
+                waiter.set_result(self._idle.pop())
+            elif self._created < self.max_size:
+                self._created += 1
+                waiter.set_result(None)
+            else:
+                self._waiters.append(waiter)
+        return waiter
+
+    def _hand_over(self, agent: Agent | None) -> None:
+        """Give ``agent`` (or a free slot) to the oldest waiter still waiting."""
+        with self._lock:
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                if waiter.set_running_or_notify_cancel():
+                    waiter.set_result(agent)
+                    return
+            if agent is None:
+                self._created -= 1
+            else:
+                self._idle.append(agent)
+
+    def _abandon(self, waiter: Future[Agent | None]) -> None:
+        with self._lock:
+            if waiter.cancel():
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                return
+        # 諦める前に受け取っていた Agent（または枠）は次に回す
+        self._hand_over(waiter.result())
+
+    def _timeout_error(self) -> AgentPoolTimeoutError:
+        return AgentPoolTimeoutError(
+            f"No {self.name} available within {self.checkout_timeout}s"
+        )
+
+    @contextmanager
+    def checkout(self) -> Iterator[Agent]:
+        """Borrow a freshly reset agent for the duration of the ``with`` block."""
+        waiter = self._claim()
+        try:
+            agent = waiter.result(timeout=self.checkout_timeout)
+        except TimeoutError as e:
+            self._abandon(waiter)
+            raise self._timeout_error() from e
+        if agent is None:
+            agent = self._create()
+        reset_agent(agent)
+        try:
+            yield agent
+        finally:
+            self._hand_over(agent)
+
+    async def _acreate(self) -> Agent:
+        # 作成中に呼び出し元がキャンセルされても、作られた Agent はプールに戻す
+        creating = asyncio.ensure_future(asyncio.to_thread(self._create))
+        try:
+            return await asyncio.shield(creating)
+        except asyncio.CancelledError:
+            creating.add_done_callback(self._return_created)
+            raise
+
+    def _return_created(self, task: asyncio.Future[Agent]) -> None:
+        if not task.cancelled() and task.exception() is None:
+            self._hand_over(task.result())
+
+    @asynccontextmanager
+    async def acheckout(self) -> AsyncIterator[Agent]:
+        """Async variant of :meth:`checkout` that waits without blocking the event loop."""
+        waiter = self._claim()
+        try:
+            async with asyncio.timeout(self.checkout_timeout):
+                agent = await asyncio.wrap_future(waiter)
+        except TimeoutError as e:
+            self._abandon(waiter)
+            raise self._timeout_error() from e
+        except BaseException:
+            self._abandon(waiter)
+            raise
+        if agent is None:
+            agent = await self._acreate()
+        reset_agent(agent)
+        try:
+            yield agent
+        finally:
+            self._hand_over(agent)
+
+    def stats(self) -> dict:
+        """Return the current pool occupancy."""
+        # 貸し出しと返却はワーカースレッドからも行われるため、一貫した値をロックの中で読む
+        with self._lock:
+            created = self._created
+            idle = len(self._idle)
+        return {
+            "name": self.name,
+            "size": created,
+            "idle": idle,
+            "in_use": created - idle,
+            "max_size": self.max_size,
+        }
@@ -0,0 +1,102 @@
+import inspect
+from typing import Any
+
+from strands import Agent
+from strands.models import Model
+from strands.tools.registry import ToolRegistry
+from strands.types.content import SystemContentBlock
+
+
+class _TemplateTools:
+    """
+    The template's tools with their tool config normalized and validated once.
+
+    ``ToolRegistry.get_all_tools_config`` re-normalizes and re-validates every
+    tool spec on each model call. The template's tools never change after
+    startup, so the result is computed once and shared by the registries of
+    every agent created from the template.
+    """
+
+    def __init__(self, tools: list[Any]):
+        registry = ToolRegistry()
+        registry.process_tools(tools)
+        registry.initialize_tools()
+        if registry._tool_providers:
+            # プロバイダー（MCP クライアント）はエージェントごとに利用者登録が必要なため共有できない
+            raise ValueError(
+                "Tool providers cannot be shared through an agent template"
+            )
+        self.tools = dict(registry.registry)
+        self.dynamic_tools = dict(registry.dynamic_tools)
+        self.tools_config = registry.get_all_tools_config()
+
+
+class _TemplateToolRegistry(ToolRegistry):
+    """
+    Per-agent registry of the template's tools that reuses their cached config.
+
+    Each agent gets its own registry, so tools registered at runtime (e.g. the
+    structured output tool) stay on that agent; the shared config is used
+    while the agent's tools are still exactly the template's.
+    """
+
+    def __init__(self, template_tools: _TemplateTools):
+        super().__init__()
+        self.registry = dict(template_tools.tools)
+        self.dynamic_tools = dict(template_tools.dynamic_tools)
+        self._template_tools = template_tools
+
+    def get_all_tools_config(self) -> dict[str, Any]:
+        template_tools = self._template_tools
+        if (
+            self.registry == template_tools.tools
+            and self.dynamic_tools == template_tools.dynamic_tools
+        ):
+            return dict(template_tools.tools_config)
+        return super().get_all_tools_config()
+
+
+def _normalize_system_prompt(
+    system_prompt: str | list[SystemContentBlock],
+) -> str | list[SystemContentBlock]:
+    """Strip the indentation of a triple-quoted prompt (text blocks of a block list too)."""
+    if isinstance(system_prompt, str):
+        return inspect.cleandoc(system_prompt)
+    return [
+        {**block, "text": inspect.cleandoc(block["text"])} if "text" in block else block
+        for block in system_prompt
+    ]
+
+
+class AgentTemplate:
+    """
+    The static parts of an agent, built once and shared by the agents it creates.
+
+    The tools (with their validated tool specs), the normalized system prompt
+    and the model are prepared at startup; ``create`` only binds the
+    per-request parts such as the session and conversation managers and a
+    tool registry of the agent's own.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        model: Model,
+        tools: list[Any],
+        system_prompt: str | list[SystemContentBlock],
+    ):
+        self.name = name
+        self.model = model
+        self.system_prompt = _normalize_system_prompt(system_prompt)
+        self.tools = _TemplateTools(tools)
+
+    def create(self, **kwargs: Any) -> Agent:
+        """Create an agent from the template; ``kwargs`` are passed to ``Agent``."""
+        agent = Agent(
+            name=self.name,
+            model=self.model,
+            system_prompt=self.system_prompt,
+            **kwargs,
+        )
+        agent.tool_registry = _TemplateToolRegistry(self.tools)
+        return agent
@@ -1,41 +1,122 @@
+from functools import cache
+
 import boto3
-import feedparser
-import requests
+import httpx
+from botocore.config import Config
+from clients import get_http_client, run_blocking
+from geocoding import GeocodeCache
 from geopy.geocoders import Nominatim
+from kb_cache import KnowledgeBaseCache, cache_key
 from mcp.client.streamable_http import streamable_http_client
-from models import RssItem
+from mcp_sessions import (
+    ManagedMcpClient,
+    mcp_session_manager,
+    register_mcp_dependency,
+)
+from models import KnowledgeBaseResponse, RssItem, WeatherReport
+from resilience import DependencyUnavailableError, dependencies
+from rss_feed import RssFeedCache
 from settings import (
     aws_rss_settings,
     estate_knowledge_base_settings,
     knowledge_base_settings,
+    mcp_settings,
     tavily_settings,
+    weather_settings,
 )
 from strands import tool
-from strands.tools.mcp import MCPClient
 from tavily import TavilyClient
+from timings import span
 from utils import logger
 
-tavily_client = TavilyClient(api_key=tavily_settings.tavily_api_key)
-tavily_mcp_client = MCPClient(
+# 外部依存ごとの期限・再試行・サーキットブレーカー（既定値は ResilienceSettings）
+weather_api = dependencies.register("weather_api")
+# Nominatim は1リクエスト/秒の制限があるため再試行しない
+geocoder = dependencies.register("geocoder", max_attempts=1)
+# retrieve_and_generate は回答生成を含むため長めにとる
+knowledge_base = dependencies.register("knowledge_base", timeout=30.0)
+aws_rss = dependencies.register("aws_rss", timeout=aws_rss_settings.rss_feed_timeout)
+
+
+# 依存クライアントは初回利用時に生成する（import 時に Secrets Manager や AWS へアクセスしない）
+@cache
+def get_tavily_client() -> TavilyClient:
+    return TavilyClient(api_key=tavily_settings.tavily_api_key)
+
+
+@cache
+def get_kb_client():
+    # 再試行は knowledge_base が予算の範囲で行うため boto3 側では再試行しない
+    return boto3.client(
+        "bedrock-agent-runtime",
+        config=Config(
+            read_timeout=knowledge_base.timeout,
+            retries={"mode": "standard", "max_attempts": 1},
+        ),
+    )
+
+
+@cache
+def get_geolocator() -> Nominatim:
+    return Nominatim(
+        user_agent=weather_settings.geocoder_user_agent,
+        timeout=weather_settings.geocoder_timeout,
+    )
+
+
+# MCP セッションは起動時に開いて使い回す（mcp_session_manager がヘルスチェックと再接続を行う）
+tavily_mcp_client = mcp_session_manager.register(
+    "tavily",
     lambda: streamable_http_client(
         f"https://mcp.tavily.com/mcp/?tavilyApiKey={tavily_settings.tavily_api_key}"
-    )
+    ),
+    startup_timeout=mcp_settings.mcp_startup_timeout,
 )
 
-goverment_mcp_client = MCPClient(
+goverment_mcp_client = mcp_session_manager.register(
+    "goverment",
     lambda: streamable_http_client(
         "https://mcp.n-3.ai/mcp?tools=e-stat-get-stats-list,e-stat-get-meta-info,e-stat-get-data-catalog"
-    )
+    ),
+    startup_timeout=mcp_settings.mcp_startup_timeout,
 )
 
-real_estate_mcp_client = MCPClient(
+# 現在どのエージェントも使っていないため起動時には接続しない（最初に使われた時に接続する）
+real_estate_mcp_client = ManagedMcpClient(
+    "real_estate",
     lambda: streamable_http_client(
         "https://mcp.n-3.ai/mcp?tools=get-time,reinfolib-real-estate-price,reinfolib-city-list"
-    )
+    ),
+    startup_timeout=mcp_settings.mcp_startup_timeout,
+    dependency=register_mcp_dependency("real_estate"),
 )
 
-kb_client = boto3.client("bedrock-agent-runtime")
-geolocator = Nominatim(user_agent="time-weather-agent", timeout=10)
+aws_rss_feed_cache = RssFeedCache(
+    urls=aws_rss_settings.rss_urls,
+    refresh_interval=aws_rss_settings.rss_refresh_interval,
+    timeout=aws_rss_settings.rss_feed_timeout,
+    dependency=aws_rss,
+)
+
+kb_response_cache = KnowledgeBaseCache(
+    max_entries=knowledge_base_settings.kb_cache_size,
+    ttl=knowledge_base_settings.kb_cache_ttl,
+    similarity_threshold=knowledge_base_settings.kb_similarity_threshold,
+)
+estate_kb_response_cache = KnowledgeBaseCache(
+    max_entries=estate_knowledge_base_settings.estate_kb_cache_size,
+    ttl=estate_knowledge_base_settings.estate_kb_cache_ttl,
+    similarity_threshold=estate_knowledge_base_settings.estate_kb_similarity_threshold,
+)
+geocode_cache = GeocodeCache(
+    geocode=lambda location: get_geolocator().geocode(location),
+    max_entries=weather_settings.geocode_cache_size,
+    ttl=weather_settings.geocode_cache_ttl,
+    negative_ttl=weather_settings.geocode_negative_ttl,
+    db_path=weather_settings.geocode_cache_path,
+    min_interval=weather_settings.geocoder_min_interval,
+    dependency=geocoder,
+)
 
 
 # @tool
@@ -51,51 +132,39 @@ geolocator = Nominatim(user_agent="time-weather-agent", timeout=10)
 #     """
 #     logger.info(f"Performing web search for query: {query}", extra={"query": query, "tool": "web_search"})
 #     # result = tavily_search(query,search_depth='advanced',topic='news',max_results=10)
-#     result = tavily_client.search(query)
+#     result = get_tavily_client().search(query)
 #     return result
 
 
-def _check_keyword_in_rss_entry(rss_item: RssItem, keyword: str) -> bool:
-    """Check if the keyword is present in the RSS entry's title or summary."""
-    keyword_lower = keyword.lower()
-    title = rss_item.title.lower()
-    summary = rss_item.summary.lower()
-    return keyword_lower in title or keyword_lower in summary
-
-
 @tool
-def get_aws_rss_feed(
-    keyword: str = "AWS", max_items: int = aws_rss_settings.rss_default_items
+async def get_aws_rss_feed(
+    keyword: str = "AWS",
+    max_items: int = aws_rss_settings.rss_default_items,
+    match_all: bool = True,
 ) -> list[RssItem]:
-    """Fetch and parse AWS-related RSS feed items based on a keyword.
+    """Fetch and parse AWS-related RSS feed items based on keywords.
     Args:
-        keyword: The keyword to filter RSS feed items
+        keyword: Keywords to filter RSS feed items, separated by spaces
         max_items: The maximum number of items to return
+        match_all: True to return items containing every keyword, False for any keyword
     Returns:
-        A list of RSS feed items matching the keyword
+        A list of RSS feed items matching the keywords, newest first
     """
     logger.info(
         f"Fetching AWS RSS feed for keyword: {keyword}",
         extra={"keyword": keyword, "max_items": max_items, "tool": "get_aws_rss_feed"},
     )
 
-    feed = feedparser.parse(aws_rss_settings.rss_url)
+    with span("rss_feed"):
+        rss_index = await aws_rss_feed_cache.get_index()
     logger.info(
-        f"Fetched {len(feed.entries)} entries from RSS feed",
+        f"Fetched {len(rss_index)} entries from RSS feed",
         extra={"tool": "get_aws_rss_feed"},
     )
 
     max_items = min(max_items, aws_rss_settings.rss_max_items)
 
-    result_items: list[RssItem] = []
-
-    for entry in feed.entries:
-        if len(result_items) >= max_items:
-            break
-
-        rss_item = RssItem.from_entry(entry)
-        if _check_keyword_in_rss_entry(rss_item, keyword):
-            result_items.append(rss_item)
+    result_items = rss_index.search(keyword, max_items, match_all=match_all)
 
     logger.info(
         f"Returning {len(result_items)} items matching keyword: {keyword}",
@@ -109,57 +178,198 @@ def get_aws_rss_feed(
     return result_items
 
 
-@tool
-def get_weather(location: str) -> str:
-    """Get the current weather for a location.
+WEATHER_CODES = {
+    0: "Clear sky",
+    1: "Mainly clear",
+    2: "Partly cloudy",
+    3: "Overcast",
+    45: "Fog",
+    48: "Depositing rime fog",
+    51: "Light drizzle",
+    53: "Moderate drizzle",
+    55: "Dense drizzle",
+    61: "Light rain",
+    63: "Moderate rain",
+    65: "Heavy rain",
+    71: "Light snow",
+    73: "Moderate snow",
+    75: "Heavy snow",
+    95: "Thunderstorm",
+}
+
+
+async def _get_forecast(lat: float, lon: float) -> httpx.Response:
+    response = await get_http_client().get(
+        weather_settings.weather_api_url,
+        params={
+            "latitude": lat,
+            "longitude": lon,
+            "current": "temperature_2m,weather_code",
+            "timezone": "auto",
+        },
+    )
+    # 429 と 5xx は一時的な障害として再試行する
+    if response.status_code == 429 or response.status_code >= 500:
+        response.raise_for_status()
+    return response
 
-    Args:
-        location: The city or location name to get the weather for
-    """
+
+async def fetch_weather_report(location: str) -> WeatherReport:
+    """Look up the current weather for ``location``; failures are reported in ``status``."""
     try:
-        location_data = geolocator.geocode(location)
+        with span("geocode"):
+            location_data = await geocode_cache.lookup(location)
         if not location_data:
-            return "Location not found"
+            return WeatherReport(location=location, status="location_not_found")
 
         lat, lon = location_data.latitude, location_data.longitude
-        url = f"https://api.open-meteo.com/v1/forecast?latitude={lat}&longitude={lon}&current=temperature_2m,weather_code&timezone=auto"
-        response = requests.get(url)
+        with span("weather_api"):
+            response = await weather_api.call(lambda: _get_forecast(lat, lon))
 
         if response.status_code == 200:
             data = response.json()
-            temp = data.get("current", {}).get("temperature_2m", "N/A")
-            code = data.get("current", {}).get("weather_code", "N/A")
-
-            weather_codes = {
-                0: "Clear sky",
-                1: "Mainly clear",
-                2: "Partly cloudy",
-                3: "Overcast",
-                45: "Fog",
-                48: "Depositing rime fog",
-                51: "Light drizzle",
-                53: "Moderate drizzle",
-                55: "Dense drizzle",
-                61: "Light rain",
-                63: "Moderate rain",
-                65: "Heavy rain",
-                71: "Light snow",
-                73: "Moderate snow",
-                75: "Heavy snow",
-                95: "Thunderstorm",
-            }
-            weather_desc = weather_codes.get(code, f"Unknown (code {code})")
-
-            return f"{weather_desc}, {temp}°C"
+            temp = data.get("current", {}).get("temperature_2m")
+            code = data.get("current", {}).get("weather_code")
+            unknown = f"Unknown (code {'N/A' if code is None else code})"
+            return WeatherReport(
+                location=location,
+                status="ok",
+                weather=WEATHER_CODES.get(code, unknown),
+                weather_code=code,
+                temperature_c=temp,
+            )
+
+        return WeatherReport(location=location, status="unavailable")
+    except DependencyUnavailableError as e:
+        logger.warning(str(e), extra={"dependency": e.name, "reason": e.reason})
+        return WeatherReport(location=location, status="unavailable")
+    except Exception:
+        logger.exception("Weather lookup failed", extra={"location": location})
+        return WeatherReport(location=location, status="error")
 
+
+@tool
+async def get_weather(location: str) -> str:
+    """Get the current weather for a location.
+
+    Args:
+        location: The city or location name to get the weather for
+    """
+    report = await fetch_weather_report(location)
+    if report.status == "location_not_found":
+        return "Location not found"
+    if report.status == "unavailable":
         return "Weather data currently unavailable"
-    except Exception as e:
-        print(f"Weather error: {e}")
+    if report.status == "error":
         return "Weather service is currently unavailable"
+    temp = "N/A" if report.temperature_c is None else report.temperature_c
+    return f"{report.weather}, {temp}°C"
+
+
+async def _retrieve_and_generate(
+    text: str, knowledge_base_id: str, model_arn: str, number_of_results: int
+) -> KnowledgeBaseResponse:
+    response = await knowledge_base.call(
+        lambda: run_blocking(
+            get_kb_client().retrieve_and_generate,
+            input={"text": text},
+            retrieveAndGenerateConfiguration={
+                "type": "KNOWLEDGE_BASE",
+                "knowledgeBaseConfiguration": {
+                    "knowledgeBaseId": knowledge_base_id,  # ナレッジベースID
+                    "modelArn": model_arn,  # 回答を行うモデルのARN（詳細は補足に記載）
+                    "retrievalConfiguration": {
+                        "vectorSearchConfiguration": {
+                            "numberOfResults": number_of_results,  # ナレッジベースから取得する関連情報の数
+                        }
+                    },
+                },
+            },
+        )
+    )
+    return KnowledgeBaseResponse(
+        text=response["output"]["text"], citations=response["citations"]
+    )
+
+
+def _format_retrieval_results(results: list[dict]) -> str:
+    """Render ``retrieve`` results as ranked chunks with their source and metadata."""
+    chunks = []
+    for rank, result in enumerate(results, start=1):
+        metadata = result.get("metadata", {})
+        header = f"[{rank}] score={result.get('score', 0):.3f}"
+        source = metadata.get("x-amz-bedrock-kb-source-uri")
+        if source:
+            header += f" source={source}"
+        # Data ID などのユーザー定義メタデータはそのまま残す
+        lines = [header]
+        lines.extend(
+            f"{key}: {value}"
+            for key, value in metadata.items()
+            if not key.startswith("x-amz-bedrock-kb-")
+        )
+        lines.append(result["content"]["text"])
+        chunks.append("\n".join(lines))
+    return "\n\n".join(chunks)
+
+
+async def _retrieve(
+    text: str, knowledge_base_id: str, number_of_results: int
+) -> KnowledgeBaseResponse:
+    response = await knowledge_base.call(
+        lambda: run_blocking(
+            get_kb_client().retrieve,
+            knowledgeBaseId=knowledge_base_id,
+            retrievalQuery={"text": text},
+            retrievalConfiguration={
+                "vectorSearchConfiguration": {"numberOfResults": number_of_results}
+            },
+        )
+    )
+    results = response["retrievalResults"]
+    return KnowledgeBaseResponse(
+        text=_format_retrieval_results(results), citations=results
+    )
+
+
+KNOWLEDGE_BASE_UNAVAILABLE = (
+    "The knowledge base is temporarily unavailable. "
+    "Answer from general knowledge and say that it could not be consulted."
+)
+
+
+async def _query_knowledge_base(
+    cache: KnowledgeBaseCache,
+    text: str,
+    mode: str,
+    knowledge_base_id: str,
+    model_arn: str,
+    number_of_results: int,
+) -> KnowledgeBaseResponse:
+    # キャッシュヒットも含めてツールが待った時間を計る
+    with span(f"knowledge_base.{mode}"):
+        try:
+            if mode == "retrieve":
+                # retrieve はモデルを使わないので model_arn はキーに含めない
+                key = cache_key(knowledge_base_id, mode, None, number_of_results, text)
+                return await cache.get_or_generate(
+                    key, lambda: _retrieve(text, knowledge_base_id, number_of_results)
+                )
+            key = cache_key(knowledge_base_id, mode, model_arn, number_of_results, text)
+            return await cache.get_or_generate(
+                key,
+                lambda: _retrieve_and_generate(
+                    text, knowledge_base_id, model_arn, number_of_results
+                ),
+            )
+        except DependencyUnavailableError as e:
+            # 障害中は待たせずに縮退した回答を返す（キャッシュには入らない）
+            logger.warning(str(e), extra={"dependency": e.name, "reason": e.reason})
+            return KnowledgeBaseResponse(text=KNOWLEDGE_BASE_UNAVAILABLE, citations=[])
 
 
 @tool
-def get_frontend_best_practices(topic: str) -> str:
+async def get_frontend_best_practices(topic: str) -> str:
     """Provide best practices for front-end applications using React and Next.js.
     Args:
         topic: The specific topic or area of interest
@@ -170,24 +380,17 @@ def get_frontend_best_practices(topic: str) -> str:
         f"Fetching front-end best practices for topic: {topic}",
         extra={"topic": topic, "tool": "get_frontend_best_practices"},
     )
-    response = kb_client.retrieve_and_generate(
-        input={"text": topic},
-        retrieveAndGenerateConfiguration={
-            "type": "KNOWLEDGE_BASE",
-            "knowledgeBaseConfiguration": {
-                "knowledgeBaseId": knowledge_base_settings.bedrock_kb_id,  # ナレッジベースID
-                "modelArn": knowledge_base_settings.kb_model_id,  # 回答を行うモデルのARN（詳細は補足に記載）
-                "retrievalConfiguration": {
-                    "vectorSearchConfiguration": {
-                        "numberOfResults": knowledge_base_settings.kb_result_nums,  # ナレッジベースから取得する関連情報の数
-                    }
-                },
-            },
-        },
+    response = await _query_knowledge_base(
+        kb_response_cache,
+        topic,
+        mode=knowledge_base_settings.kb_mode,
+        knowledge_base_id=knowledge_base_settings.bedrock_kb_id,
+        model_arn=knowledge_base_settings.kb_model_id,
+        number_of_results=knowledge_base_settings.kb_result_nums,
     )
 
-    text = response["output"]["text"]
-    citations = response["citations"]
+    text = response.text
+    citations = response.citations
     logger.info(
         f"Retrieved {len(citations)} citations from knowledge base",
         extra={
@@ -200,7 +403,7 @@ def get_frontend_best_practices(topic: str) -> str:
 
 
 @tool
-def get_estate_info(query: str) -> dict:
+async def get_estate_info(query: str) -> dict:
     """Provide information about real estate based on user queries.
     Args:
         query: The query string related to estate information
@@ -211,23 +414,16 @@ def get_estate_info(query: str) -> dict:
         f"Fetching estate information for query: {query}",
         extra={"query": query, "tool": "get_estate_info"},
     )
-    response = kb_client.retrieve_and_generate(
-        input={"text": query},
-        retrieveAndGenerateConfiguration={
-            "type": "KNOWLEDGE_BASE",
-            "knowledgeBaseConfiguration": {
-                "knowledgeBaseId": estate_knowledge_base_settings.bedrock_estate_kb_id,  # ナレッジベースID
-                "modelArn": estate_knowledge_base_settings.kb_model_id,  # 回答を行うモデルのARN（詳細は補足に記載）
-                "retrievalConfiguration": {
-                    "vectorSearchConfiguration": {
-                        "numberOfResults": estate_knowledge_base_settings.estate_kb_result_nums,  # ナレッジベースから取得する関連情報の数
-                    }
-                },
-            },
-        },
+    response = await _query_knowledge_base(
+        estate_kb_response_cache,
+        query,
+        mode=estate_knowledge_base_settings.estate_kb_mode,
+        knowledge_base_id=estate_knowledge_base_settings.bedrock_estate_kb_id,
+        model_arn=estate_knowledge_base_settings.kb_model_id,
+        number_of_results=estate_knowledge_base_settings.estate_kb_result_nums,
     )
-    text = response["output"]["text"]
-    citations = response["citations"]
+    text = response.text
+    citations = response.citations
     logger.info(
         f"Retrieved {len(citations)} citations from knowledge base",
         extra={
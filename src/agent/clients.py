@@ -0,0 +1,54 @@
+import asyncio
+import weakref
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any
+
+import httpx
+from settings import http_client_settings
+
+# boto3 / geopy などの同期クライアントはイベントループを塞がないよう専用スレッドで実行する
+_blocking_executor = ThreadPoolExecutor(
+    max_workers=http_client_settings.blocking_io_max_workers,
+    thread_name_prefix="blocking-io",
+)
+
+# httpx.AsyncClient is bound to the loop it was first used on, so keep one per loop.
+# uvicorn serves everything from a single loop, which makes this one shared pool.
+_http_clients: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, httpx.AsyncClient
+] = weakref.WeakKeyDictionary()
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared async HTTP client for the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _http_clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            timeout=http_client_settings.http_timeout,
+            limits=httpx.Limits(
+                max_connections=http_client_settings.http_max_connections,
+                max_keepalive_connections=http_client_settings.http_max_keepalive_connections,
+            ),
+            follow_redirects=True,
+        )
+        _http_clients[loop] = client
+    return client
+
+
+async def run_blocking(func: Callable[..., Any], /, *args, **kwargs) -> Any:
+    """Run a blocking call on the bounded I/O thread pool and await its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _blocking_executor, partial(func, *args, **kwargs)
+    )
+
+
+async def aclose_clients() -> None:
+    """Close the HTTP client of the running loop and stop the I/O thread pool."""
+    client = _http_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+    _blocking_executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,205 @@
+import json
+from typing import Any
+
+from strands.agent.agent import Agent
+from strands.agent.conversation_manager import ConversationManager
+from strands.hooks import BeforeInvocationEvent, HookRegistry
+from strands.types.content import Message, Messages
+from strands.types.exceptions import ContextWindowOverflowException
+from timings import span
+from utils import logger
+
+SUMMARY_PROMPT = (
+    "You maintain a running summary of an earlier part of a conversation between "
+    "a user and an AI assistant. Merge the existing summary (if any) with the new "
+    "conversation excerpt into one concise summary of at most {max_tokens} tokens. "
+    "Keep facts, user preferences, open questions and tool results that later turns "
+    "may rely on. Write it in the language used by the user."
+)
+
+
+def estimate_tokens(messages: Messages) -> int:
+    """
+    Rough token count (4 characters per token) of the text in ``messages``.
+
+    Only the conversation history is counted; the system prompt and the tool
+    specs sent with every model call are not.
+    """
+    chars = 0
+    for message in messages:
+        for block in message.get("content", []):
+            if "text" in block:
+                chars += len(block["text"])
+            elif "toolUse" in block:
+                chars += len(json.dumps(block["toolUse"]["input"], ensure_ascii=False))
+            elif "toolResult" in block:
+                for item in block["toolResult"].get("content", []):
+                    chars += len(item.get("text") or json.dumps(item, default=str))
+    return chars // 4
+
+
+def _is_turn_start(message: Message) -> bool:
+    """A user message that is not a tool result starts a new conversation turn."""
+    return message["role"] == "user" and not any(
+        "toolResult" in block for block in message["content"]
+    )
+
+
+def _transcript(messages: Messages) -> str:
+    lines = []
+    for message in messages:
+        for block in message["content"]:
+            if "text" in block:
+                lines.append(f"{message['role']}: {block['text']}")
+            elif "toolUse" in block:
+                tool_input = json.dumps(block["toolUse"]["input"], ensure_ascii=False)
+                lines.append(f"tool call {block['toolUse']['name']}: {tool_input}")
+            elif "toolResult" in block:
+                for item in block["toolResult"].get("content", []):
+                    if "text" in item:
+                        lines.append(f"tool result: {item['text']}")
+    return "\n".join(lines)
+
+
+class TokenBudgetConversationManager(ConversationManager):
+    """
+    Keeps the restored history within a token budget before the agent loop runs.
+
+    Before each invocation, whole turns are evicted oldest first until the
+    history fits ``token_budget`` (the latest turn is always kept; ``None``
+    disables eviction). The budget covers the history only, so leave room in
+    the model's context window for the system prompt and tool specs. With
+    ``summarize`` enabled, evicted turns are folded into a rolling summary
+    generated by the agent's model and kept at the head of the history; the summary
+    is persisted with the session state, so restored sessions start from it.
+    Token counts of every compaction are kept in ``last_compaction``.
+    """
+
+    def __init__(
+        self,
+        token_budget: int | None = None,
+        summarize: bool = False,
+        summary_max_tokens: int = 512,
+    ):
+        super().__init__()
+        self.token_budget = token_budget
+        self.summarize = summarize
+        self.summary_max_tokens = summary_max_tokens
+        # 要約は user / assistant の2メッセージとして先頭に置く（ロールを交互に保つため）
+        self._summary_messages: list[Message] = []
+        self.last_compaction: dict[str, int] | None = None
+
+    def register_hooks(self, registry: HookRegistry, **kwargs: Any) -> None:
+        super().register_hooks(registry, **kwargs)
+        registry.add_callback(BeforeInvocationEvent, self._on_before_invocation)
+
+    def get_state(self) -> dict[str, Any]:
+        state = super().get_state()
+        state["summary_messages"] = self._summary_messages
+        return state
+
+    def restore_from_session(self, state: dict[str, Any]) -> list[Message] | None:
+        # 以前の SlidingWindowConversationManager で保存されたセッションも引き継げるよう名前は確認しない
+        self.removed_message_count = state.get("removed_message_count", 0)
+        self._summary_messages = state.get("summary_messages", [])
+        return list(self._summary_messages) or None
+
+    def apply_management(self, agent: Agent, **kwargs: Any) -> None:
+        # 圧縮は呼び出し前に行うため、呼び出し後は何もしない
+        pass
+
+    def reduce_context(
+        self, agent: Agent, e: Exception | None = None, **kwargs: Any
+    ) -> None:
+        """Drop the oldest turn when the model reports a context overflow."""
+        history_start = self._summary_length(agent.messages)
+        history = agent.messages[history_start:]
+        turn_starts = [i for i, m in enumerate(history) if _is_turn_start(m)][1:]
+        if not turn_starts:
+            raise ContextWindowOverflowException(
+                "Unable to trim conversation context!"
+            ) from e
+        self._evict(agent.messages, history_start, turn_starts[0])
+
+    def _summary_length(self, messages: Messages) -> int:
+        length = len(self._summary_messages)
+        if length and messages[:length] == self._summary_messages:
+            return length
+        return 0
+
+    def _evict(self, messages: Messages, history_start: int, count: int) -> None:
+        del messages[history_start : history_start + count]
+        self.removed_message_count += count
+
+    async def _on_before_invocation(self, event: BeforeInvocationEvent) -> None:
+        with span("compaction"):
+            await self.compact(event.agent)
+
+    async def compact(self, agent: Agent) -> None:
+        """Evict (and optionally summarize) the oldest turns that exceed the budget."""
+        messages = agent.messages
+        history_tokens = estimate_tokens(messages)
+        self.last_compaction = {
+            "history_tokens": history_tokens,
+            "compacted_tokens": history_tokens,
+            "evicted_messages": 0,
+            "summary_tokens": 0,
+        }
+        if self.token_budget is None or history_tokens <= self.token_budget:
+            return
+
+        history_start = self._summary_length(messages)
+        history = messages[history_start:]
+        # 残す末尾のトークン数が予算内に収まる最初のターン境界で切る
+        cut = 0
+        kept_tokens = estimate_tokens(history)
+        for index, message in enumerate(history):
+            if index > 0 and _is_turn_start(message):
+                cut = index
+                if kept_tokens <= self.token_budget:
+                    break
+            kept_tokens -= estimate_tokens([message])
+        if cut == 0:
+            return
+
+        evicted = history[:cut]
+        if self.summarize:
+            summary, summary_tokens = await self._summarize(agent, evicted)
+            messages[:history_start] = summary
+            history_start = len(summary)
+            self._summary_messages = summary
+            self.last_compaction["summary_tokens"] = summary_tokens
+        self._evict(messages, history_start, cut)
+
+        self.last_compaction["compacted_tokens"] = estimate_tokens(messages)
+        self.last_compaction["evicted_messages"] = cut
+        logger.info(
+            f"Compacted conversation history by {cut} messages",
+            extra=self.last_compaction,
+        )
+
+    async def _summarize(
+        self, agent: Agent, evicted: Messages
+    ) -> tuple[list[Message], int]:
+        excerpt = _transcript(evicted)
+        if self._summary_messages:
+            previous = self._summary_messages[0]["content"][0]["text"]
+            excerpt = f"Existing summary:\n{previous}\n\nConversation:\n{excerpt}"
+        text = ""
+        usage_tokens = 0
+        async for chunk in agent.model.stream(
+            [{"role": "user", "content": [{"text": excerpt}]}],
+            system_prompt=SUMMARY_PROMPT.format(max_tokens=self.summary_max_tokens),
+        ):
+            if "contentBlockDelta" in chunk:
+                text += chunk["contentBlockDelta"]["delta"].get("text", "")
+            elif "metadata" in chunk:
+                usage_tokens = chunk["metadata"]["usage"]["totalTokens"]
+        summary: list[Message] = [
+            {
+                "role": "user",
+                "content": [{"text": f"Summary of the earlier conversation:\n{text}"}],
+            },
+            {"role": "assistant", "content": [{"text": "Understood."}]},
+        ]
+        return summary, usage_tokens
@@ -0,0 +1,221 @@
+import asyncio
+import json
+import time
+from collections.abc import AsyncGenerator, Callable
+
+from models import EventTypeEnum
+from sse_starlette.sse import EventSourceResponse
+
+SSE_SEPARATOR = EventSourceResponse.DEFAULT_SEPARATOR
+
+# json.dumps(..., ensure_ascii=False) は呼び出しごとにエンコーダを生成するため、生成済みのものを使い回す
+_encode_json = json.JSONEncoder(ensure_ascii=False).encode
+
+# イベント種別ごとの SSE フレームの先頭（"event: <type>" 行と "data: "）
+_FRAME_PREFIXES: dict[str, str] = {
+    event_type.value: f"event: {event_type.value}{SSE_SEPARATOR}data: "
+    for event_type in EventTypeEnum
+}
+_FRAME_SUFFIX = SSE_SEPARATOR * 2
+
+
+def encode_event(event: dict) -> bytes:
+    """
+    Encode a strands stream ``event`` as a complete SSE frame.
+
+    Produces exactly the bytes that ``InvocationResponseModel`` + ``model_dump`` +
+    sse-starlette used to write (``event: <type>`` and the event serialized as
+    one ``data:`` line), with a single JSON pass and no intermediate model.
+    JSON string escaping guarantees the data never contains a raw line break.
+    Raises ``KeyError`` for event types outside ``EventTypeEnum``, as before.
+    """
+    event_type = next(iter(event))
+    return (_FRAME_PREFIXES[event_type] + _encode_json(event) + _FRAME_SUFFIX).encode()
+
+
+def _text_delta(event: dict) -> tuple[str, dict] | None:
+    """Return the text and the payload of a plain text ``contentBlockDelta`` event."""
+    payload = event.get("contentBlockDelta")
+    if payload is None:
+        return None
+    delta = payload.get("delta", {})
+    text = delta.get("text")
+    if text is None or len(delta) != 1:
+        return None
+    return text, payload
+
+
+class DeltaCoalescer:
+    """
+    Merges consecutive text ``contentBlockDelta`` events into fewer, larger ones.
+
+    Text for the same content block is buffered and released as one delta when
+    it reaches ``max_chars``, when ``window`` seconds have passed since the
+    first buffered delta, or before any other event, so the order of events
+    and the concatenated text are unchanged. ``push`` only sees the window as
+    events arrive; ``coalesce_deltas`` also releases the text when the model
+    stalls.
+    """
+
+    def __init__(
+        self,
+        max_chars: int = 512,
+        window: float = 0.03,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_chars = max_chars
+        self.window = window
+        self._clock = clock
+        self._payload: dict | None = None
+        self._texts: list[str] = []
+        self._chars = 0
+        self._started_at = 0.0
+
+    def push(self, event: dict) -> list[dict]:
+        """Add ``event`` and return the events that are ready to be sent."""
+        ready: list[dict] = []
+        text_delta = _text_delta(event)
+        if text_delta is None:
+            ready += self.flush()
+            ready.append(event)
+            return ready
+
+        text, payload = text_delta
+        if self._payload is not None and payload.get(
+            "contentBlockIndex"
+        ) != self._payload.get("contentBlockIndex"):
+            ready += self.flush()
+        if self._payload is None:
+            self._payload = payload
+            self._started_at = self._clock()
+        self._texts.append(text)
+        self._chars += len(text)
+        if (
+            self._chars >= self.max_chars
+            or self._clock() - self._started_at >= self.window
+        ):
+            ready += self.flush()
+        return ready
+
+    def expires_in(self) -> float | None:
+        """Seconds until the buffered text is due, or None when nothing is buffered."""
+        if self._payload is None:
+            return None
+        return self._started_at + self.window - self._clock()
+
+    def flush(self) -> list[dict]:
+        """Release the buffered text, if any, as a single delta."""
+        if self._payload is None:
+            return []
+        merged = {
+            **self._payload,
+            "delta": {"text": "".join(self._texts)},
+        }
+        self._payload = None
+        self._texts = []
+        self._chars = 0
+        return [{"contentBlockDelta": merged}]
+
+
+_END_OF_STREAM = object()
+
+
+async def coalesce_deltas(
+    messages: AsyncGenerator[dict], coalescer: DeltaCoalescer
+) -> AsyncGenerator[dict]:
+    """
+    Messages from ``Agent.stream_async`` with their text deltas merged by ``coalescer``.
+
+    The agent stream is read by its own task, so buffered text is sent when
+    the window expires even while the model produces nothing, instead of
+    waiting for the next event. Other messages are passed through unchanged.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+
+    async def read() -> None:
+        try:
+            async for msg in messages:
+                await queue.put(msg)
+            await queue.put(_END_OF_STREAM)
+        except Exception as e:
+            await queue.put(e)
+        finally:
+            await messages.aclose()
+
+    reader = asyncio.create_task(read())
+    try:
+        while True:
+            try:
+                async with asyncio.timeout(coalescer.expires_in()):
+                    msg = await queue.get()
+            except TimeoutError:
+                for event in coalescer.flush():
+                    yield {"event": event}
+                continue
+            if msg is _END_OF_STREAM:
+                break
+            if isinstance(msg, Exception):
+                raise msg
+            if next(iter(msg)) != "event":
+                yield msg
+                continue
+            for event in coalescer.push(msg["event"]):
+                yield {"event": event}
+        for event in coalescer.flush():
+            yield {"event": event}
+    finally:
+        reader.cancel()
+        await asyncio.gather(reader, return_exceptions=True)
+
+
+# events を指定しないリクエストに送るイベント種別（従来どおりモデルのイベントすべて）
+DEFAULT_EVENT_TYPES = frozenset(
+    event_type.value
+    for event_type in EventTypeEnum
+    if event_type is not EventTypeEnum.toolProgress
+)
+
+
+def subscribed_event_types(events: list[EventTypeEnum] | None) -> frozenset[str]:
+    """Event types to stream for a request's ``events`` subscription."""
+    if events is None:
+        return DEFAULT_EVENT_TYPES
+    return frozenset(event_type.value for event_type in events)
+
+
+def tool_progress_events(msg: dict) -> list[dict]:
+    """
+    ``toolProgress`` events for a message from ``Agent.stream_async``.
+
+    A tool use block starting in the model output reports the sub-agent as
+    ``running``; the tool result message reports each one as ``success`` or
+    ``error``. Tool inputs and results are not included.
+    """
+    event = msg.get("event")
+    if event is not None:
+        tool_use = event.get("contentBlockStart", {}).get("start", {}).get("toolUse")
+        if tool_use is None:
+            return []
+        return [
+            {
+                "toolProgress": {
+                    "toolUseId": tool_use["toolUseId"],
+                    "name": tool_use["name"],
+                    "status": "running",
+                }
+            }
+        ]
+
+    message = msg.get("message")
+    if message is None or message["role"] != "user":
+        return []
+    return [
+        {
+            "toolProgress": {
+                "toolUseId": block["toolResult"]["toolUseId"],
+                "status": block["toolResult"].get("status", "success"),
+            }
+        }
+        for block in message["content"]
+        if "toolResult" in block
+    ]
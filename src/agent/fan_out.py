@@ -0,0 +1,64 @@
+import asyncio
+from contextlib import nullcontext
+from contextvars import ContextVar
+
+from agent_pool import AgentPool
+from settings import sub_agent_fan_out_settings
+from strands.agent.agent_result import AgentResult
+from timings import current_timings, span
+from utils import logger
+
+# メインエージェントの呼び出し単位で共有する同時実行数の上限
+_concurrency_limit: ContextVar[asyncio.Semaphore | None] = ContextVar(
+    "sub_agent_concurrency_limit", default=None
+)
+
+
+def limit_fan_out(max_concurrency: int) -> None:
+    """
+    Cap the number of sub-agents running at once for the rest of the current task.
+
+    The main agent's tool executor runs the tool calls of one model turn as
+    concurrent tasks, which inherit the caller's context, so every
+    ``invoke_sub_agent`` made for one invocation shares the same limit.
+    """
+    _concurrency_limit.set(asyncio.Semaphore(max_concurrency))
+
+
+def sub_agent_timeout(name: str) -> float:
+    return sub_agent_fan_out_settings.sub_agent_timeouts.get(
+        name, sub_agent_fan_out_settings.sub_agent_timeout
+    )
+
+
+async def invoke_sub_agent(
+    pool: AgentPool, prompt: str, timeout: float | None = None
+) -> AgentResult | str:
+    """
+    Run ``prompt`` on an agent borrowed from ``pool``.
+
+    Waits for a slot under the current ``limit_fan_out`` first. If the
+    sub-agent does not finish within ``timeout`` seconds (per-agent setting by
+    default) it is cancelled and a short notice is returned to the main agent
+    instead, so one slow sub-agent does not fail the whole answer. The wall
+    time (``sub_agent.<name>``, waiting included) and the token usage are
+    added to the invocation timings.
+    """
+    timeout = sub_agent_timeout(pool.name) if timeout is None else timeout
+    limit = _concurrency_limit.get()
+    with span(f"sub_agent.{pool.name}"):
+        async with limit or nullcontext():
+            async with pool.acheckout() as agent:
+                try:
+                    async with asyncio.timeout(timeout):
+                        result = await agent.invoke_async(prompt)
+                except TimeoutError:
+                    logger.warning(
+                        f"Sub-agent timed out: {pool.name}",
+                        extra={"agent": pool.name, "timeout": timeout},
+                    )
+                    return f"{pool.name} did not respond within {timeout:g} seconds."
+    timings = current_timings()
+    if timings is not None:
+        timings.record_sub_agent(pool.name, result)
+    return result
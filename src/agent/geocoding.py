@@ -0,0 +1,202 @@
+import asyncio
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any
+
+from clients import run_blocking
+from models import GeoPoint
+from resilience import Dependency
+from single_flight import SingleFlight
+
+# よく問い合わせのある国内主要都市は Nominatim に問い合わせずに返す
+SEED_LOCATIONS: dict[str, tuple[float, float]] = {
+    "東京": (35.6812, 139.7671),
+    "tokyo": (35.6812, 139.7671),
+    "大阪": (34.6937, 135.5023),
+    "osaka": (34.6937, 135.5023),
+    "名古屋": (35.1815, 136.9066),
+    "nagoya": (35.1815, 136.9066),
+    "札幌": (43.0618, 141.3545),
+    "sapporo": (43.0618, 141.3545),
+    "福岡": (33.5902, 130.4017),
+    "fukuoka": (33.5902, 130.4017),
+    "横浜": (35.4437, 139.6380),
+    "yokohama": (35.4437, 139.6380),
+    "京都": (35.0116, 135.7681),
+    "kyoto": (35.0116, 135.7681),
+    "神戸": (34.6901, 135.1955),
+    "kobe": (34.6901, 135.1955),
+    "仙台": (38.2682, 140.8694),
+    "sendai": (38.2682, 140.8694),
+    "広島": (34.3853, 132.4553),
+    "hiroshima": (34.3853, 132.4553),
+    "那覇": (26.2124, 127.6809),
+    "naha": (26.2124, 127.6809),
+}
+
+
+def normalize_location(location: str) -> str:
+    """Cache key for a location name: NFKC-normalized, lower-cased, single-spaced."""
+    return " ".join(unicodedata.normalize("NFKC", location).lower().split())
+
+
+class _SqliteStore:
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS geocode ("
+                "key TEXT PRIMARY KEY, latitude REAL, longitude REAL, expires_at REAL)"
+            )
+
+    def get(self, key: str, now: float) -> tuple[GeoPoint | None, float] | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT latitude, longitude, expires_at FROM geocode WHERE key = ?",
+                (key,),
+            ).fetchone()
+        if row is None or row[2] <= now:
+            return None
+        point = None if row[0] is None else GeoPoint(latitude=row[0], longitude=row[1])
+        return point, row[2]
+
+    def put(self, key: str, point: GeoPoint | None, expires_at: float) -> None:
+        latitude = point.latitude if point else None
+        longitude = point.longitude if point else None
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO geocode VALUES (?, ?, ?, ?)",
+                (key, latitude, longitude, expires_at),
+            )
+
+
+class GeocodeCache:
+    """
+    Geocoding front-end for ``get_weather``.
+
+    Lookups go through an in-memory LRU with TTL, the seeded Japanese cities and
+    an optional SQLite file before reaching the upstream geocoder. Upstream calls
+    are spaced by ``min_interval`` seconds (Nominatim allows ~1 req/s) and
+    concurrent misses for the same key share one request. With ``dependency``
+    the upstream call runs under its deadline and circuit breaker, so cache
+    hits keep working while the geocoder is down.
+    """
+
+    def __init__(
+        self,
+        geocode: Callable[[str], Any],
+        max_entries: int = 1024,
+        ttl: float = 30 * 24 * 3600,
+        negative_ttl: float = 3600,
+        db_path: str | None = None,
+        min_interval: float = 1.0,
+        seeds: dict[str, tuple[float, float]] | None = None,
+        dependency: Dependency | None = None,
+    ):
+        self._geocode = geocode
+        self.dependency = dependency
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.min_interval = min_interval
+        self._entries: OrderedDict[str, tuple[GeoPoint | None, float]] = OrderedDict()
+        self._seeds = {
+            normalize_location(name): GeoPoint(latitude=lat, longitude=lon)
+            for name, (lat, lon) in (SEED_LOCATIONS if seeds is None else seeds).items()
+        }
+        self._store = _SqliteStore(db_path) if db_path else None
+        self._inflight = SingleFlight()
+        self._rate_lock = asyncio.Lock()
+        self._last_upstream_call = 0.0
+
+        self.hits = 0
+        self.misses = 0
+        self.upstream_calls = 0
+        self.upstream_latency_total = 0.0
+
+    def _remember(self, key: str, point: GeoPoint | None, expires_at: float) -> None:
+        self._entries[key] = (point, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def _lookup_cached(self, key: str) -> tuple[bool, GeoPoint | None]:
+        now = time.time()
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[1] > now:
+                self._entries.move_to_end(key)
+                return True, entry[0]
+            del self._entries[key]
+
+        if key in self._seeds:
+            return True, self._seeds[key]
+
+        if self._store is not None:
+            stored = await run_blocking(self._store.get, key, now)
+            if stored is not None:
+                self._remember(key, *stored)
+                return True, stored[0]
+
+        return False, None
+
+    async def _fetch(self, key: str, location: str) -> GeoPoint | None:
+        async with self._rate_lock:
+            wait = self._last_upstream_call + self.min_interval - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            started = time.perf_counter()
+            try:
+                if self.dependency is None:
+                    location_data = await run_blocking(self._geocode, location)
+                else:
+                    location_data = await self.dependency.call(
+                        lambda: run_blocking(self._geocode, location)
+                    )
+            finally:
+                self._last_upstream_call = time.monotonic()
+        self.upstream_calls += 1
+        self.upstream_latency_total += time.perf_counter() - started
+
+        point = (
+            GeoPoint(latitude=location_data.latitude, longitude=location_data.longitude)
+            if location_data
+            else None
+        )
+        expires_at = time.time() + (self.ttl if point else self.negative_ttl)
+        self._remember(key, point, expires_at)
+        if self._store is not None:
+            await run_blocking(self._store.put, key, point, expires_at)
+        return point
+
+    async def lookup(self, location: str) -> GeoPoint | None:
+        """Return the coordinates for ``location``, or None if it cannot be found."""
+        key = normalize_location(location)
+        found, point = await self._lookup_cached(key)
+        if found:
+            self.hits += 1
+            return point
+
+        self.misses += 1
+        return await self._inflight.run(key, lambda: self._fetch(key, location))
+
+    def stats(self) -> dict:
+        """Return hit ratio and upstream (miss) latency."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "upstream_calls": self.upstream_calls,
+            "miss_latency_ms_avg": (
+                self.upstream_latency_total / self.upstream_calls * 1000
+                if self.upstream_calls
+                else 0.0
+            ),
+        }
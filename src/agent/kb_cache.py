@@ -0,0 +1,161 @@
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+
+from models import KnowledgeBaseResponse
+from single_flight import SingleFlight
+
+# 末尾の句読点や疑問符は言い回しの揺れなので無視する
+_TRAILING_PUNCTUATION = re.compile(r"[\s?？!！.。、,，]+$")
+
+# (knowledge_base_id, mode, model_arn, number_of_results, 正規化したクエリ)
+CacheKey = tuple[str, str, str, int, str]
+
+
+def normalize_query(query: str) -> str:
+    """Cache key for a query: NFKC-normalized, lower-cased, single-spaced."""
+    text = " ".join(unicodedata.normalize("NFKC", query).lower().split())
+    return _TRAILING_PUNCTUATION.sub("", text)
+
+
+def cache_key(
+    knowledge_base_id: str,
+    mode: str,
+    model_arn: str | None,
+    number_of_results: int,
+    query: str,
+) -> CacheKey:
+    """Cache key for one knowledge base request; ``model_arn`` is None for ``retrieve``."""
+    return (
+        knowledge_base_id,
+        mode,
+        model_arn or "",
+        number_of_results,
+        normalize_query(query),
+    )
+
+
+def shingles(text: str, size: int = 3) -> frozenset[str]:
+    """Character ``size``-gram set of ``text`` (spaces removed)."""
+    compact = text.replace(" ", "")
+    if len(compact) <= size:
+        return frozenset([compact]) if compact else frozenset()
+    return frozenset(compact[i : i + size] for i in range(len(compact) - size + 1))
+
+
+def jaccard(a: frozenset[str], b: frozenset[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class _Entry:
+    __slots__ = ("response", "expires_at", "shingles")
+
+    def __init__(
+        self, response: KnowledgeBaseResponse, expires_at: float, shingles: frozenset
+    ):
+        self.response = response
+        self.expires_at = expires_at
+        self.shingles = shingles
+
+
+class KnowledgeBaseCache:
+    """
+    Response cache for ``retrieve_and_generate`` and ``retrieve`` calls.
+
+    Entries are keyed on knowledge base ID, mode, model ARN (empty for
+    ``retrieve``), number of results and the normalized query, and evicted by
+    TTL and LRU size. When ``similarity_threshold`` is set, a miss on the
+    exact key falls back to the most similar cached query for the same
+    request parameters (Jaccard similarity of character trigrams),
+    so rephrasings such as "React のベストプラクティス" / "Reactのベストプラクティスは？"
+    share one answer. Concurrent misses for the same key share one request.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 512,
+        ttl: float = 3600,
+        similarity_threshold: float | None = None,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.similarity_threshold = similarity_threshold
+        self._entries: OrderedDict[CacheKey, _Entry] = OrderedDict()
+        self._inflight = SingleFlight()
+
+        self.hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+
+    def _find_similar(self, key: CacheKey, now: float) -> _Entry | None:
+        target = shingles(key[-1])
+        best: _Entry | None = None
+        best_score = self.similarity_threshold
+        for other_key, entry in list(self._entries.items()):
+            if entry.expires_at <= now:
+                del self._entries[other_key]
+                continue
+            if other_key[:-1] != key[:-1]:
+                continue
+            score = jaccard(target, entry.shingles)
+            if score >= best_score:
+                best, best_score = entry, score
+        return best
+
+    def get(self, key: CacheKey) -> KnowledgeBaseResponse | None:
+        """Return a cached response for ``key``, or None on a miss."""
+        now = time.time()
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry.expires_at > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.response
+            del self._entries[key]
+
+        if self.similarity_threshold is not None:
+            entry = self._find_similar(key, now)
+            if entry is not None:
+                self.hits += 1
+                self.similar_hits += 1
+                return entry.response
+
+        self.misses += 1
+        return None
+
+    def put(self, key: CacheKey, response: KnowledgeBaseResponse) -> None:
+        self._entries[key] = _Entry(response, time.time() + self.ttl, shingles(key[-1]))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get_or_generate(
+        self,
+        key: CacheKey,
+        generate: Callable[[], Awaitable[KnowledgeBaseResponse]],
+    ) -> KnowledgeBaseResponse:
+        """Return the cached response for ``key`` or call ``generate`` and cache it."""
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+
+        async def generate_and_put() -> KnowledgeBaseResponse:
+            response = await generate()
+            self.put(key, response)
+            return response
+
+        return await self._inflight.run(key, generate_and_put)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "similar_hits": self.similar_hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
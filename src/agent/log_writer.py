@@ -0,0 +1,240 @@
+import asyncio
+import random
+import time
+from enum import Enum
+
+from clients import run_blocking
+from models import AgentCoreInvokeLogModel
+from pynamodb.exceptions import PutError
+from settings import log_settings
+from utils import logger
+
+THROTTLING_ERROR_CODES = {
+    "ProvisionedThroughputExceededException",
+    "ThrottlingException",
+    "RequestLimitExceeded",
+}
+
+
+class DropPolicyEnum(Enum):
+    drop_newest = "drop_newest"
+    drop_oldest = "drop_oldest"
+    block = "block"
+
+
+def _is_throttled(error: Exception) -> bool:
+    """PutError without a response code means UnprocessedItems survived PynamoDB's own retries."""
+    if not isinstance(error, PutError):
+        return False
+    return (
+        error.cause_response_code is None
+        or error.cause_response_code in THROTTLING_ERROR_CODES
+    )
+
+
+class InvocationLogWriter:
+    """
+    Background sink for invocation logs.
+
+    ``enqueue`` only touches an in-process bounded queue; a worker task drains it
+    and writes up to ``batch_size`` (max 25, the DynamoDB limit) items per
+    ``BatchWriteItem`` call on the blocking I/O thread pool.
+    """
+
+    def __init__(
+        self,
+        model: type[AgentCoreInvokeLogModel] = AgentCoreInvokeLogModel,
+        max_queue_size: int = 1000,
+        batch_size: int = 25,
+        flush_interval: float = 1.0,
+        drop_policy: DropPolicyEnum = DropPolicyEnum.drop_newest,
+        enqueue_timeout: float = 0.1,
+        max_retries: int = 5,
+        retry_base_delay: float = 0.1,
+        retry_max_delay: float = 5.0,
+    ):
+        self.model = model
+        self.max_queue_size = max_queue_size
+        self.batch_size = min(batch_size, 25)
+        self.flush_interval = flush_interval
+        self.drop_policy = drop_policy
+        self.enqueue_timeout = enqueue_timeout
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+
+        self._queue: asyncio.Queue[AgentCoreInvokeLogModel] | None = None
+        self._worker: asyncio.Task | None = None
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.retries = 0
+        self.batches = 0
+
+    @property
+    def running(self) -> bool:
+        return self._worker is not None and not self._worker.done()
+
+    def start(self) -> None:
+        """Create the queue and worker task on the running event loop."""
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._worker = asyncio.create_task(self._run(), name="invocation-log-writer")
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Flush everything still queued, then stop the worker."""
+        if not self.running:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=timeout)
+        except TimeoutError:
+            logger.warning(
+                "Invocation log flush timed out",
+                extra={"queue_depth": self.queue_depth, "timeout": timeout},
+            )
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def enqueue(self, item: AgentCoreInvokeLogModel) -> bool:
+        """
+        Queue an item for writing without waiting on DynamoDB.
+
+        :return: False when the item was dropped because the queue is full
+        """
+        if not self.running:
+            # ワーカー未起動（ライフスパン外など）の場合は従来どおり同期で保存する
+            await run_blocking(item.save)
+            self.written += 1
+            return True
+
+        try:
+            self._queue.put_nowait(item)
+        except asyncio.QueueFull:
+            if not await self._handle_full(item):
+                self.dropped += 1
+                logger.warning(
+                    "Invocation log dropped",
+                    extra={
+                        "queue_depth": self.queue_depth,
+                        "policy": self.drop_policy.value,
+                    },
+                )
+                return False
+        self.enqueued += 1
+        return True
+
+    async def _handle_full(self, item: AgentCoreInvokeLogModel) -> bool:
+        match self.drop_policy:
+            case DropPolicyEnum.drop_oldest:
+                self._queue.get_nowait()
+                self._queue.task_done()
+                self.dropped += 1
+                self._queue.put_nowait(item)
+                return True
+            case DropPolicyEnum.block:
+                try:
+                    await asyncio.wait_for(
+                        self._queue.put(item), timeout=self.enqueue_timeout
+                    )
+                    return True
+                except TimeoutError:
+                    return False
+            case _:
+                return False
+
+    async def _next_batch(self) -> list[AgentCoreInvokeLogModel]:
+        batch = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.flush_interval
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._next_batch()
+            try:
+                await self._write_with_retry(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write_batch(self, batch: list[AgentCoreInvokeLogModel]) -> None:
+        with self.model.batch_write() as writer:
+            for item in batch:
+                writer.save(item)
+
+    async def _write_with_retry(self, batch: list[AgentCoreInvokeLogModel]) -> None:
+        for attempt in range(self.max_retries + 1):
+            try:
+                # 書き込みは呼び出しの完了後に行うため、所要時間はログの Timings ではなくここで記録する
+                started = time.perf_counter()
+                await run_blocking(self._write_batch, batch)
+                self.written += len(batch)
+                self.batches += 1
+                logger.debug(
+                    f"Wrote {len(batch)} invocation logs",
+                    extra={
+                        "batch_size": len(batch),
+                        "queue_depth": self.queue_depth,
+                        "write_ms": round((time.perf_counter() - started) * 1000, 1),
+                    },
+                )
+                return
+            except Exception as e:
+                if not _is_throttled(e) or attempt == self.max_retries:
+                    self.failed += len(batch)
+                    logger.exception(
+                        "Failed to write invocation logs",
+                        extra={"batch_size": len(batch), "attempts": attempt + 1},
+                    )
+                    return
+                self.retries += 1
+                # Full jitter backoff
+                delay = min(self.retry_max_delay, self.retry_base_delay * 2**attempt)
+                await asyncio.sleep(random.uniform(0, delay))
+
+    def stats(self) -> dict:
+        """Return counters and the current queue depth."""
+        return {
+            "queue_depth": self.queue_depth,
+            "queue_capacity": self.max_queue_size,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "retries": self.retries,
+            "batches": self.batches,
+        }
+
+
+invocation_log_writer = InvocationLogWriter(
+    max_queue_size=log_settings.log_queue_size,
+    batch_size=log_settings.log_batch_size,
+    flush_interval=log_settings.log_flush_interval,
+    drop_policy=DropPolicyEnum(log_settings.log_drop_policy),
+    enqueue_timeout=log_settings.log_enqueue_timeout,
+    max_retries=log_settings.log_max_retries,
+    retry_base_delay=log_settings.log_retry_base_delay,
+    retry_max_delay=log_settings.log_retry_max_delay,
+)
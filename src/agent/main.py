@@ -3,48 +3,100 @@
 Uses BedrockAgentCoreApp for simplified deployment
 """
 
-import json
-from collections.abc import AsyncIterator
+from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager
 from datetime import datetime
 from zoneinfo import ZoneInfo
 
 import uvicorn
+from admission import Admission, AdmissionRejectedError, admission_controller
+from agent_template import AgentTemplate
+from agent_tools import (
+    aws_rss_feed_cache,
+    estate_kb_response_cache,
+    fetch_weather_report,
+    geocode_cache,
+    get_aws_rss_feed,
+    kb_response_cache,
+)
 from bedrock_agentcore.memory.integrations.strands.config import AgentCoreMemoryConfig
-from bedrock_agentcore.memory.integrations.strands.session_manager import (
-    AgentCoreMemorySessionManager,
+from clients import aclose_clients
+from compaction import TokenBudgetConversationManager
+from event_stream import (
+    DeltaCoalescer,
+    coalesce_deltas,
+    encode_event,
+    subscribed_event_types,
+    tool_progress_events,
 )
+from fan_out import invoke_sub_agent, limit_fan_out
 
 # from bedrock_agentcore.runtime import BedrockAgentCoreApp
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from log_writer import invocation_log_writer
+from mcp_sessions import mcp_session_manager
+from metrics import CONTENT_TYPE, invocation_metrics, metrics_registry
 from models import (
     AgentCoreInvokeLogModel,
+    CompactionAttribute,
     EventTypeEnum,
     InvocationRequestModel,
     InvocationResponseModel,
+    TimingsAttribute,
     UsageAttribute,
 )
 from nanoid import generate
-from settings import is_local, memory_settings, model_settings
+from resilience import dependencies
+from session_cache import CachedAgentCoreMemorySessionManager, session_history_cache
+from settings import (
+    aws_rss_settings,
+    compaction_settings,
+    is_local,
+    log_settings,
+    memory_settings,
+    model_settings,
+    stream_settings,
+    sub_agent_fan_out_settings,
+    tool_routing_settings,
+)
 from sse_starlette.sse import EventSourceResponse
-from strands import Agent, tool
+from starlette.background import BackgroundTask
+from startup import start_up
+from strands import tool
 from strands.agent.agent_result import AgentResult
 from strands.types.event_loop import Usage
 from sub_agents import (
-    aws_access_agent,
-    aws_rss_agent,
-    estate_agent,
-    goverment_data_agent,
-    react_agent,
-    search_agent,
-    weather_agent,
+    aws_access_agent_pool,
+    aws_rss_agent_pool,
+    estate_agent_pool,
+    goverment_data_agent_pool,
+    react_agent_pool,
+    search_agent_pool,
+    sub_agent_pools,
+    weather_agent_pool,
 )
+from timings import span, start_timings, timing_hooks
 from utils import logger
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    invocation_log_writer.start()
+    aws_rss_feed_cache.start()
+    await start_up()
+    yield
+    await mcp_session_manager.stop()
+    await aws_rss_feed_cache.stop()
+    await invocation_log_writer.stop(timeout=log_settings.log_shutdown_timeout)
+    await aclose_clients()
+
+
 # strands.agent.agent_result.AgentResult
 # Initialize the AgentCore app
 # app = BedrockAgentCoreApp()
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -53,11 +105,35 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-model = model_settings.get_model()
+# 各コンポーネントの stats() はリクエストごとではなく /metrics の取得時に読み出す
+metrics_registry.register_collector("admission", admission_controller.stats)
+metrics_registry.register_collector("log_writer", invocation_log_writer.stats)
+metrics_registry.register_collector("session_cache", session_history_cache.stats)
+metrics_registry.register_collector(
+    "kb_cache",
+    lambda: {
+        "frontend": kb_response_cache.stats(),
+        "estate": estate_kb_response_cache.stats(),
+    },
+    label="knowledge_base",
+)
+metrics_registry.register_collector("geocode_cache", geocode_cache.stats)
+metrics_registry.register_collector("rss_feed", aws_rss_feed_cache.stats)
+metrics_registry.register_collector(
+    "sub_agent_pool",
+    lambda: {pool.name: pool.stats() for pool in sub_agent_pools},
+    label="pool",
+)
+metrics_registry.register_collector(
+    "mcp_session", mcp_session_manager.stats, label="server"
+)
+metrics_registry.register_collector("dependency", dependencies.stats, label="name")
+
+model = model_settings.get_agent_model("main_agent")
 
 
 @tool
-def call_weather_agent(city: str) -> str:
+async def call_weather_agent(city: str) -> str:
     """Call agent to get weather information using the weather_agent.
     Args:
         city: The name of the city
@@ -65,7 +141,9 @@ def call_weather_agent(city: str) -> str:
         A string describing the weather
     """
 
-    result = weather_agent(f"Get the weather for {city} and current time.")
+    result = await invoke_sub_agent(
+        weather_agent_pool, f"Get the weather for {city} and current time."
+    )
     logger.info(
         f"Weather agent called for city: {city}",
         extra={"city": city, "tool": "call_weather_agent"},
@@ -74,7 +152,7 @@ def call_weather_agent(city: str) -> str:
 
 
 @tool
-def call_search_agent(query: str) -> dict:
+async def call_search_agent(query: str) -> dict:
     """Call agent to perform web search using the search_agent.
     Args:
         query: The search query string
@@ -82,7 +160,7 @@ def call_search_agent(query: str) -> dict:
         The search results as a dictionary
     """
 
-    result = search_agent(f"Search the web for {query}")
+    result = await invoke_sub_agent(search_agent_pool, f"Search the web for {query}")
     logger.info(
         f"Search agent called for query: {query}",
         extra={"query": query, "tool": "call_search_agent"},
@@ -91,7 +169,7 @@ def call_search_agent(query: str) -> dict:
 
 
 @tool
-def call_goverment_data_agent(query: str) -> dict:
+async def call_goverment_data_agent(query: str) -> dict:
     """Call agent to fetch government data using the goverment_data_agent.
     Args:
         query: The query string related to government data
@@ -99,7 +177,9 @@ def call_goverment_data_agent(query: str) -> dict:
         The government data results as a dictionary
     """
 
-    result = goverment_data_agent(f"Fetch government data for {query}")
+    result = await invoke_sub_agent(
+        goverment_data_agent_pool, f"Fetch government data for {query}"
+    )
     logger.info(
         f"Goverment data agent called for query: {query}",
         extra={"query": query, "tool": "call_goverment_data_agent"},
@@ -108,7 +188,7 @@ def call_goverment_data_agent(query: str) -> dict:
 
 
 @tool
-def call_aws_rss_agent(keyword: str) -> list:
+async def call_aws_rss_agent(keyword: str) -> list:
     """Call agent to fetch AWS RSS feed items using the aws_rss_agent.
     Args:
         keyword: The keyword to search for in the RSS feed
@@ -116,7 +196,9 @@ def call_aws_rss_agent(keyword: str) -> list:
         A list of RSS feed items matching the keyword
     """
 
-    result = aws_rss_agent(f"Fetch RSS feed items for {keyword}")
+    result = await invoke_sub_agent(
+        aws_rss_agent_pool, f"Fetch RSS feed items for {keyword}"
+    )
     logger.info(
         f"AWS RSS agent called for keyword: {keyword}",
         extra={"keyword": keyword, "tool": "call_aws_rss_agent"},
@@ -125,7 +207,7 @@ def call_aws_rss_agent(keyword: str) -> list:
 
 
 @tool
-def call_react_agent(topic: str) -> str:
+async def call_react_agent(topic: str) -> str:
     """Call agent to fetch front-end best practices using the react_agent.
     Args:
         topic: The specific topic or area of interest
@@ -133,7 +215,9 @@ def call_react_agent(topic: str) -> str:
         A string describing best practices
     """
 
-    result = react_agent(f"Provide best practices for {topic}")
+    result = await invoke_sub_agent(
+        react_agent_pool, f"Provide best practices for {topic}"
+    )
     logger.info(
         f"React agent called for topic: {topic}",
         extra={"topic": topic, "tool": "call_react_agent"},
@@ -142,7 +226,7 @@ def call_react_agent(topic: str) -> str:
 
 
 @tool
-def call_estate_agent(query: str) -> dict:
+async def call_estate_agent(query: str) -> dict:
     """Call agent to perform estate knowledge base retrieval using the estate_agent.
     Args:
         query: The query string related to estate information
@@ -150,7 +234,9 @@ def call_estate_agent(query: str) -> dict:
         The retrieval results as a dictionary
     """
 
-    result = estate_agent(f"Retrieve estate information for {query}")
+    result = await invoke_sub_agent(
+        estate_agent_pool, f"Retrieve estate information for {query}"
+    )
     logger.info(
         f"Estate agent called for query: {query}",
         extra={"query": query, "tool": "call_estate_agent"},
@@ -159,7 +245,7 @@ def call_estate_agent(query: str) -> dict:
 
 
 @tool
-def call_aws_access_agent(topic: str) -> str:
+async def call_aws_access_agent(topic: str) -> str:
     """Call agent to fetch AWS access guidance using the aws_access_agent.
     Args:
         topic: The specific topic or area of interest related to AWS access
@@ -167,7 +253,9 @@ def call_aws_access_agent(topic: str) -> str:
         A string describing AWS access guidance
     """
 
-    result = aws_access_agent(f"Provide guidance on AWS access for {topic}")
+    result = await invoke_sub_agent(
+        aws_access_agent_pool, f"Provide guidance on AWS access for {topic}"
+    )
     logger.info(
         f"AWS Access agent called for topic: {topic}",
         extra={"topic": topic, "tool": "call_aws_access_agent"},
@@ -175,15 +263,108 @@ def call_aws_access_agent(topic: str) -> str:
     return result
 
 
-def save_invocation_log(
+@tool
+async def lookup_weather(city: str) -> dict:
+    """Get the current weather and the current time for a city.
+    Args:
+        city: The name of the city
+    Returns:
+        The weather report and the current time (Asia/Tokyo) as JSON
+    """
+    report = await fetch_weather_report(city)
+    logger.info(
+        f"Weather looked up for city: {city}",
+        extra={"city": city, "status": report.status, "tool": "lookup_weather"},
+    )
+    return {
+        "status": "success",
+        "content": [
+            {
+                "json": {
+                    **report.model_dump(mode="json"),
+                    "current_time": datetime.now(ZoneInfo("Asia/Tokyo")).isoformat(),
+                }
+            }
+        ],
+    }
+
+
+@tool
+async def lookup_aws_rss_feed(
+    keyword: str, max_items: int = aws_rss_settings.rss_default_items
+) -> dict:
+    """Search AWS What's New, the AWS News Blog and AWS security bulletins.
+    Args:
+        keyword: Keywords to filter RSS feed items, separated by spaces
+        max_items: The maximum number of items to return
+    Returns:
+        The matching RSS feed items, newest first, as JSON
+    """
+    items = await get_aws_rss_feed(keyword=keyword, max_items=max_items)
+    return {
+        "status": "success",
+        "content": [{"json": {"items": [item.model_dump() for item in items]}}],
+    }
+
+
+# direct モードでは単純なツールをサブエージェントの LLM を介さずに呼ぶ
+if tool_routing_settings.tool_routing_mode == "direct":
+    weather_tool, aws_rss_tool = lookup_weather, lookup_aws_rss_feed
+    weather_instruction = "If weather information is needed, use lookup_weather and tell the current time along with the weather."
+    aws_rss_instruction = (
+        "If AWS RSS feed items are needed, use lookup_aws_rss_feed to fetch them."
+    )
+else:
+    weather_tool, aws_rss_tool = call_weather_agent, call_aws_rss_agent
+    weather_instruction = (
+        "If weather information is needed, please use the call_weather_agent."
+    )
+    aws_rss_instruction = (
+        "If AWS RSS feed items are needed, use call_aws_rss_agent to fetch them."
+    )
+
+# ツール定義やシステムプロンプトなどリクエストによらない部分は起動時に一度だけ組み立てる
+main_agent_template = AgentTemplate(
+    name="main_agent",
+    model=model,
+    tools=[
+        weather_tool,
+        call_search_agent,
+        aws_rss_tool,
+        call_react_agent,
+        call_aws_access_agent,
+        call_estate_agent,
+        # call_goverment_data_agent,
+    ],
+    system_prompt=model_settings.system_prompt(
+        "main_agent",
+        f"""
+        You are a kind AI assistant.
+        Please answer user questions politely.
+        If real estate information is needed, use call_estate_agent to retrieve it.
+        If front-end/React/Next.js best practices are needed, use call_react_agent to provide guidance.
+        {weather_instruction}
+        If information is unknown, use call_search_agent to search.
+        {aws_rss_instruction}
+        If AWS access guidance is needed, use call_aws_access_agent to provide guidance.
+        If the question has several independent parts, call all the agents you need at once in the same response.
+        Answer in the language used by the user.
+        """,
+    ),
+)
+
+
+async def save_invocation_log(
     invocation_id: str,
     payload: InvocationRequestModel,
     usage: Usage,
     latency: float,
     output: str,
+    compaction: dict | None = None,
+    timings: dict | None = None,
 ):
     """
-    Save the invocation log to the database
+    Queue the invocation log for the background DynamoDB writer
 
     :param invocation_id: Unique identifier for the invocation
     :type invocation_id: str
@@ -195,6 +376,10 @@ def save_invocation_log(
     :type latency: float
     :param output: The output generated by the agent
     :type output: str
+    :param compaction: Token counts of the history compaction run before the agent loop
+    :type compaction: dict | None
+    :param timings: Per-stage latency breakdown of the invocation
+    :type timings: dict | None
     """
     log_entry = AgentCoreInvokeLogModel(
         InvocationId=invocation_id,
@@ -204,19 +389,11 @@ def save_invocation_log(
         Input=payload.prompt,
         Output=output,
         Usage=UsageAttribute.from_usage(usage),
+        Compaction=CompactionAttribute.from_stats(compaction) if compaction else None,
         Latency=latency,
+        Timings=TimingsAttribute.from_summary(timings) if timings else None,
     )
-    log_entry.save()
-
-
-def parse_event_message(msg: dict):
-    event = msg.get("event")
-    event_type = list(event.keys())[0]
-    event_type_enum = EventTypeEnum[event_type]
-    response_model = InvocationResponseModel(
-        event=event_type_enum, data=json.dumps(event, ensure_ascii=False)
-    )
-    return response_model
+    await invocation_log_writer.enqueue(log_entry)
 
 
 def parse_result_message(msg: dict):
@@ -238,58 +415,99 @@ async def entrypoint(invocation_id: str, payload: InvocationRequestModel):
     :type payload: InvocationRequestModel
     """
 
+    # ステージごとの所要時間（サブエージェントやツールの分も含む）をこの呼び出しに集計する
+    timings = start_timings()
+
     agentcore_memory_config = AgentCoreMemoryConfig(
         memory_id=memory_settings.memory_id,
         session_id=payload.session_id,
         actor_id=payload.actor_id,
     )
-    agentcore_session_manager = AgentCoreMemorySessionManager(
-        agentcore_memory_config=agentcore_memory_config,
-    )
 
-    # Create agent with the sub-agents as tools
-    main_agent = Agent(
-        name="main_agent",
-        model=model,
-        session_manager=agentcore_session_manager,
-        tools=[
-            call_weather_agent,
-            call_search_agent,
-            call_aws_rss_agent,
-            call_react_agent,
-            call_aws_access_agent,
-            call_estate_agent,
-            # call_goverment_data_agent,
-        ],
-        system_prompt="""
-            You are a kind AI assistant.
-            Please answer user questions politely.
-            If real estate information is needed, use call_estate_agent to retrieve it.
-            If front-end/React/Next.js best practices are needed, use call_react_agent to provide guidance.
-            If weather information is needed, please use the call_weather_agent.
-            If information is unknown, use call_search_agent to search.
-            If AWS RSS feed items are needed, use call_aws_rss_agent to fetch them.
-            If AWS access guidance is needed, use call_aws_access_agent to provide guidance.
-            Answer in the language used by the user.
-        """,
+    # 復元した会話履歴はエージェントループの前にトークン予算内へ圧縮する
+    conversation_manager = TokenBudgetConversationManager(
+        token_budget=compaction_settings.compaction_token_budget,
+        summarize=compaction_settings.compaction_summarize,
+        summary_max_tokens=compaction_settings.compaction_summary_max_tokens,
     )
 
+    with span("memory_hydration"):
+        # 同じセッションの2ターン目以降は会話履歴をプロセス内キャッシュから復元する
+        agentcore_session_manager = CachedAgentCoreMemorySessionManager(
+            agentcore_memory_config=agentcore_memory_config,
+            cache=session_history_cache,
+        )
+
+        # Create agent with the sub-agents as tools
+        main_agent = main_agent_template.create(
+            session_manager=agentcore_session_manager,
+            conversation_manager=conversation_manager,
+            hooks=[timing_hooks],
+        )
+
+    # 独立したサブエージェント呼び出しは同時に実行される（上限は設定値）
+    limit_fan_out(sub_agent_fan_out_settings.sub_agent_max_concurrency)
+
+    # 購読していないイベントはシリアライズせずに捨てる
+    subscribed = subscribed_event_types(payload.events)
+    report_tool_progress = EventTypeEnum.toolProgress.value in subscribed
+
     # Stream responses back to the caller
-    stream_messages: AsyncIterator[dict] = main_agent.stream_async(payload.prompt)
+    stream_messages: AsyncGenerator[dict] = main_agent.stream_async(payload.prompt)
+    if payload.coalesce_deltas:
+        # テキスト差分はまとめて送る（モデルが止まっていても時間窓が過ぎたら送る）
+        stream_messages = coalesce_deltas(
+            stream_messages,
+            DeltaCoalescer(
+                max_chars=stream_settings.stream_coalesce_max_chars,
+                window=stream_settings.stream_coalesce_window,
+            ),
+        )
     async for msg in stream_messages:
-        event_key = list(msg.keys())[0]
+        event_key = next(iter(msg))
 
         # Depending on the event type, construct the appropriate response
+        # (pre-framed SSE bytes in the InvocationResponseModel wire format)
         if event_key == "event":
-            response = parse_event_message(msg)
-            yield response.model_dump(mode="json")
+            if "contentBlockDelta" in msg["event"]:
+                timings.first_token()
+            if next(iter(msg["event"])) in subscribed:
+                yield encode_event(msg["event"])
+
+        if report_tool_progress:
+            for event in tool_progress_events(msg):
+                yield encode_event(event)
 
         # Save the invocation log when the final result is received
         if event_key == "result":
+            invocation_metrics.observe_result(msg["result"])
             total_usage, total_latency, output_message = parse_result_message(msg)
-            save_invocation_log(
-                invocation_id, payload, total_usage, total_latency, output_message
+            timings_summary = timings.summary()
+            logger.info(
+                "Invocation timings",
+                extra={"invocation_id": invocation_id, "timings": timings_summary},
             )
+            await save_invocation_log(
+                invocation_id,
+                payload,
+                total_usage,
+                total_latency,
+                output_message,
+                compaction=conversation_manager.last_compaction,
+                timings=timings_summary,
+            )
+
+
+async def release_after(
+    stream: AsyncGenerator[bytes], admission: Admission
+) -> AsyncGenerator[bytes]:
+    """Pass ``stream`` through and release ``admission`` however it ends."""
+    try:
+        async for chunk in stream:
+            yield chunk
+    finally:
+        admission.release()
+        await stream.aclose()
 
 
 # Define API endpoints
@@ -299,6 +517,12 @@ async def ping():
     return {"status": "healthy"}
 
 
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics endpoint."""
+    return Response(content=metrics_registry.render(), media_type=CONTENT_TYPE)
+
+
 @app.post("/invocations", response_model=InvocationResponseModel)
 async def invocations(payload: InvocationRequestModel) -> InvocationResponseModel:
     invocation_id = generate(alphabet="0123456789abcdefghijklmnopqrst", size=10)
@@ -309,10 +533,37 @@ async def invocations(payload: InvocationRequestModel) -> InvocationResponseMode
     if not payload.session_id:
         payload.session_id = "default-session"
 
-    return EventSourceResponse(
-        entrypoint(invocation_id, payload),
-        media_type="text/event-stream",
-    )
+    # 上限を超えた呼び出しはエージェントを作らずにすぐ 429 を返す
+    try:
+        admission = await admission_controller.acquire(payload.actor_id)
+    except AdmissionRejectedError as e:
+        logger.warning(
+            "Invocation rejected",
+            extra={
+                "invocation_id": invocation_id,
+                "actor_id": payload.actor_id,
+                "reason": e.reason.value,
+            },
+        )
+        return JSONResponse(
+            status_code=429,
+            content={"detail": str(e)},
+            headers={"Retry-After": str(e.retry_after)},
+        )
+
+    # 枠はストリームの終了時（失敗を含む）に返す。ストリームが始まる前に
+    # クライアントが切断した場合はレスポンスの background で返す（release は冪等）
+    try:
+        return EventSourceResponse(
+            release_after(
+                invocation_metrics.track(entrypoint(invocation_id, payload)), admission
+            ),
+            media_type="text/event-stream",
+            background=BackgroundTask(admission.release),
+        )
+    except BaseException:
+        admission.release()
+        raise
 
 
 if __name__ == "__main__":
@@ -0,0 +1,313 @@
+import asyncio
+import threading
+from collections.abc import Callable
+from typing import Any
+
+from clients import run_blocking
+from resilience import Dependency, DependencyUnavailableError, dependencies
+from settings import mcp_settings
+from strands.tools.mcp import MCPAgentTool, MCPClient
+from strands.tools.mcp.mcp_types import MCPToolResult, MCPTransport
+from strands.tools.tool_provider import ToolProvider
+from strands.types._events import ToolResultEvent
+from strands.types.exceptions import MCPClientInitializationError
+from strands.types.tools import ToolGenerator, ToolUse
+from utils import logger
+
+
+class McpTransportError(ConnectionError):
+    """An MCP tool call that failed in the session or transport, not in the tool."""
+
+
+class _RaisingMcpClient(MCPClient):
+    # strands は呼び出しの例外もエラー結果に変えるため、ツール自身のエラー結果と区別できるよう送出する
+    # （非公開メソッドの上書きなので、strands の更新で外れないかテストで確かめている）
+    def _handle_tool_execution_error(
+        self, tool_use_id: str, exception: Exception
+    ) -> MCPToolResult:
+        raise McpTransportError(f"MCP tool call failed: {exception}") from exception
+
+
+class ResilientMcpAgentTool(MCPAgentTool):
+    """
+    MCP tool whose calls run under the deadline and circuit breaker of its server.
+
+    Only transport failures and timeouts count as failures of the server;
+    error results from the tool itself (e.g. bad arguments from the model)
+    are passed through. When the server is down, times out or its circuit is
+    open, the agent gets an error result at once instead of waiting on the
+    session.
+    """
+
+    def __init__(self, tool: MCPAgentTool, dependency: Dependency):
+        super().__init__(tool.mcp_tool, tool.mcp_client, tool.tool_name, tool.timeout)
+        self.dependency = dependency
+
+    async def _call(self, tool_use: ToolUse) -> MCPToolResult:
+        try:
+            return await self.mcp_client.call_tool_async(
+                tool_use_id=tool_use["toolUseId"],
+                name=self.mcp_tool.name,
+                arguments=tool_use["input"],
+                read_timeout_seconds=self.timeout,
+            )
+        except MCPClientInitializationError as e:
+            raise McpTransportError(str(e)) from e
+
+    async def stream(
+        self, tool_use: ToolUse, invocation_state: dict[str, Any], **kwargs: Any
+    ) -> ToolGenerator:
+        try:
+            result = await self.dependency.call(lambda: self._call(tool_use))
+        except DependencyUnavailableError as e:
+            result = MCPToolResult(
+                status="error",
+                toolUseId=tool_use["toolUseId"],
+                content=[{"text": f"{e}. Answer without this tool."}],
+            )
+        yield ToolResultEvent(result)
+
+
+class ManagedMcpClient(ToolProvider):
+    """
+    Tool provider backed by one long-lived MCP session.
+
+    The session (connection, ``initialize`` and the ``list_tools`` listing) is
+    opened once and shared by every agent that uses the provider; MCP requests
+    are multiplexed over it, so concurrent agents can call tools at the same
+    time. Agents do not own the session: ``McpSessionManager`` opens it at
+    startup, health-checks it and reconnects when it breaks, rebinding the
+    cached tools to the new session so existing agents keep working.
+
+    With ``dependency``, tool calls run under its deadline and circuit breaker
+    (see ``ResilientMcpAgentTool``), and while the circuit is open an agent
+    that needs the session fails at once instead of waiting for a connection.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        transport: Callable[[], MCPTransport],
+        startup_timeout: int = 30,
+        dependency: Dependency | None = None,
+    ):
+        self.name = name
+        self._transport = transport
+        self._startup_timeout = startup_timeout
+        self.dependency = dependency
+        self._lock = threading.Lock()
+        self.client: MCPClient | None = None
+        self._tools: list[MCPAgentTool] | None = None
+
+        self.connects = 0
+        self.reconnects = 0
+        self.health_check_failures = 0
+
+    def _list_tools(self, client: MCPClient) -> list[MCPAgentTool]:
+        tools: list[MCPAgentTool] = []
+        pagination_token = None
+        while True:
+            page = client.list_tools_sync(pagination_token)
+            tools.extend(page)
+            pagination_token = page.pagination_token
+            if pagination_token is None:
+                return tools
+
+    def _open(self) -> tuple[MCPClient, list[MCPAgentTool]]:
+        client_class = MCPClient if self.dependency is None else _RaisingMcpClient
+        client = client_class(self._transport, startup_timeout=self._startup_timeout)
+        client.start()
+        try:
+            return client, self._list_tools(client)
+        except Exception:
+            client.stop(None, None, None)
+            raise
+
+    def _connect(self) -> None:
+        if self.dependency is None:
+            client, tools = self._open()
+        else:
+            try:
+                client, tools = self._open()
+            except Exception:
+                self.dependency.record(False)
+                raise
+            self.dependency.record(True)
+
+        if self._tools is None:
+            if self.dependency is not None:
+                tools = [ResilientMcpAgentTool(t, self.dependency) for t in tools]
+            self._tools = tools
+        else:
+            # 既存のエージェントが持つツールを新しいセッションに付け替える
+            for tool in self._tools:
+                tool.mcp_client = client
+            if {tool.tool_name for tool in tools} != {
+                tool.tool_name for tool in self._tools
+            }:
+                logger.warning(
+                    f"MCP tool list changed on reconnect: {self.name}",
+                    extra={"mcp_server": self.name},
+                )
+
+        previous, self.client = self.client, client
+        self.connects += 1
+        if previous is not None:
+            previous.stop(None, None, None)
+
+    def ensure_connected(self) -> None:
+        """Open the session if it is not open yet (blocking)."""
+        with self._lock:
+            if self.client is None:
+                if self.dependency is not None:
+                    self.dependency.check()
+                self._connect()
+
+    def reconnect(self) -> None:
+        """Replace the session with a new one (blocking)."""
+        with self._lock:
+            self._connect()
+            self.reconnects += 1
+
+    def ping(self) -> None:
+        """Make one round trip on the session; raises when it is broken."""
+        if self.client is None:
+            raise ConnectionError(f"MCP session is not open: {self.name}")
+        self.client.list_tools_sync()
+
+    def close(self) -> None:
+        with self._lock:
+            if self.client is not None:
+                self.client.stop(None, None, None)
+                self.client = None
+
+    async def load_tools(self, **kwargs: Any) -> list[MCPAgentTool]:
+        # Agent の初期化から呼ばれる（strands が別スレッドのループで実行する）
+        self.ensure_connected()
+        return list(self._tools or [])
+
+    def add_consumer(self, consumer_id: Any, **kwargs: Any) -> None:
+        # セッションの寿命はエージェントではなく McpSessionManager が管理する
+        pass
+
+    def remove_consumer(self, consumer_id: Any, **kwargs: Any) -> None:
+        pass
+
+    def stats(self) -> dict:
+        return {
+            "connected": self.client is not None,
+            "tools": len(self._tools or []),
+            "connects": self.connects,
+            "reconnects": self.reconnects,
+            "health_check_failures": self.health_check_failures,
+        }
+
+
+def register_mcp_dependency(name: str) -> Dependency:
+    # ツール呼び出しは冪等とは限らないため再試行しない
+    return dependencies.register(
+        f"mcp_{name}", timeout=mcp_settings.mcp_tool_timeout, max_attempts=1
+    )
+
+
+class McpSessionManager:
+    """
+    Owns the MCP sessions of the app.
+
+    ``start`` opens every registered session in parallel (a server that is
+    down is logged and retried by the health check instead of failing
+    startup) and then pings each session every ``health_check_interval``
+    seconds, reconnecting the ones that fail or time out.
+    """
+
+    def __init__(
+        self,
+        health_check_interval: float = 60.0,
+        health_check_timeout: float = 10.0,
+    ):
+        self.health_check_interval = health_check_interval
+        self.health_check_timeout = health_check_timeout
+        self.clients: dict[str, ManagedMcpClient] = {}
+        self._task: asyncio.Task | None = None
+
+    def register(
+        self,
+        name: str,
+        transport: Callable[[], MCPTransport],
+        startup_timeout: int = 30,
+    ) -> ManagedMcpClient:
+        client = ManagedMcpClient(
+            name,
+            transport,
+            startup_timeout=startup_timeout,
+            dependency=register_mcp_dependency(name),
+        )
+        self.clients[name] = client
+        return client
+
+    async def _connect(self, client: ManagedMcpClient) -> None:
+        try:
+            await run_blocking(client.ensure_connected)
+        except Exception:
+            logger.exception(
+                f"Failed to open MCP session: {client.name}",
+                extra={"mcp_server": client.name},
+            )
+
+    async def check(self, client: ManagedMcpClient) -> bool:
+        """Ping ``client`` and reconnect it if the session is broken."""
+        try:
+            async with asyncio.timeout(self.health_check_timeout):
+                await run_blocking(client.ping)
+            return True
+        except Exception:
+            client.health_check_failures += 1
+            logger.warning(
+                f"MCP session health check failed, reconnecting: {client.name}",
+                extra={"mcp_server": client.name},
+            )
+        try:
+            await run_blocking(client.reconnect)
+        except Exception:
+            logger.exception(
+                f"Failed to reconnect MCP session: {client.name}",
+                extra={"mcp_server": client.name},
+            )
+        return False
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.health_check_interval)
+            await asyncio.gather(*(self.check(c) for c in self.clients.values()))
+
+    async def start(self, connect: bool = True) -> None:
+        """
+        Start health-checking the sessions on the running loop.
+
+        With ``connect`` the sessions are opened first; otherwise each one is
+        opened by the first agent that loads its tools or by the health check,
+        whichever comes first.
+        """
+        if connect:
+            await asyncio.gather(*(self._connect(c) for c in self.clients.values()))
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="mcp-health-check")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await asyncio.gather(*(run_blocking(c.close) for c in self.clients.values()))
+
+    def stats(self) -> dict:
+        return {name: client.stats() for name, client in self.clients.items()}
+
+
+mcp_session_manager = McpSessionManager(
+    health_check_interval=mcp_settings.mcp_health_check_interval,
+    health_check_timeout=mcp_settings.mcp_health_check_timeout,
+)
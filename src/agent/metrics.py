@@ -0,0 +1,274 @@
+import time
+from bisect import bisect_left
+from collections.abc import AsyncGenerator, Callable, Iterable
+
+from strands.agent.agent_result import AgentResult
+
+# 秒単位のレイテンシ用バケット（最初のイベントまで〜サブエージェントを含む応答全体）
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+Labels = tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """
+    Monotonic counter, optionally split by label values.
+
+    Updates are plain attribute and dict operations without locks: they are
+    only made from the event loop thread, and a scrape reads a consistent
+    enough snapshot for monitoring.
+    """
+
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labels: Labels = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values: dict[Labels, float] = {}
+
+    def inc(self, amount: float = 1, labels: Labels = ()) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, labels: Labels = ()) -> float:
+        return self._values.get(labels, 0)
+
+    def samples(self) -> Iterable[str]:
+        for labels, value in self._values.items():
+            yield f"{self.name}{_format_labels(self.labels, labels)} {_format_value(value)}"
+
+
+class Gauge(Counter):
+    """Value that goes up and down (``inc`` with a negative amount or ``set``)."""
+
+    type = "gauge"
+
+    def dec(self, amount: float = 1, labels: Labels = ()) -> None:
+        self.inc(-amount, labels)
+
+    def set(self, value: float, labels: Labels = ()) -> None:
+        self._values[labels] = value
+
+
+class Histogram:
+    """Cumulative histogram with fixed bucket upper bounds, optionally split by labels."""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+        labels: Labels = (),
+    ):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        # labels -> [各バケットの件数（非累積、最後は +Inf）, 合計, 件数]
+        self._values: dict[Labels, list] = {}
+
+    def observe(self, value: float, labels: Labels = ()) -> None:
+        state = self._values.get(labels)
+        if state is None:
+            state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        state[0][bisect_left(self.buckets, value)] += 1
+        state[1] += value
+        state[2] += 1
+
+    def count(self, labels: Labels = ()) -> int:
+        state = self._values.get(labels)
+        return state[2] if state else 0
+
+    def samples(self) -> Iterable[str]:
+        for labels, (bucket_counts, total, count) in self._values.items():
+            cumulative = 0
+            for bound, bucket_count in zip(
+                (*self.buckets, float("inf")), bucket_counts
+            ):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket{_format_labels(self.labels, labels, le)} {cumulative}"
+            label_text = _format_labels(self.labels, labels)
+            yield f"{self.name}_sum{label_text} {_format_value(total)}"
+            yield f"{self.name}_count{label_text} {count}"
+
+
+class MetricsRegistry:
+    """
+    Metrics of the process in the Prometheus text exposition format.
+
+    Besides its own counters, gauges and histograms, the registry renders the
+    ``stats()`` of registered components as gauges at scrape time, so the
+    components keep their counters as they are and pay nothing per request.
+    """
+
+    def __init__(self, prefix: str = "agent"):
+        self.prefix = prefix
+        self._metrics: list[Counter | Histogram] = []
+        self._collectors: list[tuple[str, Callable[[], dict], str | None]] = []
+
+    def counter(self, name: str, help: str, labels: Labels = ()) -> Counter:
+        metric = Counter(f"{self.prefix}_{name}", help, labels)
+        self._metrics.append(metric)
+        return metric
+
+    def gauge(self, name: str, help: str, labels: Labels = ()) -> Gauge:
+        metric = Gauge(f"{self.prefix}_{name}", help, labels)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+        labels: Labels = (),
+    ) -> Histogram:
+        metric = Histogram(f"{self.prefix}_{name}", help, buckets, labels)
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(
+        self, name: str, stats: Callable[[], dict], label: str | None = None
+    ) -> None:
+        """
+        Export the numeric values of ``stats()`` as ``<prefix>_<name>_<key>`` gauges.
+
+        With ``label``, ``stats()`` returns one stats dict per label value
+        (e.g. per pool or per MCP server).
+        """
+        self._collectors.append((name, stats, label))
+
+    def _collect(
+        self, name: str, stats: Callable[[], dict], label: str | None
+    ) -> list[str]:
+        by_label = stats() if label else {None: stats()}
+        series: dict[str, list[str]] = {}
+        for label_value, values in by_label.items():
+            label_text = (
+                "" if label is None else _format_labels((label,), (str(label_value),))
+            )
+            for key, value in values.items():
+                # 文字列や未計測（None）の値は出力しない
+                if isinstance(value, bool):
+                    value = int(value)
+                elif not isinstance(value, int | float):
+                    continue
+                metric = f"{self.prefix}_{name}_{key}"
+                series.setdefault(metric, []).append(
+                    f"{metric}{label_text} {_format_value(value)}"
+                )
+        lines = []
+        for metric, samples in series.items():
+            lines.append(f"# TYPE {metric} gauge")
+            lines.extend(samples)
+        return lines
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.samples())
+        for name, stats, label in self._collectors:
+            lines.extend(self._collect(name, stats, label))
+        return "\n".join(lines) + "\n"
+
+
+class InvocationMetrics:
+    """Request, latency, tool and token metrics of ``/invocations``."""
+
+    def __init__(self, registry: MetricsRegistry):
+        self.invocations = registry.counter(
+            "invocations_total", "Invocations received."
+        )
+        self.in_flight = registry.gauge(
+            "invocations_in_flight", "SSE streams currently open."
+        )
+        self.first_event_seconds = registry.histogram(
+            "invocation_first_event_seconds", "Time to the first streamed SSE event."
+        )
+        self.duration_seconds = registry.histogram(
+            "invocation_duration_seconds", "Total duration of the invocation stream."
+        )
+        self.event_loop_cycles = registry.counter(
+            "event_loop_cycles_total", "Event loop cycles of the main agent."
+        )
+        self.tool_calls = registry.counter(
+            "tool_calls_total", "Tool calls of the main agent.", ("tool",)
+        )
+        self.tool_errors = registry.counter(
+            "tool_errors_total", "Failed tool calls of the main agent.", ("tool",)
+        )
+        self.tool_seconds = registry.counter(
+            "tool_duration_seconds_total",
+            "Time spent in tool calls of the main agent.",
+            ("tool",),
+        )
+        self.tokens = registry.counter(
+            "tokens_total", "Tokens used by the main agent.", ("type",)
+        )
+        # リクエストが来る前から 0 として出力する
+        self.invocations.inc(0)
+        self.in_flight.set(0)
+
+    async def track(self, stream: AsyncGenerator[bytes]) -> AsyncGenerator[bytes]:
+        """Pass ``stream`` through, counting it as in flight and timing its events."""
+        self.invocations.inc()
+        self.in_flight.inc()
+        start = time.perf_counter()
+        first_event = True
+        try:
+            async for chunk in stream:
+                if first_event:
+                    self.first_event_seconds.observe(time.perf_counter() - start)
+                    first_event = False
+                yield chunk
+        finally:
+            self.in_flight.dec()
+            self.duration_seconds.observe(time.perf_counter() - start)
+            # クライアントが切断した場合も元のストリームを閉じる
+            await stream.aclose()
+
+    def observe_result(self, result: AgentResult) -> None:
+        """Add the tool and token totals from the ``EventLoopMetrics`` of ``result``."""
+        metrics = result.metrics
+        self.event_loop_cycles.inc(metrics.cycle_count)
+        for name, tool_metrics in metrics.tool_metrics.items():
+            labels = (name,)
+            self.tool_calls.inc(tool_metrics.call_count, labels)
+            self.tool_errors.inc(tool_metrics.error_count, labels)
+            self.tool_seconds.inc(tool_metrics.total_time, labels)
+        usage = metrics.accumulated_usage
+        for token_type, key in (
+            ("input", "inputTokens"),
+            ("output", "outputTokens"),
+            ("cache_read", "cacheReadInputTokens"),
+            ("cache_write", "cacheWriteInputTokens"),
+        ):
+            self.tokens.inc(usage.get(key, 0), (token_type,))
+
+
+metrics_registry = MetricsRegistry()
+invocation_metrics = InvocationMetrics(metrics_registry)
@@ -1,4 +1,5 @@
 from enum import Enum
+from typing import Literal
 
 from pydantic import BaseModel
 from pynamodb.attributes import MapAttribute, NumberAttribute, UnicodeAttribute
@@ -24,10 +25,31 @@ class RssItem(BaseModel):
         )
 
 
+class GeoPoint(BaseModel):
+    latitude: float
+    longitude: float
+
+
+class WeatherReport(BaseModel):
+    location: str
+    status: Literal["ok", "location_not_found", "unavailable", "error"]
+    weather: str | None = None
+    weather_code: int | None = None
+    temperature_c: float | None = None
+
+
+class KnowledgeBaseResponse(BaseModel):
+    text: str
+    citations: list[dict] = []
+
+
 class UsageAttribute(MapAttribute):
     InputTokens = NumberAttribute()
     OutputTokens = NumberAttribute()
     TotalTokens = NumberAttribute()
+    # プロンプトキャッシュから読み込んだ / キャッシュに書き込んだ入力トークン数
+    CacheReadInputTokens = NumberAttribute(default=0)
+    CacheWriteInputTokens = NumberAttribute(default=0)
 
     @classmethod
     def from_usage(cls, usage: Usage):
@@ -36,6 +58,62 @@ class UsageAttribute(MapAttribute):
             InputTokens=usage.get("inputTokens", 0),
             OutputTokens=usage.get("outputTokens", 0),
             TotalTokens=usage.get("totalTokens", 0),
+            CacheReadInputTokens=usage.get("cacheReadInputTokens", 0),
+            CacheWriteInputTokens=usage.get("cacheWriteInputTokens", 0),
+        )
+
+
+class CompactionAttribute(MapAttribute):
+    HistoryTokens = NumberAttribute()
+    CompactedTokens = NumberAttribute()
+    EvictedMessages = NumberAttribute()
+    SummaryTokens = NumberAttribute()
+
+    @classmethod
+    def from_stats(cls, stats: dict):
+        """Create a CompactionAttribute instance from conversation compaction stats."""
+        return cls(
+            HistoryTokens=stats.get("history_tokens", 0),
+            CompactedTokens=stats.get("compacted_tokens", 0),
+            EvictedMessages=stats.get("evicted_messages", 0),
+            SummaryTokens=stats.get("summary_tokens", 0),
+        )
+
+
+class TimingsAttribute(MapAttribute):
+    TotalMs = NumberAttribute()
+    TimeToFirstTokenMs = NumberAttribute(null=True)
+    # ステージ名（model.main_agent, tool.call_weather_agent, sub_agent.weather_agent,
+    # sub_agent.weather_agent.model, sub_agent.weather_agent.tool.get_weather, geocode など）
+    # -> Count / TotalMs / MaxMs
+    Stages = MapAttribute(default=dict)
+    # サブエージェント名 -> Calls / InputTokens / OutputTokens / TotalTokens / ModelMs
+    SubAgents = MapAttribute(default=dict)
+
+    @classmethod
+    def from_summary(cls, summary: dict):
+        """Create a TimingsAttribute instance from an InvocationTimings summary."""
+        return cls(
+            TotalMs=summary["total_ms"],
+            TimeToFirstTokenMs=summary["time_to_first_token_ms"],
+            Stages={
+                stage: {
+                    "Count": values["count"],
+                    "TotalMs": values["total_ms"],
+                    "MaxMs": values["max_ms"],
+                }
+                for stage, values in summary["stages"].items()
+            },
+            SubAgents={
+                name: {
+                    "Calls": values["calls"],
+                    "InputTokens": values["input_tokens"],
+                    "OutputTokens": values["output_tokens"],
+                    "TotalTokens": values["total_tokens"],
+                    "ModelMs": values["model_ms"],
+                }
+                for name, values in summary["sub_agents"].items()
+            },
         )
 
 
@@ -46,6 +124,8 @@ class AgentCoreInvokeLogModel(Model):
 
     class Meta:
         table_name = log_settings.log_table_name
+        if log_settings.log_table_host:
+            host = log_settings.log_table_host
 
     InvocationId = UnicodeAttribute()
     ActorId = UnicodeAttribute(hash_key=True)
@@ -54,7 +134,9 @@ class AgentCoreInvokeLogModel(Model):
     Input = UnicodeAttribute()
     Output = UnicodeAttribute(null=True)
     Usage = UsageAttribute(null=True)
+    Compaction = CompactionAttribute(null=True)
     Latency = NumberAttribute(null=True)
+    Timings = TimingsAttribute(null=True)
 
 
 class EventTypeEnum(Enum):
@@ -64,12 +146,18 @@ class EventTypeEnum(Enum):
     contentBlockStop = "contentBlockStop"  # noqa: N815
     messageStop = "messageStop"  # noqa: N815
     metadata = "metadata"
+    # サブエージェント（ツール）呼び出しの開始・完了。リクエストで指定した場合のみ送る
+    toolProgress = "toolProgress"  # noqa: N815
 
 
 class InvocationRequestModel(BaseModel):
     prompt: str
     actor_id: str | None = None
     session_id: str | None = None
+    # True の場合、連続するテキスト差分をまとめて少ない SSE フレームで返す
+    coalesce_deltas: bool = False
+    # 送るイベント種別。未指定の場合は toolProgress 以外のすべて
+    events: list[EventTypeEnum] | None = None
 
 
 class InvocationResponseModel(BaseModel):
@@ -0,0 +1,302 @@
+import asyncio
+import random
+import threading
+import time
+from collections.abc import Awaitable, Callable
+from enum import Enum
+from typing import Any
+
+import httpx
+from botocore.exceptions import ClientError, HTTPClientError
+from botocore.exceptions import ConnectionError as BotocoreConnectionError
+from geopy.exc import GeocoderTimedOut, GeocoderUnavailable
+from settings import resilience_settings
+from utils import logger
+
+# 一時的な障害として再試行し、サーキットブレーカーの失敗に数える AWS のエラーコード
+TRANSIENT_AWS_ERROR_CODES = {
+    "ThrottlingException",
+    "TooManyRequestsException",
+    "ServiceUnavailableException",
+    "InternalServerException",
+    "RequestTimeout",
+    "RequestTimeoutException",
+}
+
+
+def is_transient(error: BaseException) -> bool:
+    """True for timeouts, connection failures, throttling and 5xx responses."""
+    if isinstance(
+        error,
+        TimeoutError
+        | ConnectionError
+        | httpx.TransportError
+        | BotocoreConnectionError
+        | HTTPClientError
+        | GeocoderTimedOut
+        | GeocoderUnavailable,
+    ):
+        return True
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        return status == 429 or status >= 500
+    if isinstance(error, ClientError):
+        code = error.response.get("Error", {}).get("Code")
+        status = error.response.get("ResponseMetadata", {}).get("HTTPStatusCode", 0)
+        return code in TRANSIENT_AWS_ERROR_CODES or status >= 500
+    return False
+
+
+class CircuitStateEnum(Enum):
+    closed = 0
+    half_open = 1
+    open = 2
+
+
+class DependencyUnavailableError(Exception):
+    """Raised when a dependency failed, timed out or its circuit is open."""
+
+    def __init__(self, name: str, reason: str):
+        super().__init__(f"{name} is unavailable: {reason}")
+        self.name = name
+        self.reason = reason
+
+
+class CircuitBreaker:
+    """
+    Opens after ``failure_threshold`` consecutive failures.
+
+    While open, calls are rejected without touching the dependency. After
+    ``reset_timeout`` seconds one probe call is let through (half-open); its
+    success closes the circuit and its failure opens it again. Used from the
+    event loop and from the blocking I/O threads, hence the lock.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CircuitStateEnum.closed
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+        self.opens = 0
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state is CircuitStateEnum.closed:
+                return True
+            if (
+                self.state is CircuitStateEnum.open
+                and time.monotonic() - self.opened_at >= self.reset_timeout
+            ):
+                self.state = CircuitStateEnum.half_open
+            if self.state is CircuitStateEnum.half_open and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record(self, healthy: bool | None) -> None:
+        """Record the outcome of an allowed call; ``None`` when it was abandoned (cancelled)."""
+        with self._lock:
+            self._probing = False
+            if healthy is None:
+                return
+            if healthy:
+                self.state = CircuitStateEnum.closed
+                self.consecutive_failures = 0
+                return
+            self.consecutive_failures += 1
+            if (
+                self.state is CircuitStateEnum.half_open
+                or self.consecutive_failures >= self.failure_threshold
+            ):
+                if self.state is not CircuitStateEnum.open:
+                    self.opens += 1
+                self.state = CircuitStateEnum.open
+                self.opened_at = time.monotonic()
+
+
+class RetryBudget:
+    """
+    Token bucket limiting retries to a fraction of the calls.
+
+    Every call earns ``ratio`` tokens (up to ``max_tokens``) and every retry
+    spends one, so a failing dependency sees at most ``1 + ratio`` times its
+    normal load instead of ``max_attempts`` times.
+    """
+
+    def __init__(self, ratio: float = 0.2, max_tokens: float = 10.0):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+
+    def deposit(self) -> None:
+        self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+class Dependency:
+    """
+    Deadline, budgeted retries with jitter and a circuit breaker for one dependency.
+
+    ``call`` runs an async callable under a deadline of ``timeout`` seconds
+    covering every attempt. Transient errors (``retryable``) are retried up to
+    ``max_attempts`` with full-jitter exponential backoff while the retry
+    budget allows. A call that still fails, times out or finds the circuit
+    open raises ``DependencyUnavailableError`` at once, so callers can return
+    a degraded answer instead of holding the stream. Other errors (e.g. a bad
+    request) are re-raised unchanged and count as the dependency being up.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        timeout: float = 10.0,
+        max_attempts: int = 3,
+        retry_base_delay: float = 0.1,
+        retry_max_delay: float = 2.0,
+        retry_ratio: float = 0.2,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        retryable: Callable[[BaseException], bool] = is_transient,
+    ):
+        self.name = name
+        self.timeout = timeout
+        self.max_attempts = max_attempts
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self.retryable = retryable
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.budget = RetryBudget(retry_ratio)
+
+        self.calls = 0
+        self.retries = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.short_circuits = 0
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(
+            0, min(self.retry_max_delay, self.retry_base_delay * 2 ** (attempt - 1))
+        )
+
+    async def _attempts(self, func: Callable[[], Awaitable[Any]]) -> Any:
+        attempt = 1
+        while True:
+            try:
+                return await func()
+            except Exception as e:
+                if (
+                    attempt >= self.max_attempts
+                    or not self.retryable(e)
+                    or not self.budget.withdraw()
+                ):
+                    raise
+                self.retries += 1
+                logger.info(
+                    f"Retrying {self.name} after {e!r}",
+                    extra={"dependency": self.name, "attempt": attempt},
+                )
+                await asyncio.sleep(self._backoff(attempt))
+                attempt += 1
+
+    def check(self) -> None:
+        """Raise ``DependencyUnavailableError`` if the circuit rejects the next call."""
+        if not self.breaker.allow():
+            self.short_circuits += 1
+            raise DependencyUnavailableError(self.name, "circuit_open")
+
+    def record(self, healthy: bool | None) -> None:
+        """Record the outcome of a call admitted by ``check`` made outside ``call``."""
+        if healthy is False:
+            self.failures += 1
+        self.breaker.record(healthy)
+
+    async def call(self, func: Callable[[], Awaitable[Any]]) -> Any:
+        """Await ``func()`` under the deadline, retries and circuit breaker."""
+        self.check()
+        self.calls += 1
+        self.budget.deposit()
+        healthy = None
+        try:
+            async with asyncio.timeout(self.timeout):
+                result = await self._attempts(func)
+            healthy = True
+            return result
+        except TimeoutError as e:
+            healthy = False
+            self.timeouts += 1
+            raise DependencyUnavailableError(self.name, "timeout") from e
+        except Exception as e:
+            healthy = not self.retryable(e)
+            if healthy:
+                raise
+            raise DependencyUnavailableError(self.name, "error") from e
+        finally:
+            self.record(healthy)
+
+    def stats(self) -> dict:
+        return {
+            "state": self.breaker.state.value,
+            "consecutive_failures": self.breaker.consecutive_failures,
+            "opens": self.breaker.opens,
+            "calls": self.calls,
+            "retries": self.retries,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "short_circuits": self.short_circuits,
+            "retry_tokens": self.budget.tokens,
+        }
+
+
+class DependencyRegistry:
+    """
+    The outbound dependencies of the app, each with its own ``Dependency``.
+
+    ``register`` applies the defaults from ``ResilienceSettings`` and the
+    per-dependency overrides, and ``stats`` exposes every dependency for
+    ``/metrics``.
+    """
+
+    def __init__(
+        self,
+        defaults: dict[str, Any] | None = None,
+        overrides: dict[str, dict[str, Any]] | None = None,
+    ):
+        self.defaults = defaults or {}
+        self.overrides = overrides or {}
+        self.dependencies: dict[str, Dependency] = {}
+
+    def register(self, name: str, **options: Any) -> Dependency:
+        dependency = Dependency(
+            name, **{**self.defaults, **options, **self.overrides.get(name, {})}
+        )
+        self.dependencies[name] = dependency
+        return dependency
+
+    def stats(self) -> dict:
+        return {name: d.stats() for name, d in self.dependencies.items()}
+
+
+dependencies = DependencyRegistry(
+    defaults={
+        "timeout": resilience_settings.resilience_timeout,
+        "max_attempts": resilience_settings.resilience_max_attempts,
+        "retry_base_delay": resilience_settings.resilience_retry_base_delay,
+        "retry_max_delay": resilience_settings.resilience_retry_max_delay,
+        "retry_ratio": resilience_settings.resilience_retry_ratio,
+        "failure_threshold": resilience_settings.resilience_failure_threshold,
+        "reset_timeout": resilience_settings.resilience_reset_timeout,
+    },
+    overrides={
+        name: override.model_dump(exclude_none=True)
+        for name, override in resilience_settings.resilience_overrides.items()
+    },
+)
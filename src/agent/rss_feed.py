@@ -0,0 +1,167 @@
+import asyncio
+import time
+
+import feedparser
+from clients import get_http_client, run_blocking
+from models import RssItem
+from resilience import Dependency
+from rss_index import RssIndex
+from utils import logger
+
+
+def _parse_items(content: bytes) -> list[RssItem]:
+    feed = feedparser.parse(content)
+    return [RssItem.from_entry(entry) for entry in feed.entries]
+
+
+def _merge_index(feeds: list[list[RssItem]]) -> RssIndex:
+    """De-duplicate entries by link across feeds and index them by recency."""
+    merged: dict[str, RssItem] = {}
+    for items in feeds:
+        for item in items:
+            merged.setdefault(item.link or f"{item.title}\n{item.published}", item)
+    return RssIndex(list(merged.values()))
+
+
+class _FeedState:
+    def __init__(self, url: str):
+        self.url = url
+        self.items: list[RssItem] = []
+        self.etag: str | None = None
+        self.last_modified: str | None = None
+
+
+class RssFeedCache:
+    """
+    In-memory snapshot of one or more RSS feeds refreshed in the background.
+
+    All feeds are fetched concurrently, each with its own ``timeout``, so a
+    refresh takes as long as the slowest feed rather than the sum; a failing
+    feed keeps serving its previous entries. Refreshes use ETag / Last-Modified
+    conditional requests, so an unchanged feed costs a 304 and no parsing.
+    Entries are merged, de-duplicated by link and indexed once (see
+    ``RssIndex``); tool calls query the index and never touch the network once
+    the first refresh has completed. With ``dependency`` each fetch runs under
+    its deadline, retries and circuit breaker instead of ``timeout``.
+    """
+
+    def __init__(
+        self,
+        urls: list[str],
+        refresh_interval: float = 300.0,
+        timeout: float = 5.0,
+        dependency: Dependency | None = None,
+    ):
+        self.feeds = [_FeedState(url) for url in urls]
+        self.refresh_interval = refresh_interval
+        self.timeout = timeout
+        self.dependency = dependency
+        self.index = RssIndex([])
+        self.fetched_at: float | None = None
+        self._task: asyncio.Task | None = None
+        # バックグラウンドの更新と初回の get_index が同時に全フィードを取得しないようにする
+        self._refresh_lock = asyncio.Lock()
+
+        self.refreshes = 0
+        self.not_modified = 0
+        self.errors = 0
+
+    async def _fetch(self, feed: _FeedState) -> bool:
+        """Fetch one feed; return True when its entries changed."""
+        headers = {}
+        if feed.etag:
+            headers["If-None-Match"] = feed.etag
+        if feed.last_modified:
+            headers["If-Modified-Since"] = feed.last_modified
+
+        response = await get_http_client().get(feed.url, headers=headers)
+        if response.status_code == 304:
+            self.not_modified += 1
+            return False
+        response.raise_for_status()
+
+        feed.items = await run_blocking(_parse_items, response.content)
+        feed.etag = response.headers.get("ETag")
+        feed.last_modified = response.headers.get("Last-Modified")
+        return True
+
+    async def _guarded_fetch(self, feed: _FeedState) -> bool:
+        if self.dependency is None:
+            return await asyncio.wait_for(self._fetch(feed), self.timeout)
+        return await self.dependency.call(lambda: self._fetch(feed))
+
+    async def refresh(self) -> None:
+        """
+        Fetch every feed that changed since the last refresh and re-index.
+
+        Failed feeds keep their previous entries; when every feed fails before
+        anything was cached, the index stays empty until the next refresh.
+        """
+        results = await asyncio.gather(
+            *(self._guarded_fetch(feed) for feed in self.feeds),
+            return_exceptions=True,
+        )
+
+        for feed, result in zip(self.feeds, results, strict=True):
+            if isinstance(result, BaseException):
+                self.errors += 1
+                logger.warning(
+                    f"Failed to fetch RSS feed: {result!r}",
+                    extra={"url": feed.url},
+                )
+
+        # すべて失敗しても空の結果を返し、次の定期更新で取り直す
+        self.fetched_at = time.time()
+        if not any(result is True for result in results):
+            return
+
+        self.index = await run_blocking(
+            _merge_index, [feed.items for feed in self.feeds]
+        )
+        self.refreshes += 1
+        logger.info(
+            f"Refreshed RSS feeds with {len(self.index)} entries",
+            extra={"feeds": len(self.feeds), "entries": len(self.index)},
+        )
+
+    async def get_index(self) -> RssIndex:
+        """Return the current snapshot, loading it first if nothing is cached yet."""
+        if self.fetched_at is None:
+            async with self._refresh_lock:
+                if self.fetched_at is None:
+                    await self.refresh()
+        return self.index
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                async with self._refresh_lock:
+                    await self.refresh()
+            except Exception:
+                logger.exception("Failed to refresh RSS feeds")
+            await asyncio.sleep(self.refresh_interval)
+
+    def start(self) -> None:
+        """Start refreshing in the background on the running event loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="rss-feed-refresh")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "feeds": len(self.feeds),
+            "entries": len(self.index),
+            "age_seconds": time.time() - self.fetched_at if self.fetched_at else None,
+            "refreshes": self.refreshes,
+            "not_modified": self.not_modified,
+            "errors": self.errors,
+        }
@@ -0,0 +1,159 @@
+import heapq
+import re
+import unicodedata
+from collections.abc import Iterable, Iterator, Sequence
+from email.utils import parsedate_to_datetime
+
+from models import RssItem
+
+# 英数字は単語単位、日本語（かな・漢字など）は文字 bi-gram 単位で索引する
+_TOKEN_PATTERN = re.compile(r"[0-9a-z]+|[^\W0-9a-z_]+")
+_ASCII_WORD = re.compile(r"[0-9a-z]+")
+_GRAM_SIZE = 3
+
+
+def normalize_text(text: str) -> str:
+    return unicodedata.normalize("NFKC", text).lower()
+
+
+def tokenize(text: str) -> list[str]:
+    """Split normalized text into ASCII words and CJK character bigrams."""
+    tokens = []
+    for run in _TOKEN_PATTERN.findall(text):
+        if _ASCII_WORD.fullmatch(run) or len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i : i + 2] for i in range(len(run) - 1))
+    return tokens
+
+
+def split_keywords(keyword: str) -> list[str]:
+    """Split a tool keyword argument into normalized search terms."""
+    return [term for term in re.split(r"[\s,、，]+", normalize_text(keyword)) if term]
+
+
+def _published_timestamp(item: RssItem) -> float:
+    try:
+        return parsedate_to_datetime(item.published).timestamp()
+    except ValueError:
+        return 0.0
+
+
+class RssIndex:
+    """
+    Inverted index over a feed snapshot, built once per refresh.
+
+    Items are stored newest first, so document ids double as recency rank and
+    every posting list is already in rank order. A term matches an item when it
+    occurs as a substring of the lower-cased title or summary, like the previous
+    linear scan. An ASCII word of a term may sit inside a longer indexed word
+    ("db" in "dynamodb"), so it is expanded through a character n-gram index of
+    the vocabulary to every word containing it (words at the edges of the term
+    only need to end or start with it). Queries walk the shortest candidate
+    stream, confirm each candidate and stop after ``max_items``.
+    """
+
+    def __init__(self, items: list[RssItem]):
+        self.items = sorted(items, key=_published_timestamp, reverse=True)
+        self._texts = [
+            normalize_text(f"{item.title}\n{item.summary}") for item in self.items
+        ]
+        self._postings: dict[str, list[int]] = {}
+        for doc_id, text in enumerate(self._texts):
+            for token in set(tokenize(text)):
+                self._postings.setdefault(token, []).append(doc_id)
+        # 英単語の1〜3文字の部分文字列 -> その部分文字列を含む単語
+        self._word_grams: dict[str, set[str]] = {}
+        for word in self._postings:
+            if _ASCII_WORD.fullmatch(word):
+                for gram in _grams(word):
+                    self._word_grams.setdefault(gram, set()).add(word)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def _words_containing(self, token: str) -> Iterable[str]:
+        if len(token) <= _GRAM_SIZE:
+            return self._word_grams.get(token, ())
+        sets = [
+            self._word_grams.get(token[i : i + _GRAM_SIZE], set())
+            for i in range(len(token) - _GRAM_SIZE + 1)
+        ]
+        candidates = set.intersection(*sorted(sets, key=len))
+        return (word for word in candidates if token in word)
+
+    def _token_postings(
+        self, token: str, is_first: bool, is_last: bool
+    ) -> list[Sequence[int]]:
+        is_word = _ASCII_WORD.fullmatch(token) is not None
+        if len(token) == 1 and not is_word:
+            # 1文字の日本語は bi-gram に現れないため全件を候補にして部分一致で確認する
+            return [range(len(self.items))]
+        if not is_word or not (is_first or is_last):
+            # 前後に別のトークンがある英単語は単語全体として現れる
+            return [self._postings.get(token, [])]
+        # 語の途中に現れうる英単語は、それを含む単語すべてに展開する
+        # （"db" -> "dynamodb"、末尾なら前方一致 "lamb" -> "lambda"、先頭なら後方一致）
+        words = self._words_containing(token)
+        if not is_first:
+            words = (word for word in words if word.startswith(token))
+        elif not is_last:
+            words = (word for word in words if word.endswith(token))
+        return [self._postings[word] for word in words]
+
+    def _term_candidates(self, term: str) -> tuple[int, Iterable[int]]:
+        """Shortest candidate stream for ``term`` as ``(size, ascending doc ids)``."""
+        tokens = tokenize(term)
+        if not tokens:
+            return len(self.items), range(len(self.items))
+
+        best: list[Sequence[int]] | None = None
+        best_size = 0
+        for index, token in enumerate(tokens):
+            postings = self._token_postings(token, index == 0, index == len(tokens) - 1)
+            size = sum(len(docs) for docs in postings)
+            if best is None or size < best_size:
+                best, best_size = postings, size
+        if len(best) == 1:
+            return best_size, best[0]
+        return best_size, _unique(heapq.merge(*best))
+
+    def search(
+        self, keyword: str, max_items: int, match_all: bool = True
+    ) -> list[RssItem]:
+        """Return up to ``max_items`` matching items, newest first."""
+        terms = split_keywords(keyword)
+        if not terms:
+            return self.items[:max_items]
+
+        candidates = [self._term_candidates(term) for term in terms]
+        if match_all:
+            doc_ids = min(candidates, key=lambda candidate: candidate[0])[1]
+        else:
+            doc_ids = _unique(heapq.merge(*(docs for _, docs in candidates)))
+
+        matches = all if match_all else any
+        result_items: list[RssItem] = []
+        for doc_id in doc_ids:
+            text = self._texts[doc_id]
+            if matches(term in text for term in terms):
+                result_items.append(self.items[doc_id])
+                if len(result_items) >= max_items:
+                    break
+        return result_items
+
+
+def _grams(word: str) -> set[str]:
+    return {
+        word[i : i + n]
+        for n in range(1, _GRAM_SIZE + 1)
+        for i in range(len(word) - n + 1)
+    }
+
+
+def _unique(doc_ids: Iterable[int]) -> Iterator[int]:
+    previous = -1
+    for doc_id in doc_ids:
+        if doc_id != previous:
+            yield doc_id
+            previous = doc_id
@@ -0,0 +1,226 @@
+import copy
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+from bedrock_agentcore.memory.integrations.strands.bedrock_converter import (
+    AgentCoreMemoryConverter,
+)
+from bedrock_agentcore.memory.integrations.strands.config import AgentCoreMemoryConfig
+from bedrock_agentcore.memory.integrations.strands.session_manager import (
+    AgentCoreMemorySessionManager,
+)
+from settings import memory_settings
+from strands.agent.agent import Agent
+from strands.types.session import Session, SessionAgent, SessionMessage
+from utils import logger
+
+SessionKey = tuple[str, str]
+
+
+class _SessionEntry:
+    def __init__(self, expires_at: float):
+        self.expires_at = expires_at
+        self.session: Session | None = None
+        self.agents: dict[str, SessionAgent] = {}
+        # agent_id ごとの会話履歴。None のエージェントは未取得
+        self.messages: dict[str, list[SessionMessage]] = {}
+
+
+class SessionHistoryCache:
+    """
+    Bounded in-process cache of hydrated AgentCore Memory sessions.
+
+    Keyed by ``(actor_id, session_id)`` and evicted by LRU size and TTL. Each
+    entry holds the session record, the latest agent record (its
+    ``updated_at`` is the version) and the message history, kept current by
+    write-through from ``CachedAgentCoreMemorySessionManager``.
+    """
+
+    def __init__(self, max_sessions: int = 1024, ttl: float = 3600):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.lock = threading.RLock()
+        self._entries: OrderedDict[SessionKey, _SessionEntry] = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key: SessionKey) -> _SessionEntry | None:
+        with self.lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def entry(self, key: SessionKey) -> _SessionEntry:
+        """Return the entry for ``key``, creating an empty one if needed."""
+        with self.lock:
+            entry = self.get(key)
+            if entry is None:
+                entry = _SessionEntry(time.time() + self.ttl)
+                self._entries[key] = entry
+                while len(self._entries) > self.max_sessions:
+                    self._entries.popitem(last=False)
+            entry.expires_at = time.time() + self.ttl
+            return entry
+
+    def invalidate(self, key: SessionKey) -> None:
+        with self.lock:
+            if self._entries.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "sessions": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "invalidations": self.invalidations,
+        }
+
+
+class CachedAgentCoreMemorySessionManager(AgentCoreMemorySessionManager):
+    """
+    ``AgentCoreMemorySessionManager`` that serves session reads from a ``SessionHistoryCache``.
+
+    On a follow-up turn the only AgentCore Memory read is the latest agent
+    record, used as a version check: if its ``updated_at`` differs from the
+    cached one (another writer touched the session) the entry is dropped and
+    rehydrated. New sessions, agents and messages are written through to the
+    cache after AgentCore Memory accepts them.
+    """
+
+    def __init__(
+        self,
+        agentcore_memory_config: AgentCoreMemoryConfig,
+        cache: SessionHistoryCache,
+        **kwargs: Any,
+    ):
+        # 親クラスの __init__ が read_session を呼ぶため先にキャッシュを設定する
+        self._cache = cache
+        self._cache_key = (
+            agentcore_memory_config.actor_id,
+            agentcore_memory_config.session_id,
+        )
+        super().__init__(agentcore_memory_config, **kwargs)
+
+    def _entry(self, session_id: str) -> _SessionEntry | None:
+        if session_id != self.config.session_id:
+            return None
+        return self._cache.entry(self._cache_key)
+
+    def read_session(self, session_id: str, **kwargs: Any) -> Session | None:
+        entry = self._entry(session_id)
+        if entry is not None and entry.session is not None:
+            return entry.session
+        session = super().read_session(session_id, **kwargs)
+        if entry is not None and session is not None:
+            entry.session = session
+        return session
+
+    def create_session(self, session: Session, **kwargs: Any) -> Session:
+        session = super().create_session(session, **kwargs)
+        self._cache.entry(self._cache_key).session = session
+        return session
+
+    def read_agent(
+        self, session_id: str, agent_id: str, **kwargs: Any
+    ) -> SessionAgent | None:
+        entry = self._entry(session_id)
+        if entry is not None and agent_id in entry.agents:
+            return copy.deepcopy(entry.agents[agent_id])
+        session_agent = super().read_agent(session_id, agent_id, **kwargs)
+        if entry is not None and session_agent is not None:
+            entry.agents[agent_id] = copy.deepcopy(session_agent)
+        return session_agent
+
+    def create_agent(
+        self, session_id: str, session_agent: SessionAgent, **kwargs: Any
+    ) -> None:
+        super().create_agent(session_id, session_agent, **kwargs)
+        entry = self._entry(session_id)
+        if entry is not None:
+            with self._cache.lock:
+                if session_agent.agent_id not in entry.agents:
+                    # 新規エージェントの履歴は空から書き込みで積み上げる
+                    entry.messages.setdefault(session_agent.agent_id, [])
+                entry.agents[session_agent.agent_id] = copy.deepcopy(session_agent)
+
+    def create_message(
+        self,
+        session_id: str,
+        agent_id: str,
+        session_message: SessionMessage,
+        **kwargs: Any,
+    ) -> dict[str, Any] | None:
+        try:
+            event = super().create_message(
+                session_id, agent_id, session_message, **kwargs
+            )
+        except Exception:
+            self._cache.invalidate(self._cache_key)
+            raise
+        # AgentCore Memory に保存される形（空テキストを除いたもの）でキャッシュする
+        payload = AgentCoreMemoryConverter.message_to_payload(session_message)
+        entry = self._entry(session_id)
+        if entry is not None and payload:
+            with self._cache.lock:
+                messages = entry.messages.get(agent_id)
+                if messages is not None:
+                    messages.append(SessionMessage.from_dict(json.loads(payload[0][0])))
+        return event
+
+    def list_messages(
+        self,
+        session_id: str,
+        agent_id: str,
+        limit: int | None = None,
+        offset: int = 0,
+        **kwargs: Any,
+    ) -> list[SessionMessage]:
+        entry = self._entry(session_id)
+        end = offset + limit if limit is not None else None
+        # run_blocking のスレッドからも呼ばれるため、カウンターと履歴はロックの中で扱う
+        with self._cache.lock:
+            messages = entry.messages.get(agent_id) if entry is not None else None
+            if messages is not None:
+                self._cache.hits += 1
+                return copy.deepcopy(messages[offset:end])
+            self._cache.misses += 1
+
+        messages = super().list_messages(session_id, agent_id, **kwargs)
+        # 取得失敗時も空リストが返るため、空の履歴はキャッシュしない
+        if entry is not None and messages:
+            with self._cache.lock:
+                entry.messages[agent_id] = messages
+        return copy.deepcopy(messages[offset:end])
+
+    def initialize(self, agent: Agent, **kwargs: Any) -> None:
+        entry = self._cache.get(self._cache_key)
+        cached = entry.agents.get(agent.agent_id) if entry is not None else None
+        if cached is not None:
+            latest = super().read_agent(self.session_id, agent.agent_id)
+            if latest is None or latest.updated_at != cached.updated_at:
+                logger.info(
+                    "Session history changed outside this process, reloading",
+                    extra={"session_id": self.session_id},
+                )
+                self._cache.invalidate(self._cache_key)
+                if latest is not None:
+                    self._cache.entry(self._cache_key).agents[agent.agent_id] = latest
+        super().initialize(agent, **kwargs)
+
+
+session_history_cache = SessionHistoryCache(
+    max_sessions=memory_settings.memory_cache_size,
+    ttl=memory_settings.memory_cache_ttl,
+)
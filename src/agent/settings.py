@@ -1,30 +1,111 @@
 import json
 import os
 from functools import cached_property
+from typing import Literal, Self
 
 from aws_lambda_powertools.utilities import parameters
 from dotenv import load_dotenv
+from pydantic import BaseModel, model_validator
 from pydantic_settings import BaseSettings
 from strands.models import BedrockModel
+from strands.types.content import SystemContentBlock
 
 # .envファイルの内容を読み込む
 load_dotenv(".env")
 
 
+DEFAULT_MODEL_PROFILE = "default"
+
+
 def is_local() -> bool:
     return os.getenv("IS_LOCAL") == "True"
 
 
+class ModelProfile(BaseModel):
+    """Named model configuration; unset fields fall back to ``ModelSettings``."""
+
+    model_id: str | None = None
+    max_tokens: int | None = None
+    temperature: float | None = None
+    top_p: float | None = None
+
+
 class ModelSettings(BaseSettings):
     model_id: str
     max_tokens: int = 2048
-    temperature: float = 0.7
-    top_p: float = 0.9
+    # 未指定ならリクエストに含めずモデルの既定値を使う
+    # （Claude Sonnet 4.5 などは temperature と top_p の同時指定を受け付けない）
+    temperature: float | None = None
+    top_p: float | None = None
+
+    # 名前付きのモデル設定（例: {"router": {"model_id": "apac.amazon.nova-lite-v1:0", "max_tokens": 512}}）
+    model_profiles: dict[str, ModelProfile] = {}
+    # エージェント名ごとに使うプロファイル（例: {"main_agent": "router", "weather_agent": "router"}）
+    agent_model_profiles: dict[str, str] = {}
+
+    # Bedrock のプロンプトキャッシュ（システムプロンプトとツール定義の後ろにキャッシュポイントを置く）
+    prompt_cache_enabled: bool = False
+    # エージェント名ごとの上書き（例: {"main_agent": true, "search_agent": false}）
+    prompt_cache_agents: dict[str, bool] = {}
+
+    @model_validator(mode="after")
+    def _check_profile_references(self) -> Self:
+        # プールのサブエージェントは最初の貸し出しまで作られないため、設定の誤りは起動時に検出する
+        unknown = {
+            agent_name: profile
+            for agent_name, profile in self.agent_model_profiles.items()
+            if profile != DEFAULT_MODEL_PROFILE and profile not in self.model_profiles
+        }
+        if unknown:
+            raise ValueError(
+                f"Unknown model profiles in agent_model_profiles: {unknown}"
+            )
+        return self
+
+    def prompt_cache_enabled_for(self, agent_name: str) -> bool:
+        return self.prompt_cache_agents.get(agent_name, self.prompt_cache_enabled)
+
+    def profile_name_for(self, agent_name: str) -> str:
+        return self.agent_model_profiles.get(agent_name, DEFAULT_MODEL_PROFILE)
 
-    def get_model(self) -> BedrockModel:
-        return BedrockModel(
+    def get_profile(self, name: str = DEFAULT_MODEL_PROFILE) -> ModelProfile:
+        """Resolve the profile ``name`` over the defaults (unset sampling fields stay None)."""
+        default = ModelProfile(
             model_id=self.model_id,
+            max_tokens=self.max_tokens,
+            temperature=self.temperature,
+            top_p=self.top_p,
         )
+        if name == DEFAULT_MODEL_PROFILE:
+            return default
+        if name not in self.model_profiles:
+            raise ValueError(f"Unknown model profile: {name}")
+        return default.model_copy(
+            update=self.model_profiles[name].model_dump(exclude_none=True)
+        )
+
+    def get_model(
+        self, profile: str = DEFAULT_MODEL_PROFILE, prompt_cache: bool = False
+    ) -> BedrockModel:
+        model_config = self.get_profile(profile).model_dump(exclude_none=True)
+        if prompt_cache:
+            return BedrockModel(**model_config, cache_tools="default")
+        return BedrockModel(**model_config)
+
+    def get_agent_model(self, agent_name: str) -> BedrockModel:
+        """Model configured for ``agent_name`` (its profile and prompt caching)."""
+        return self.get_model(
+            self.profile_name_for(agent_name),
+            prompt_cache=self.prompt_cache_enabled_for(agent_name),
+        )
+
+    def system_prompt(
+        self, agent_name: str, text: str
+    ) -> str | list[SystemContentBlock]:
+        """Return ``text`` with a cache point after it when caching is enabled for the agent."""
+        if not self.prompt_cache_enabled_for(agent_name):
+            return text
+        return [{"text": text}, {"cachePoint": {"type": "default"}}]
 
 
 class TavilySettings(BaseSettings):
@@ -39,11 +120,32 @@ class TavilySettings(BaseSettings):
 class AwsRssSettings(BaseSettings):
     rss_default_items: int = 10
     rss_max_items: int = 100
-    rss_url: str = "https://aws.amazon.com/about-aws/whats-new/recent/feed/"
+    # What's New / AWS News Blog / Security Bulletins
+    rss_urls: list[str] = [
+        "https://aws.amazon.com/about-aws/whats-new/recent/feed/",
+        "https://aws.amazon.com/blogs/aws/feed/",
+        "https://aws.amazon.com/security/security-bulletins/rss/feed/",
+    ]
+    rss_refresh_interval: float = 300.0
+    rss_feed_timeout: float = 5.0
+
+
+class WeatherSettings(BaseSettings):
+    weather_api_url: str = "https://api.open-meteo.com/v1/forecast"
+    geocoder_user_agent: str = "time-weather-agent"
+    geocoder_timeout: float = 10.0
+    # Nominatim の利用規約上、1リクエスト/秒を超えないようにする
+    geocoder_min_interval: float = 1.0
+    geocode_cache_size: int = 1024
+    geocode_cache_ttl: float = 30 * 24 * 3600
+    geocode_negative_ttl: float = 3600
+    geocode_cache_path: str | None = None
 
 
 class AgentCoreMemorySettings(BaseSettings):
     memory_id: str
+    memory_cache_size: int = 1024
+    memory_cache_ttl: float = 3600
 
 
 class KnowledgeBaseSettings(BaseSettings):
@@ -51,6 +153,12 @@ class KnowledgeBaseSettings(BaseSettings):
     kb_model_id: str
     bedrock_kb_id: str
     kb_result_nums: int = 5
+    # retrieve: 検索結果をそのままサブエージェントに返し、KB 側の回答生成を省く
+    kb_mode: Literal["retrieve_and_generate", "retrieve"] = "retrieve_and_generate"
+    kb_cache_size: int = 512
+    kb_cache_ttl: float = 3600
+    # 0〜1 の類似度（文字 3-gram の Jaccard 係数）。未指定なら完全一致のみ
+    kb_similarity_threshold: float | None = None
 
 
 class EstateKnowledgeBaseSettings(BaseSettings):
@@ -59,16 +167,137 @@ class EstateKnowledgeBaseSettings(BaseSettings):
     bedrock_kb_id: str
     bedrock_estate_kb_id: str
     estate_kb_result_nums: int = 5
+    estate_kb_mode: Literal["retrieve_and_generate", "retrieve"] = (
+        "retrieve_and_generate"
+    )
+    estate_kb_cache_size: int = 512
+    estate_kb_cache_ttl: float = 3600
+    estate_kb_similarity_threshold: float | None = None
+
+
+class CompactionSettings(BaseSettings):
+    # 復元した会話履歴の上限（推定トークン数。システムプロンプトとツール定義は含まない）
+    # 未指定なら圧縮せず、モデルがコンテキスト超過を返した時だけ古いターンを落とす
+    compaction_token_budget: int | None = None
+    # 溢れたターンをモデルで要約して残す
+    compaction_summarize: bool = False
+    compaction_summary_max_tokens: int = 512
 
 
 class LogSettings(BaseSettings):
     log_table_name: str
+    # DynamoDB Local などを使う場合のみ指定する
+    log_table_host: str | None = None
+    log_queue_size: int = 1000
+    log_batch_size: int = 25
+    log_flush_interval: float = 1.0
+    log_drop_policy: Literal["drop_newest", "drop_oldest", "block"] = "drop_newest"
+    log_enqueue_timeout: float = 0.1
+    log_max_retries: int = 5
+    log_retry_base_delay: float = 0.1
+    log_retry_max_delay: float = 5.0
+    log_shutdown_timeout: float = 10.0
+
+
+class HttpClientSettings(BaseSettings):
+    http_timeout: float = 10.0
+    http_max_connections: int = 100
+    http_max_keepalive_connections: int = 20
+    blocking_io_max_workers: int = 16
+
+
+class SubAgentPoolSettings(BaseSettings):
+    sub_agent_pool_size: int = 4
+    sub_agent_pool_prewarm: int = 1
+    sub_agent_pool_checkout_timeout: float = 30.0
+
+
+class SubAgentFanOutSettings(BaseSettings):
+    # 1回の呼び出しで同時に実行するサブエージェント数の上限
+    sub_agent_max_concurrency: int = 4
+    sub_agent_timeout: float = 60.0
+    # サブエージェント名ごとの上書き（例: {"search_agent": 90}）
+    sub_agent_timeouts: dict[str, float] = {}
+
+
+class McpSettings(BaseSettings):
+    mcp_startup_timeout: int = 30
+    mcp_health_check_interval: float = 60.0
+    mcp_health_check_timeout: float = 10.0
+    # MCP ツール呼び出し1回の期限（秒）
+    mcp_tool_timeout: float = 30.0
+
+
+class StartupSettings(BaseSettings):
+    # 起動時に Secrets Manager・AWS クライアント・MCP セッション・プールのエージェントを並列に準備する
+    # False なら初回のリクエストで必要になった時に準備する
+    startup_warmup: bool = True
+
+
+class ToolRoutingSettings(BaseSettings):
+    # direct: 天気と AWS RSS はサブエージェントを介さずメインエージェントがツールを直接呼ぶ
+    tool_routing_mode: Literal["sub_agent", "direct"] = "sub_agent"
+
+
+class AdmissionSettings(BaseSettings):
+    # 同時に実行する呼び出しの上限（超えた分は待ち行列で待つ）
+    admission_max_in_flight: int = 32
+    # actor_id ごとに実行中・待機中にできる呼び出しの上限
+    admission_max_per_actor: int = 4
+    admission_max_queue: int = 64
+    admission_queue_timeout: float = 5.0
+    # 429 の Retry-After ヘッダー（秒）
+    admission_retry_after: int = 5
+
+
+class DependencyOverride(BaseModel):
+    """Per-dependency resilience options; unset fields fall back to ``ResilienceSettings``."""
+
+    timeout: float | None = None
+    max_attempts: int | None = None
+    retry_base_delay: float | None = None
+    retry_max_delay: float | None = None
+    retry_ratio: float | None = None
+    failure_threshold: int | None = None
+    reset_timeout: float | None = None
+
+
+class ResilienceSettings(BaseSettings):
+    # 外部依存ごとの既定値。timeout は再試行を含めた1回の呼び出し全体の期限（秒）
+    resilience_timeout: float = 10.0
+    resilience_max_attempts: int = 3
+    resilience_retry_base_delay: float = 0.1
+    resilience_retry_max_delay: float = 2.0
+    # 再試行できるのは呼び出し数のこの割合まで
+    resilience_retry_ratio: float = 0.2
+    # 連続でこの回数失敗したらサーキットを開き、reset_timeout 秒後に1件だけ試す
+    resilience_failure_threshold: int = 5
+    resilience_reset_timeout: float = 30.0
+    # 依存先ごとの上書き（例: {"weather_api": {"timeout": 5}}）
+    resilience_overrides: dict[str, DependencyOverride] = {}
+
+
+class StreamSettings(BaseSettings):
+    # coalesce_deltas を指定したリクエストでテキスト差分をまとめる条件
+    stream_coalesce_max_chars: int = 512
+    stream_coalesce_window: float = 0.03
 
 
 model_settings = ModelSettings()
 tavily_settings = TavilySettings()
 aws_rss_settings = AwsRssSettings()
+weather_settings = WeatherSettings()
 memory_settings = AgentCoreMemorySettings()
 knowledge_base_settings = KnowledgeBaseSettings()
 estate_knowledge_base_settings = EstateKnowledgeBaseSettings()
+compaction_settings = CompactionSettings()
 log_settings = LogSettings()
+http_client_settings = HttpClientSettings()
+sub_agent_pool_settings = SubAgentPoolSettings()
+sub_agent_fan_out_settings = SubAgentFanOutSettings()
+stream_settings = StreamSettings()
+admission_settings = AdmissionSettings()
+resilience_settings = ResilienceSettings()
+tool_routing_settings = ToolRoutingSettings()
+mcp_settings = McpSettings()
+startup_settings = StartupSettings()
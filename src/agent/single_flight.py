@@ -0,0 +1,45 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any
+
+
+class SingleFlight:
+    """
+    Concurrent calls for the same key share one in-flight call.
+
+    The first caller (the leader) runs ``func``; callers arriving while it
+    runs wait for its result or exception. If the leader is cancelled, the
+    waiting callers are not left hanging: the next one runs ``func`` itself.
+    """
+
+    def __init__(self):
+        self._inflight: dict[Hashable, asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    async def run(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        while (pending := self._inflight.get(key)) is not None:
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                # 取り消されたのが自分ではなく先頭の呼び出しなら、代わりに実行する
+                if not pending.cancelled():
+                    raise
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await func()
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved when nobody else is waiting
+            raise
+        except BaseException:
+            future.cancel()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._inflight[key]
@@ -0,0 +1,60 @@
+import asyncio
+import time
+from collections.abc import Callable
+from typing import Any
+
+from agent_tools import get_geolocator, get_kb_client, get_tavily_client
+from clients import run_blocking
+from mcp_sessions import mcp_session_manager
+from settings import startup_settings
+from sub_agents import sub_agent_pools
+from utils import logger
+
+
+async def _warm(name: str, func: Callable[[], Any]) -> float | None:
+    """Run the blocking ``func`` off the loop; return its duration, or ``None`` if it failed."""
+    start = time.perf_counter()
+    try:
+        await run_blocking(func)
+    except Exception:
+        # 失敗しても起動は続け、最初に使われた時に改めて準備する
+        logger.exception(f"Warm-up failed: {name}", extra={"warm_up": name})
+        return None
+    return time.perf_counter() - start
+
+
+async def warm_up() -> dict[str, float | None]:
+    """
+    Prepare the lazily created dependencies in parallel.
+
+    The Tavily secret and client, the Knowledge Base client, the geocoder,
+    the MCP sessions and the prewarmed sub-agents are created concurrently on
+    the blocking I/O pool (a sub-agent that needs an MCP session waits for
+    the session being opened). A step that fails is logged and left to be
+    created on first use. Returns the duration of each step in seconds.
+    """
+    start = time.perf_counter()
+    steps: dict[str, Callable[[], Any]] = {
+        "tavily_client": get_tavily_client,
+        "kb_client": get_kb_client,
+        "geolocator": get_geolocator,
+    }
+    steps.update((pool.name, pool.warm) for pool in sub_agent_pools)
+    step_durations, _ = await asyncio.gather(
+        asyncio.gather(*(_warm(name, func) for name, func in steps.items())),
+        mcp_session_manager.start(),
+    )
+    durations = dict(zip(steps, step_durations, strict=True))
+    logger.info(
+        f"Warm-up finished in {time.perf_counter() - start:.2f}s",
+        extra={"warm_up": durations},
+    )
+    return durations
+
+
+async def start_up() -> None:
+    """Warm up the dependencies, or only start the MCP health check when disabled."""
+    if startup_settings.startup_warmup:
+        await warm_up()
+    else:
+        await mcp_session_manager.start(connect=False)
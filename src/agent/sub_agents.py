@@ -1,3 +1,7 @@
+from collections.abc import Callable
+from functools import cache
+
+from agent_pool import AgentPool
 from agent_tools import (
     get_aws_rss_feed,
     get_estate_info,
@@ -7,79 +11,147 @@ from agent_tools import (
     # real_estate_mcp_client,
     tavily_mcp_client,
 )
-from settings import model_settings
+from settings import model_settings, sub_agent_pool_settings
 from strands import Agent
+from strands.models import BedrockModel
 from strands_tools import use_aws
 from strands_tools.current_time import current_time
+from timings import sub_agent_timing_hooks
 
-model = model_settings.get_model()
 
+@cache
+def _shared_model(profile: str, prompt_cache: bool) -> BedrockModel:
+    return model_settings.get_model(profile, prompt_cache=prompt_cache)
 
-weather_agent = Agent(
-    name="weather_agent",
-    model=model,
-    system_prompt=(
-        "You are an agent that provides weather information. You will also tell the current time along with the weather. Use the get_weather tool to get the current weather for a specified city, and the current_time tool to get the current time. Timezone is Asia/Tokyo. Answer in Japanese."
-    ),
-    tools=[get_weather, current_time],
-)
 
+def _model(agent_name: str) -> BedrockModel:
+    """Model for ``agent_name``, shared by the agents with the same profile and caching."""
+    return _shared_model(
+        model_settings.profile_name_for(agent_name),
+        model_settings.prompt_cache_enabled_for(agent_name),
+    )
 
-search_agent = Agent(
-    name="search_agent",
-    model=model,
-    system_prompt=(
-        "You are a web search agent. Use the tavily_mcp_client tool to perform searches on the web. Answer in Japanese."
-    ),
-    tools=[tavily_mcp_client],
-)
 
-goverment_data_agent = Agent(
-    name="goverment_data_agent",
-    model=model,
-    system_prompt=(
-        "You are an agent that provides government data. Use the goverment_mcp_client tool to fetch government data. Answer in Japanese."
-    ),
-    tools=[goverment_mcp_client],
-)
+def create_weather_agent() -> Agent:
+    return Agent(
+        name="weather_agent",
+        model=_model("weather_agent"),
+        system_prompt=model_settings.system_prompt(
+            "weather_agent",
+            "You are an agent that provides weather information. You will also tell the current time along with the weather. Use the get_weather tool to get the current weather for a specified city, and the current_time tool to get the current time. Timezone is Asia/Tokyo. Answer in Japanese.",
+        ),
+        tools=[get_weather, current_time],
+        hooks=[sub_agent_timing_hooks],
+    )
 
 
-aws_rss_agent = Agent(
-    name="aws_rss_agent",
-    model=model,
-    system_prompt=(
-        "You are an agent that fetches AWS-related RSS feed items. Use the get_aws_rss_feed tool to get the latest AWS news based on a keyword. Answer in Japanese."
-    ),
-    tools=[get_aws_rss_feed],
-)
+def create_search_agent() -> Agent:
+    return Agent(
+        name="search_agent",
+        model=_model("search_agent"),
+        system_prompt=model_settings.system_prompt(
+            "search_agent",
+            "You are a web search agent. Use the tavily_mcp_client tool to perform searches on the web. Answer in Japanese.",
+        ),
+        tools=[tavily_mcp_client],
+        hooks=[sub_agent_timing_hooks],
+    )
 
 
-react_agent = Agent(
-    name="react_agent",
-    model=model,
-    system_prompt=(
-        "You are an agent that provides best practices for front-end applications, familiar with React and Next.js. Use the get_frontend_best_practices tool to provide guidance. Answer in Japanese."
-    ),
-    tools=[get_frontend_best_practices],
-)
+def create_goverment_data_agent() -> Agent:
+    return Agent(
+        name="goverment_data_agent",
+        model=_model("goverment_data_agent"),
+        system_prompt=model_settings.system_prompt(
+            "goverment_data_agent",
+            "You are an agent that provides government data. Use the goverment_mcp_client tool to fetch government data. Answer in Japanese.",
+        ),
+        tools=[goverment_mcp_client],
+        hooks=[sub_agent_timing_hooks],
+    )
 
 
-estate_agent = Agent(
-    name="estate_agent",
-    model=model,
-    system_prompt=(
-        "You are an agent that provides information about real estate. Use the get_estate_info tool to fetch real estate information based on user queries. Datasource is formatted as Markdown Table. The 'Data ID' field in referenced Markdown Table must be included. Answer in Japanese."
-    ),
-    tools=[get_estate_info],
-    # tools=[real_estate_mcp_client],
-)
+def create_aws_rss_agent() -> Agent:
+    return Agent(
+        name="aws_rss_agent",
+        model=_model("aws_rss_agent"),
+        system_prompt=model_settings.system_prompt(
+            "aws_rss_agent",
+            "You are an agent that fetches AWS-related RSS feed items. Use the get_aws_rss_feed tool to get the latest AWS news based on a keyword. The feed covers AWS What's New, the AWS News Blog and AWS security bulletins. Answer in Japanese.",
+        ),
+        tools=[get_aws_rss_feed],
+        hooks=[sub_agent_timing_hooks],
+    )
+
+
+def create_react_agent() -> Agent:
+    return Agent(
+        name="react_agent",
+        model=_model("react_agent"),
+        system_prompt=model_settings.system_prompt(
+            "react_agent",
+            "You are an agent that provides best practices for front-end applications, familiar with React and Next.js. Use the get_frontend_best_practices tool to provide guidance. Answer in Japanese.",
+        ),
+        tools=[get_frontend_best_practices],
+        hooks=[sub_agent_timing_hooks],
+    )
 
 
-aws_access_agent = Agent(
-    name="aws_access_agent",
-    model=model,
-    system_prompt=(
-        "You are an agent that provides guidance on AWS access and usage. Use the use_aws tool to provide guidance. If no region is specified, please target ap-northeast-1. If an error occurs, please terminate the process without retrying. Answer in Japanese."
-    ),
-    tools=[use_aws],
+def create_estate_agent() -> Agent:
+    return Agent(
+        name="estate_agent",
+        model=_model("estate_agent"),
+        system_prompt=model_settings.system_prompt(
+            "estate_agent",
+            "You are an agent that provides information about real estate. Use the get_estate_info tool to fetch real estate information based on user queries. Datasource is formatted as Markdown Table. The 'Data ID' field in referenced Markdown Table must be included. Answer in Japanese.",
+        ),
+        tools=[get_estate_info],
+        # tools=[real_estate_mcp_client],
+        hooks=[sub_agent_timing_hooks],
+    )
+
+
+def create_aws_access_agent() -> Agent:
+    return Agent(
+        name="aws_access_agent",
+        model=_model("aws_access_agent"),
+        system_prompt=model_settings.system_prompt(
+            "aws_access_agent",
+            "You are an agent that provides guidance on AWS access and usage. Use the use_aws tool to provide guidance. If no region is specified, please target ap-northeast-1. If an error occurs, please terminate the process without retrying. Answer in Japanese.",
+        ),
+        tools=[use_aws],
+        hooks=[sub_agent_timing_hooks],
+    )
+
+
+def _create_pool(name: str, factory: Callable[[], Agent]) -> AgentPool:
+    return AgentPool(
+        name=name,
+        factory=factory,
+        max_size=sub_agent_pool_settings.sub_agent_pool_size,
+        prewarm=sub_agent_pool_settings.sub_agent_pool_prewarm,
+        checkout_timeout=sub_agent_pool_settings.sub_agent_pool_checkout_timeout,
+    )
+
+
+# 各サブエージェントはリクエストごとにプールから貸し出し、会話履歴を共有しない
+# （prewarm 分のエージェントは起動時のウォームアップで作る）
+weather_agent_pool = _create_pool("weather_agent", create_weather_agent)
+search_agent_pool = _create_pool("search_agent", create_search_agent)
+goverment_data_agent_pool = _create_pool(
+    "goverment_data_agent", create_goverment_data_agent
+)
+aws_rss_agent_pool = _create_pool("aws_rss_agent", create_aws_rss_agent)
+react_agent_pool = _create_pool("react_agent", create_react_agent)
+estate_agent_pool = _create_pool("estate_agent", create_estate_agent)
+aws_access_agent_pool = _create_pool("aws_access_agent", create_aws_access_agent)
+
+sub_agent_pools = (
+    weather_agent_pool,
+    search_agent_pool,
+    goverment_data_agent_pool,
+    aws_rss_agent_pool,
+    react_agent_pool,
+    estate_agent_pool,
+    aws_access_agent_pool,
 )
@@ -0,0 +1,180 @@
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+from strands.agent.agent_result import AgentResult
+from strands.hooks import (
+    AfterModelCallEvent,
+    AfterToolCallEvent,
+    BeforeModelCallEvent,
+    BeforeToolCallEvent,
+    HookProvider,
+    HookRegistry,
+)
+
+
+class InvocationTimings:
+    """
+    Latency breakdown of one invocation.
+
+    Spans are aggregated by stage name into a count and the total and maximum
+    milliseconds, so repeated stages (several model calls, parallel tool
+    calls) stay one entry each. The token usage of every sub-agent and the
+    time to the first streamed token are kept alongside.
+    """
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.time_to_first_token_ms: float | None = None
+        # stage -> [count, total_ms, max_ms]
+        self.stages: dict[str, list[float]] = {}
+        self.sub_agents: dict[str, dict[str, float]] = {}
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started_at) * 1000
+
+    def record(self, stage: str, elapsed_ms: float) -> None:
+        entry = self.stages.get(stage)
+        if entry is None:
+            self.stages[stage] = [1, elapsed_ms, elapsed_ms]
+        else:
+            entry[0] += 1
+            entry[1] += elapsed_ms
+            entry[2] = max(entry[2], elapsed_ms)
+
+    def first_token(self) -> None:
+        """Mark the first streamed token (only the first call counts)."""
+        if self.time_to_first_token_ms is None:
+            self.time_to_first_token_ms = self.elapsed_ms()
+
+    def record_sub_agent(self, name: str, result: AgentResult) -> None:
+        """Add the token usage and model latency of a sub-agent run."""
+        usage = result.metrics.accumulated_usage
+        totals = self.sub_agents.setdefault(
+            name,
+            {
+                "calls": 0,
+                "input_tokens": 0,
+                "output_tokens": 0,
+                "total_tokens": 0,
+                "model_ms": 0,
+            },
+        )
+        totals["calls"] += 1
+        totals["input_tokens"] += usage.get("inputTokens", 0)
+        totals["output_tokens"] += usage.get("outputTokens", 0)
+        totals["total_tokens"] += usage.get("totalTokens", 0)
+        totals["model_ms"] += result.metrics.accumulated_metrics.get("latencyMs", 0)
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "total_ms": round(self.elapsed_ms(), 1),
+            "time_to_first_token_ms": (
+                None
+                if self.time_to_first_token_ms is None
+                else round(self.time_to_first_token_ms, 1)
+            ),
+            "stages": {
+                stage: {
+                    "count": int(count),
+                    "total_ms": round(total_ms, 1),
+                    "max_ms": round(max_ms, 1),
+                }
+                for stage, (count, total_ms, max_ms) in self.stages.items()
+            },
+            "sub_agents": self.sub_agents,
+        }
+
+
+# 呼び出し単位の計測。ツールのタスクやスレッドは呼び出し元のコンテキストを引き継ぐ
+_current_timings: ContextVar[InvocationTimings | None] = ContextVar(
+    "invocation_timings", default=None
+)
+
+
+def start_timings() -> InvocationTimings:
+    """Start measuring the invocation running in the current task."""
+    timings = InvocationTimings()
+    _current_timings.set(timings)
+    return timings
+
+
+def current_timings() -> InvocationTimings | None:
+    return _current_timings.get()
+
+
+@contextmanager
+def span(stage: str) -> Iterator[None]:
+    """Time the ``with`` block as ``stage`` of the current invocation, if any."""
+    timings = _current_timings.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.record(stage, (time.perf_counter() - start) * 1000)
+
+
+class TimingHooks(HookProvider):
+    """
+    Times the model calls and tool calls of an agent.
+
+    Main agent stages are ``model.<agent>`` and ``tool.<name>``; with
+    ``sub_agent`` they are ``sub_agent.<agent>.model`` and
+    ``sub_agent.<agent>.tool.<name>``, nested under the ``sub_agent.<agent>``
+    span of ``invoke_sub_agent``. Stateless apart from the start times of
+    calls in flight, so one instance can be shared by every agent.
+    """
+
+    def __init__(self, sub_agent: bool = False):
+        self.sub_agent = sub_agent
+        self._started: dict[Any, float] = {}
+
+    def register_hooks(self, registry: HookRegistry, **kwargs: Any) -> None:
+        registry.add_callback(BeforeModelCallEvent, self._before_model_call)
+        registry.add_callback(AfterModelCallEvent, self._after_model_call)
+        registry.add_callback(BeforeToolCallEvent, self._before_tool_call)
+        registry.add_callback(AfterToolCallEvent, self._after_tool_call)
+
+    def _model_stage(self, agent_name: str) -> str:
+        if self.sub_agent:
+            return f"sub_agent.{agent_name}.model"
+        return f"model.{agent_name}"
+
+    def _tool_stage(self, agent_name: str, tool_name: str) -> str:
+        if self.sub_agent:
+            return f"sub_agent.{agent_name}.tool.{tool_name}"
+        return f"tool.{tool_name}"
+
+    def _stop(self, key: Any, stage: str) -> None:
+        start = self._started.pop(key, None)
+        timings = _current_timings.get()
+        if start is not None and timings is not None:
+            timings.record(stage, (time.perf_counter() - start) * 1000)
+
+    def _before_model_call(self, event: BeforeModelCallEvent) -> None:
+        # 1つのエージェントのモデル呼び出しは並行しない
+        self._started[id(event.agent)] = time.perf_counter()
+
+    def _after_model_call(self, event: AfterModelCallEvent) -> None:
+        self._stop(id(event.agent), self._model_stage(event.agent.name))
+
+    def _before_tool_call(self, event: BeforeToolCallEvent) -> None:
+        # 同じインスタンスを共有するエージェント間で toolUseId が重なっても混ざらないようにする
+        key = (id(event.agent), event.tool_use["toolUseId"])
+        self._started[key] = time.perf_counter()
+
+    def _after_tool_call(self, event: AfterToolCallEvent) -> None:
+        self._stop(
+            (id(event.agent), event.tool_use["toolUseId"]),
+            self._tool_stage(event.agent.name, event.tool_use["name"]),
+        )
+
+
+timing_hooks = TimingHooks()
+# プールのサブエージェント用（invoke_sub_agent から呼び出し元の計測を引き継ぐ）
+sub_agent_timing_hooks = TimingHooks(sub_agent=True)
@@ -13,6 +13,7 @@ export const EventTypeSchema = z.enum([
   "contentBlockStop",
   "messageStop",
   "metadata",
+  "toolProgress",
 ])
 
 const MessageStartEventSchema = z.object({
@@ -222,6 +223,15 @@ const MetadataSchema = z.object({
   }),
 })
 
+// エージェントが返すサブエージェント呼び出しの進捗（Bedrock の応答には含まれない）
+const ToolProgressEventSchema = z.object({
+  toolProgress: z.object({
+    toolUseId: z.string(),
+    name: z.string().optional(),
+    status: z.enum(["running", "success", "error"]),
+  }),
+})
+
 /**
  * @see - https://docs.aws.amazon.com/ja_jp/bedrock/latest/userguide/conversation-inference-call.html#conversation-inference-call-response
  */
@@ -232,6 +242,7 @@ export const OutputSchema = MessageStartEventSchema.or(
   .or(ContentBlockStopEventSchema)
   .or(MessageStopEventSchema)
   .or(MetadataSchema)
+  .or(ToolProgressEventSchema)
 
 /**
  * Dynamoose model for logging conversation events. Each log entry includes details about the invocation, actor, session, input, and output of a conversation event.
@@ -268,6 +279,8 @@ export const LogModel = dynamoose.model(
         InputTokens: Number,
         OutputTokens: Number,
         TotalTokens: Number,
+        CacheReadInputTokens: Number,
+        CacheWriteInputTokens: Number,
       },
     },
     Latency: {
@@ -0,0 +1,44 @@
+"""
+Shared bootstrap for the benchmark scripts.
+
+Benchmarks are plain scripts (``uv run python tests/benchmarks/bench_xxx.py``)
+that run fully offline. Importing this module puts the agent sources and the
+test stubs on ``sys.path`` and fills in the settings the agent modules require.
+"""
+
+import os
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path[:0] = [str(ROOT / "src" / "agent"), str(ROOT / "tests" / "src" / "agent")]
+
+for key, value in {
+    "AWS_DEFAULT_REGION": "ap-northeast-1",
+    "MODEL_ID": "stub-model",
+    "KB_MODEL_ID": "stub-kb-model",
+    "TAVILY_SECRET_NAME": "TavilySecret",
+    "MEMORY_ID": "stub-memory",
+    "BEDROCK_KB_ID": "stub-kb-id",
+    "BEDROCK_ESTATE_KB_ID": "stub-estate-kb-id",
+    "LOG_TABLE_NAME": "AgentCoreLogTable",
+    "POWERTOOLS_LOG_LEVEL": "WARNING",
+}.items():
+    os.environ.setdefault(key, value)
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Nearest-rank percentile of ``samples``."""
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def timeit(func: Callable[[], object], iterations: int) -> float:
+    """Return the mean wall time of ``func`` in microseconds."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1_000_000
@@ -0,0 +1,97 @@
+"""
+Overload behaviour of ``/invocations`` with and without admission control.
+
+Simulates ``CLIENTS`` concurrent invocations (a few heavy actors send more
+than the rest) against a backend whose service time grows once more than
+``CAPACITY`` invocations run at once, as the model and tool calls start to
+queue and throttle upstream. Reports the latency percentiles of completed
+invocations and how many were rejected with 429.
+
+    uv run python tests/benchmarks/bench_admission.py
+"""
+
+import _common  # noqa: F401, I001
+
+import asyncio
+import time
+
+from admission import AdmissionController, AdmissionRejectedError
+
+CLIENTS = 400
+CAPACITY = 16
+SERVICE_TIME = 0.05
+HEAVY_ACTORS = 4
+
+
+class Backend:
+    """Service time rises linearly with the invocations over ``CAPACITY``."""
+
+    def __init__(self):
+        self.active = 0
+
+    async def invoke(self) -> None:
+        self.active += 1
+        try:
+            await asyncio.sleep(SERVICE_TIME * max(1.0, self.active / CAPACITY))
+        finally:
+            self.active -= 1
+
+
+def _actor(i: int) -> str:
+    # 半分の呼び出しは少数の actor から来る
+    return f"heavy-{i % HEAVY_ACTORS}" if i % 2 else f"user-{i}"
+
+
+async def _run(controller: AdmissionController | None) -> tuple[list[float], int]:
+    backend = Backend()
+    latencies: list[float] = []
+    rejected = 0
+
+    async def client(i: int) -> None:
+        nonlocal rejected
+        # 到着を少しずつずらす
+        await asyncio.sleep(i * 0.0005)
+        start = time.perf_counter()
+        admission = None
+        if controller is not None:
+            try:
+                admission = await controller.acquire(_actor(i))
+            except AdmissionRejectedError:
+                rejected += 1
+                return
+        try:
+            await backend.invoke()
+        finally:
+            if admission is not None:
+                admission.release()
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    await asyncio.gather(*(client(i) for i in range(CLIENTS)))
+    return latencies, rejected
+
+
+def _report(label: str, latencies: list[float], rejected: int) -> None:
+    print(
+        f"{label:<22} completed={len(latencies):4d} rejected={rejected:4d}  "
+        f"p50={_common.percentile(latencies, 50):7.1f}ms "
+        f"p99={_common.percentile(latencies, 99):7.1f}ms"
+    )
+
+
+def main():
+    print(
+        f"{CLIENTS} invocations, capacity {CAPACITY}, service time {SERVICE_TIME * 1000:.0f}ms"
+    )
+    _report("no admission control", *asyncio.run(_run(None)))
+    controller = AdmissionController(
+        max_in_flight=CAPACITY,
+        max_per_actor=4,
+        max_queue=2 * CAPACITY,
+        queue_timeout=0.5,
+    )
+    _report("admission control", *asyncio.run(_run(controller)))
+    print(f"admission stats: {controller.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Per-request main agent setup: a fresh ``Agent`` vs ``AgentTemplate.create``.
+
+Uses seven ``@tool`` sub-agent wrappers shaped like the ones in ``main.py``
+(``main`` itself would pull in the real sub-agents) and ``StubModel``. Reports
+setup time and allocated memory per request, and the cost of the tool config
+built for every model call.
+
+    uv run python tests/benchmarks/bench_agent_setup.py
+"""
+
+import _common  # noqa: F401, I001
+
+import tracemalloc
+
+from agent_template import AgentTemplate
+from strands import Agent, tool
+from strands.agent.conversation_manager import SlidingWindowConversationManager
+from stubs import StubModel
+
+ITERATIONS = 500
+
+
+def _sub_agent_tool(name: str, param: str):
+    async def call(**kwargs) -> str:
+        return ""
+
+    call.__name__ = name
+    call.__doc__ = f"""Call agent to handle a request using the {name.removeprefix("call_")}.
+    Args:
+        {param}: The {param} to pass to the agent
+    Returns:
+        The agent's answer
+    """
+    call.__annotations__ = {param: str, "return": str}
+    return tool(call)
+
+
+TOOLS = [
+    _sub_agent_tool("call_weather_agent", "city"),
+    _sub_agent_tool("call_search_agent", "query"),
+    _sub_agent_tool("call_aws_rss_agent", "keyword"),
+    _sub_agent_tool("call_react_agent", "topic"),
+    _sub_agent_tool("call_aws_access_agent", "topic"),
+    _sub_agent_tool("call_estate_agent", "query"),
+    _sub_agent_tool("call_goverment_data_agent", "query"),
+]
+SYSTEM_PROMPT = """
+    You are a kind AI assistant.
+    Please answer user questions politely.
+    If weather information is needed, please use the call_weather_agent.
+    If information is unknown, use call_search_agent to search.
+    Answer in the language used by the user.
+"""
+model = StubModel()
+template = AgentTemplate(
+    name="main_agent", model=model, tools=TOOLS, system_prompt=SYSTEM_PROMPT
+)
+
+
+def fresh() -> Agent:
+    return Agent(
+        name="main_agent",
+        model=model,
+        conversation_manager=SlidingWindowConversationManager(),
+        tools=TOOLS,
+        system_prompt=SYSTEM_PROMPT,
+        callback_handler=None,
+    )
+
+
+def from_template() -> Agent:
+    return template.create(
+        conversation_manager=SlidingWindowConversationManager(),
+        callback_handler=None,
+    )
+
+
+def allocated_kib(func) -> float:
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024
+
+
+if __name__ == "__main__":
+    for label, create in (("fresh", fresh), ("template", from_template)):
+        agent = create()
+        setup = _common.timeit(create, ITERATIONS)
+        tool_config = _common.timeit(agent.tool_registry.get_all_tool_specs, ITERATIONS)
+        print(
+            f"{label:<9} setup={setup:,.0f}us peak={allocated_kib(create):,.0f}KiB "
+            f"tool_config={tool_config:,.1f}us/model call"
+        )
@@ -0,0 +1,82 @@
+"""
+SSE frames, bytes and CPU per answer with and without delta coalescing.
+
+Replays a 2,000-token answer through the stream path of ``entrypoint``
+(``DeltaCoalescer`` + ``encode_event``). Token arrival is simulated with a
+fake clock: ``steady`` delivers one token every ``TOKEN_INTERVAL`` seconds
+(the time window decides), ``burst`` delivers them all at once (the size
+threshold decides).
+
+    uv run python tests/benchmarks/bench_delta_coalescing.py
+"""
+
+import _common  # noqa: F401, I001
+
+import time
+
+from event_stream import DeltaCoalescer, encode_event
+
+TOKENS = 2000
+TOKEN_INTERVAL = 0.01
+ITERATIONS = 50
+
+
+class FakeClock:
+    def __init__(self, step: float):
+        self.step = step
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def build_answer() -> list[dict]:
+    events: list[dict] = [
+        {"messageStart": {"role": "assistant"}},
+        {"contentBlockStart": {"start": {}, "contentBlockIndex": 0}},
+    ]
+    events += [
+        {"contentBlockDelta": {"delta": {"text": f"語{i} "}, "contentBlockIndex": 0}}
+        for i in range(TOKENS)
+    ]
+    events += [
+        {"contentBlockStop": {"contentBlockIndex": 0}},
+        {"messageStop": {"stopReason": "end_turn"}},
+        {"metadata": {"usage": {"inputTokens": 900, "outputTokens": TOKENS}}},
+    ]
+    return events
+
+
+def stream(events: list[dict], coalescer: DeltaCoalescer | None, clock: FakeClock):
+    frames: list[bytes] = []
+    for event in events:
+        clock.now += clock.step
+        if coalescer is None:
+            frames.append(encode_event(event))
+        else:
+            frames.extend(encode_event(e) for e in coalescer.push(event))
+    return frames
+
+
+def run(label: str, step: float, coalesce: bool, events: list[dict]) -> None:
+    def once() -> list[bytes]:
+        clock = FakeClock(step)
+        coalescer = DeltaCoalescer(clock=clock) if coalesce else None
+        return stream(events, coalescer, clock)
+
+    frames = once()
+    started = time.process_time()
+    for _ in range(ITERATIONS):
+        once()
+    cpu = (time.process_time() - started) / ITERATIONS * 1_000
+    print(
+        f"{label:<16} frames={len(frames):>5} "
+        f"bytes={sum(map(len, frames)):>7,} cpu={cpu:.2f}ms/answer"
+    )
+
+
+if __name__ == "__main__":
+    events = build_answer()
+    run("off", TOKEN_INTERVAL, False, events)
+    run("steady (30ms)", TOKEN_INTERVAL, True, events)
+    run("burst (512 ch)", 0.0, True, events)
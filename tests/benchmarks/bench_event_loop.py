@@ -0,0 +1,109 @@
+"""
+/ping latency while slow tool calls are in flight.
+
+Starts a local upstream that answers after ``UPSTREAM_DELAY`` seconds, fires
+50 concurrent ``get_weather`` invocations at it and samples ``/ping`` on the
+same event loop. ``blocking`` runs the previous synchronous implementation
+(geocode + ``requests.get``) on the loop, ``async`` runs the current tool.
+
+    uv run python tests/benchmarks/bench_event_loop.py
+"""
+
+import _common  # noqa: F401, I001
+
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+
+import agent_tools
+import httpx
+import requests
+from fastapi import FastAPI
+from geocoding import GeocodeCache
+from settings import weather_settings
+from stubs import LocalHttpServer
+
+CONCURRENCY = 50
+UPSTREAM_DELAY = 0.5
+GEOCODE_DELAY = 0.05
+PING_INTERVAL = 0.01
+
+
+class SlowGeolocator:
+    def geocode(self, location):
+        time.sleep(GEOCODE_DELAY)
+        return SimpleNamespace(latitude=34.69, longitude=135.50)
+
+
+def weather_route(headers):
+    body = {"current": {"temperature_2m": 22.5, "weather_code": 3}}
+    return 200, {"Content-Type": "application/json"}, json.dumps(body).encode()
+
+
+async def blocking_get_weather(location: str) -> str:
+    location_data = agent_tools.get_geolocator().geocode(location)
+    response = requests.get(
+        weather_settings.weather_api_url,
+        params={
+            "latitude": location_data.latitude,
+            "longitude": location_data.longitude,
+        },
+    )
+    return str(response.json())
+
+
+app = FastAPI()
+
+
+@app.get("/ping")
+async def ping():
+    return {"status": "healthy"}
+
+
+async def measure(label: str, tool) -> None:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://agent"
+    ) as client:
+        latencies: list[float] = []
+        started = time.perf_counter()
+        tools = asyncio.gather(*(tool(f"city-{i}") for i in range(CONCURRENCY)))
+        # 一定間隔で /ping を予定し、予定時刻から応答までを計測する（ループ停止分も含む）
+        scheduled = time.perf_counter()
+        while True:
+            await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+            await client.get("/ping")
+            latencies.append((time.perf_counter() - scheduled) * 1000)
+            if tools.done():
+                break
+            scheduled = max(scheduled + PING_INTERVAL, time.perf_counter())
+        await tools
+        elapsed = time.perf_counter() - started
+
+    print(
+        f"{label:<9} tools={CONCURRENCY} wall={elapsed:.2f}s pings={len(latencies)} "
+        f"p50={_common.percentile(latencies, 50):.1f}ms "
+        f"p99={_common.percentile(latencies, 99):.1f}ms"
+    )
+
+
+def main():
+    agent_tools.get_geolocator = SlowGeolocator
+    # 1リクエスト/秒の制限をかけると上流の呼び出しが直列になり、ループの並行性を測れない
+    agent_tools.geocode_cache = GeocodeCache(
+        geocode=lambda location: SlowGeolocator().geocode(location),
+        min_interval=0,
+        seeds={},
+        dependency=agent_tools.geocoder,
+    )
+    with LocalHttpServer(
+        {"/v1/forecast": weather_route}, delay=UPSTREAM_DELAY
+    ) as server:
+        weather_settings.weather_api_url = f"{server.url}/v1/forecast"
+        asyncio.run(measure("blocking", blocking_get_weather))
+        asyncio.run(measure("async", agent_tools.get_weather))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Per-event cost of turning strands stream events into SSE frames.
+
+Replays a 5k-event response (one text block streamed as deltas) through the
+previous path (an ``InvocationResponseModel`` per event + ``model_dump`` +
+sse-starlette framing) and through ``encode_event``, reporting wall time and allocations
+per event.
+
+    uv run python tests/benchmarks/bench_event_stream.py
+"""
+
+import _common  # noqa: F401, I001
+
+import json
+import tracemalloc
+
+from event_stream import SSE_SEPARATOR, encode_event
+from models import EventTypeEnum, InvocationResponseModel
+from sse_starlette.event import ensure_bytes
+
+DELTAS = 4996
+ITERATIONS = 20
+
+
+def build_stream() -> list[dict]:
+    events: list[dict] = [{"messageStart": {"role": "assistant"}}]
+    events += [
+        {
+            "contentBlockDelta": {
+                "delta": {"text": f"トークン{i} "},
+                "contentBlockIndex": 0,
+            }
+        }
+        for i in range(DELTAS)
+    ]
+    events += [
+        {"contentBlockStop": {"contentBlockIndex": 0}},
+        {"messageStop": {"stopReason": "end_turn"}},
+        {
+            "metadata": {
+                "usage": {
+                    "inputTokens": 812,
+                    "outputTokens": DELTAS,
+                    "totalTokens": 5808,
+                },
+                "metrics": {"latencyMs": 41230},
+            }
+        },
+    ]
+    return events
+
+
+def legacy(events: list[dict]) -> None:
+    for event in events:
+        # 以前の main.parse_event_message と同じ手順
+        response = InvocationResponseModel(
+            event=EventTypeEnum[next(iter(event))],
+            data=json.dumps(event, ensure_ascii=False),
+        )
+        ensure_bytes(response.model_dump(mode="json"), SSE_SEPARATOR)
+
+
+def single_pass(events: list[dict]) -> None:
+    for event in events:
+        encode_event(event)
+
+
+def transient_bytes(encode, events: list[dict]) -> float:
+    """Mean peak of memory allocated while encoding one event."""
+    tracemalloc.start()
+    total = 0
+    for event in events:
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        encode([event])
+        total += tracemalloc.get_traced_memory()[1] - baseline
+    tracemalloc.stop()
+    return total / len(events)
+
+
+if __name__ == "__main__":
+    events = build_stream()
+    for label, encode in (("legacy", legacy), ("encode", single_pass)):
+        per_event = _common.timeit(lambda: encode(events), ITERATIONS) / len(events)
+        print(
+            f"{label:<7} events={len(events)} per_event={per_event:.2f}us "
+            f"peak_alloc={transient_bytes(encode, events):,.0f}B/event"
+        )
@@ -0,0 +1,84 @@
+"""
+Knowledge base question cost: retrieve_and_generate vs retrieve-only.
+
+Runs the react sub-agent against a stub model and a stubbed
+``bedrock-agent-runtime`` client, once per ``kb_mode``, and reports wall time
+per question and the tokens spent by the KB generation step plus the
+sub-agent's own model calls.
+
+    uv run python tests/benchmarks/bench_kb_mode.py [questions]
+"""
+
+import _common  # noqa: F401, I001
+
+import asyncio
+import sys
+import time
+
+import agent_tools
+from kb_cache import KnowledgeBaseCache
+from strands import Agent
+from stubs import StubKnowledgeBaseClient, StubModel
+
+RETRIEVE_LATENCY = 0.05
+GENERATION_LATENCY = 0.4
+MODEL_LATENCY = 0.2
+CHUNKS = [
+    (
+        f"Best practice #{i}: keep data fetching in Server Components and pass "
+        "serializable props to Client Components. " * 4,
+        {},
+    )
+    for i in range(5)
+]
+ANSWER = (
+    "Server Components でデータ取得を行い、Client Components は最小限にします。" * 3
+)
+
+
+async def run(mode: str, questions: int) -> None:
+    kb_client = StubKnowledgeBaseClient(
+        chunks=CHUNKS,
+        answer=ANSWER,
+        retrieve_latency=RETRIEVE_LATENCY,
+        generation_latency=GENERATION_LATENCY,
+    )
+    agent_tools.get_kb_client = lambda: kb_client
+    agent_tools.kb_response_cache = KnowledgeBaseCache()
+    agent_tools.knowledge_base_settings.kb_mode = mode
+
+    samples = []
+    agent_tokens = 0
+    for i in range(questions):
+        agent = Agent(
+            model=StubModel(
+                text=ANSWER,
+                tool_calls=[("get_frontend_best_practices", {"topic": f"RSC #{i}"})],
+                delay=MODEL_LATENCY,
+            ),
+            tools=[agent_tools.get_frontend_best_practices],
+            callback_handler=None,
+        )
+        started = time.perf_counter()
+        await agent.invoke_async(f"React Server Components のベストプラクティス #{i}")
+        samples.append(time.perf_counter() - started)
+        agent_tokens += agent.event_loop_metrics.accumulated_usage["totalTokens"]
+
+    kb_tokens = kb_client.generation_input_tokens + kb_client.generation_output_tokens
+    print(
+        f"{mode:<21} questions={questions} "
+        f"p50={_common.percentile(samples, 50) * 1000:,.0f}ms "
+        f"kb_generation_tokens={kb_tokens / questions:,.0f}/q "
+        f"sub_agent_tokens={agent_tokens / questions:,.0f}/q "
+        f"total={(kb_tokens + agent_tokens) / questions:,.0f}/q"
+    )
+
+
+def main():
+    questions = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    for mode in ["retrieve_and_generate", "retrieve"]:
+        asyncio.run(run(mode, questions))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+End-of-stream latency with the inline save vs the background log writer.
+
+Each simulated stream emits a few deltas and then persists its invocation log.
+``inline`` calls ``save()`` on the event loop as ``entrypoint`` used to,
+``writer`` hands the item to ``InvocationLogWriter``. DynamoDB is replaced by
+an in-memory table with ``LATENCY`` seconds per request.
+
+    uv run python tests/benchmarks/bench_log_writer.py
+"""
+
+import _common  # noqa: F401, I001
+
+import asyncio
+import time
+
+from log_writer import InvocationLogWriter
+from stubs import FakeLogTable
+
+STREAMS = 200
+CONCURRENCY = 20
+LATENCY = 0.02
+
+
+class LogItem:
+    def __init__(self, table: FakeLogTable):
+        self.table = table
+
+    def save(self):
+        self.table.save(self)
+
+
+async def stream(persist, table: FakeLogTable) -> float:
+    for _ in range(20):
+        await asyncio.sleep(0)
+    result_at = time.perf_counter()
+    await persist(LogItem(table))
+    return (time.perf_counter() - result_at) * 1000
+
+
+async def run(label: str, persist, table: FakeLogTable) -> None:
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+
+    async def bounded():
+        async with semaphore:
+            return await stream(persist, table)
+
+    started = time.perf_counter()
+    latencies = await asyncio.gather(*(bounded() for _ in range(STREAMS)))
+    elapsed = time.perf_counter() - started
+    print(
+        f"{label:<7} streams={STREAMS} wall={elapsed:.2f}s "
+        f"end_of_stream p50={_common.percentile(latencies, 50):.2f}ms "
+        f"p99={_common.percentile(latencies, 99):.2f}ms"
+    )
+
+
+async def inline():
+    table = FakeLogTable(latency=LATENCY)
+
+    async def persist(item):
+        item.save()
+
+    await run("inline", persist, table)
+    print(f"        dynamodb_calls={table.calls}")
+
+
+async def background():
+    table = FakeLogTable(latency=LATENCY)
+    writer = InvocationLogWriter(model=table)
+    writer.start()
+    await run("writer", writer.enqueue, table)
+    await writer.stop()
+    print(f"        dynamodb_calls={table.calls} {writer.stats()}")
+
+
+if __name__ == "__main__":
+    asyncio.run(inline())
+    asyncio.run(background())
@@ -0,0 +1,67 @@
+"""
+Cost of the ``/metrics`` collectors on the request path and of a scrape.
+
+Measures a counter increment, a histogram observation and ``observe_result``
+for a result with seven tools (what every invocation pays), and rendering
+a registry with those metrics plus component collectors (what a scrape pays).
+
+    uv run python tests/benchmarks/bench_metrics.py
+"""
+
+import _common  # noqa: F401, I001
+
+from types import SimpleNamespace
+
+from metrics import InvocationMetrics, MetricsRegistry
+from strands.telemetry.metrics import ToolMetrics
+
+ITERATIONS = 100_000
+TOOLS = [
+    "call_weather_agent",
+    "call_search_agent",
+    "call_aws_rss_agent",
+    "call_react_agent",
+    "call_aws_access_agent",
+    "call_estate_agent",
+    "call_goverment_data_agent",
+]
+
+
+def main():
+    registry = MetricsRegistry()
+    metrics = InvocationMetrics(registry)
+    tool_metrics = {}
+    for name in TOOLS:
+        tool_metrics[name] = ToolMetrics(
+            tool={"toolUseId": "t", "name": name, "input": {}},
+            call_count=1,
+            success_count=1,
+            total_time=0.5,
+        )
+    result = SimpleNamespace(
+        metrics=SimpleNamespace(
+            cycle_count=2,
+            tool_metrics=tool_metrics,
+            accumulated_usage={"inputTokens": 1200, "outputTokens": 300},
+        )
+    )
+    pool_stats = {
+        name: {"name": name, "size": 2, "idle": 1, "in_use": 1, "max_size": 4}
+        for name in TOOLS
+    }
+    registry.register_collector("sub_agent_pool", lambda: pool_stats, label="pool")
+
+    inc = _common.timeit(lambda: metrics.invocations.inc(), ITERATIONS)
+    observe = _common.timeit(lambda: metrics.duration_seconds.observe(1.7), ITERATIONS)
+    per_result = _common.timeit(lambda: metrics.observe_result(result), ITERATIONS)
+    render = _common.timeit(registry.render, 1000)
+    lines = registry.render().count("\n")
+    print(
+        f"counter.inc={inc:.2f}us  histogram.observe={observe:.2f}us  "
+        f"observe_result({len(TOOLS)} tools)={per_result:.2f}us  "
+        f"render({lines} lines)={render:.0f}us"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Latency and token cost of one invocation per model profile assignment.
+
+The main agent routes a weather question to the weather sub-agent, then
+answers. Every agent runs on ``StubModel`` shaped by its profile: a fixed
+time to first token plus a per-output-token time, output capped by the
+profile's ``max_tokens``, and a price per 1k input / output tokens. The
+figures in ``PROFILES`` are illustrative; adjust them to the models compared.
+
+    uv run python tests/benchmarks/bench_model_profiles.py
+"""
+
+import _common  # noqa: F401, I001
+
+import asyncio
+import time
+
+from settings import ModelSettings
+from strands import Agent, tool
+from stubs import StubModel
+
+# name: (time to first token [s], time per output token [s], $/1k input, $/1k output)
+PROFILES = {
+    "default": (0.40, 0.004, 0.0008, 0.0032),
+    "router": (0.15, 0.0015, 0.00006, 0.00024),
+}
+ASSIGNMENTS = {
+    "all default": {},
+    "routers small": {
+        "main_agent": "router",
+        "weather_agent": "router",
+    },
+}
+ANSWER = "大阪は晴れ、最高気温は22度です。傘は必要ありません。" * 12
+
+
+class ProfiledModel(StubModel):
+    def __init__(self, profile: str, max_tokens: int, **kwargs):
+        ttft, per_token, *_ = PROFILES[profile]
+        text = kwargs.pop("text", ANSWER)[: max_tokens * 4]
+        super().__init__(
+            text=text, delay=ttft + per_token * max(1, len(text) // 4), **kwargs
+        )
+        self.profile = profile
+
+
+def build_model(settings: ModelSettings, agent_name: str, **kwargs) -> ProfiledModel:
+    profile = settings.profile_name_for(agent_name)
+    max_tokens = settings.get_profile(profile).max_tokens
+    return ProfiledModel(profile, max_tokens, **kwargs)
+
+
+def cost(agent: Agent, profile: str) -> float:
+    usage = agent.event_loop_metrics.accumulated_usage
+    *_, input_price, output_price = PROFILES[profile]
+    return (
+        usage["inputTokens"] * input_price + usage["outputTokens"] * output_price
+    ) / 1000
+
+
+async def invoke(settings: ModelSettings) -> tuple[float, int, float]:
+    weather = Agent(
+        name="weather_agent",
+        model=build_model(settings, "weather_agent"),
+        callback_handler=None,
+    )
+
+    @tool
+    async def call_weather_agent(city: str) -> str:
+        """Call agent to get weather information using the weather_agent.
+        Args:
+            city: The name of the city
+        """
+        return str(await weather.invoke_async(f"Get the weather for {city}."))
+
+    main_model = build_model(
+        settings, "main_agent", tool_calls=[("call_weather_agent", {"city": "大阪"})]
+    )
+    main = Agent(
+        name="main_agent",
+        model=main_model,
+        tools=[call_weather_agent],
+        callback_handler=None,
+    )
+    started = time.perf_counter()
+    await main.invoke_async("大阪の天気は？")
+    elapsed = time.perf_counter() - started
+
+    tokens = sum(
+        agent.event_loop_metrics.accumulated_usage["totalTokens"]
+        for agent in (main, weather)
+    )
+    dollars = cost(main, main_model.profile) + cost(weather, weather.model.profile)
+    return elapsed, tokens, dollars
+
+
+if __name__ == "__main__":
+    for label, assignment in ASSIGNMENTS.items():
+        settings = ModelSettings(
+            model_id="stub-large",
+            model_profiles={"router": {"model_id": "stub-small", "max_tokens": 128}},
+            agent_model_profiles=assignment,
+        )
+        elapsed, tokens, dollars = asyncio.run(invoke(settings))
+        print(
+            f"{label:<14} latency={elapsed * 1000:,.0f}ms tokens={tokens:,} "
+            f"cost=${dollars:.5f}/invocation"
+        )
@@ -0,0 +1,78 @@
+"""
+Tool latency during a dependency outage, with and without the resilience layer.
+
+A hanging upstream answers only after ``HANG`` seconds (the old behaviour
+without a deadline). ``CALLS`` sequential tool calls are made against it
+directly and through a ``Dependency`` with a short deadline and circuit
+breaker, reporting the latency percentiles of the calls. The overhead of
+``Dependency.call`` on a healthy upstream is measured as well.
+
+    uv run python tests/benchmarks/bench_resilience.py
+"""
+
+import _common  # noqa: F401, I001
+
+import asyncio
+import time
+
+from resilience import Dependency, DependencyUnavailableError
+
+CALLS = 50
+HANG = 0.5
+HEALTHY_CALLS = 20_000
+
+
+async def _hang() -> str:
+    await asyncio.sleep(HANG)
+    return "late"
+
+
+async def _healthy() -> str:
+    return "ok"
+
+
+async def _outage(dependency: Dependency | None) -> list[float]:
+    latencies = []
+    for _ in range(CALLS):
+        start = time.perf_counter()
+        try:
+            await (_hang() if dependency is None else dependency.call(_hang))
+        except DependencyUnavailableError:
+            pass
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def _report(label: str, latencies: list[float]) -> None:
+    print(
+        f"{label:<28} total={sum(latencies):7.0f}ms  "
+        f"p50={_common.percentile(latencies, 50):6.1f}ms "
+        f"p99={_common.percentile(latencies, 99):6.1f}ms"
+    )
+
+
+async def _overhead() -> tuple[float, float]:
+    dependency = Dependency("healthy")
+    start = time.perf_counter()
+    for _ in range(HEALTHY_CALLS):
+        await _healthy()
+    plain = (time.perf_counter() - start) / HEALTHY_CALLS * 1_000_000
+    start = time.perf_counter()
+    for _ in range(HEALTHY_CALLS):
+        await dependency.call(_healthy)
+    wrapped = (time.perf_counter() - start) / HEALTHY_CALLS * 1_000_000
+    return plain, wrapped
+
+
+def main():
+    print(f"{CALLS} calls to an upstream hanging for {HANG * 1000:.0f}ms")
+    _report("no deadline", asyncio.run(_outage(None)))
+    dependency = Dependency("upstream", timeout=0.1, max_attempts=1)
+    _report("deadline + circuit breaker", asyncio.run(_outage(dependency)))
+    print(f"  {dependency.stats()}")
+    plain, wrapped = asyncio.run(_overhead())
+    print(f"healthy call  plain={plain:.2f}us  Dependency.call={wrapped:.2f}us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+get_aws_rss_feed latency: download-and-parse per call vs the cached snapshot.
+
+Serves a generated 500-entry fixture feed from a local server with
+``NETWORK_DELAY`` seconds of simulated latency.
+
+    uv run python tests/benchmarks/bench_rss_feed.py
+"""
+
+import _common  # noqa: F401, I001
+
+import asyncio
+import time
+
+import agent_tools
+import feedparser
+from clients import get_http_client
+from models import RssItem
+from rss_feed import RssFeedCache
+from stubs import LocalHttpServer, build_rss_feed, rss_route
+
+ENTRIES = 500
+NETWORK_DELAY = 0.05
+CALLS = 20
+
+
+async def uncached_get_aws_rss_feed(url: str, keyword: str, max_items: int) -> list:
+    response = await get_http_client().get(url)
+    feed = feedparser.parse(response.content)
+    result_items = []
+    for entry in feed.entries:
+        if len(result_items) >= max_items:
+            break
+        rss_item = RssItem.from_entry(entry)
+        if (
+            keyword.lower() in rss_item.title.lower()
+            or keyword.lower() in rss_item.summary.lower()
+        ):
+            result_items.append(rss_item)
+    return result_items
+
+
+async def measure(label: str, call) -> None:
+    samples = []
+    for _ in range(CALLS):
+        started = time.perf_counter()
+        await call()
+        samples.append((time.perf_counter() - started) * 1_000_000)
+    print(
+        f"{label:<9} calls={CALLS} p50={_common.percentile(samples, 50):,.0f}us "
+        f"p99={_common.percentile(samples, 99):,.0f}us"
+    )
+
+
+async def main(url: str) -> None:
+    await measure(
+        "uncached", lambda: uncached_get_aws_rss_feed(url, "service update 42", 10)
+    )
+
+    agent_tools.aws_rss_feed_cache = RssFeedCache([url])
+    await agent_tools.aws_rss_feed_cache.refresh()
+    await measure(
+        "cached",
+        lambda: agent_tools.get_aws_rss_feed(keyword="service update 42", max_items=10),
+    )
+
+
+if __name__ == "__main__":
+    routes = {"/feed": rss_route(build_rss_feed(ENTRIES))}
+    with LocalHttpServer(routes, delay=NETWORK_DELAY) as server:
+        asyncio.run(main(f"{server.url}/feed"))
@@ -0,0 +1,81 @@
+"""
+Keyword search over a 10k-entry synthetic feed: linear lower-case scan vs RssIndex.
+
+    uv run python tests/benchmarks/bench_rss_index.py [entries]
+"""
+
+import _common  # noqa: F401, I001
+
+import random
+import sys
+import time
+
+from models import RssItem
+from rss_index import RssIndex
+
+SERVICES = ["Lambda", "S3", "Bedrock", "DynamoDB", "EC2", "ECS", "CloudFront", "IAM"]
+REGIONS = [
+    "東京リージョン",
+    "大阪リージョン",
+    "US East (N. Virginia)",
+    "Europe (Frankfurt)",
+]
+QUERIES = ["bedrock", "lambda python", "東京", "dynamodb 大阪", "glacier", "amazon"]
+
+
+def synthetic_items(count: int) -> list[RssItem]:
+    rng = random.Random(0)
+    items = []
+    for i in range(count):
+        service = rng.choice(SERVICES)
+        region = rng.choice(REGIONS)
+        items.append(
+            RssItem(
+                title=f"Amazon {service} の新機能 #{i}",
+                link=f"https://aws.example.com/news/{i}",
+                published=time.strftime(
+                    "%a, %d %b %Y %H:%M:%S +0000", time.gmtime(1_700_000_000 - i * 60)
+                ),
+                summary=(
+                    f"{service} now supports Python runtimes and is available in {region}. "
+                    "詳細はドキュメントを参照してください。"
+                ),
+            )
+        )
+    return items
+
+
+def linear_search(items: list[RssItem], keyword: str, max_items: int) -> list[RssItem]:
+    result_items = []
+    for rss_item in items:
+        if len(result_items) >= max_items:
+            break
+        keyword_lower = keyword.lower()
+        if (
+            keyword_lower in rss_item.title.lower()
+            or keyword_lower in rss_item.summary.lower()
+        ):
+            result_items.append(rss_item)
+    return result_items
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    items = synthetic_items(count)
+
+    started = time.perf_counter()
+    index = RssIndex(items)
+    print(f"build entries={count} {(time.perf_counter() - started) * 1000:.1f}ms")
+
+    for query in QUERIES:
+        # 線形走査は max_items に達するまで、または全件を走査する（ヒットが少ないほど遅い）
+        linear = _common.timeit(lambda: linear_search(items, query, 10), 20)
+        indexed = _common.timeit(lambda: index.search(query, 10), 20)
+        print(
+            f"query={query!r:<16} linear={linear:>10,.1f}us "
+            f"index={indexed:>10,.1f}us hits={len(index.search(query, count))}"
+        )
+
+
+if __name__ == "__main__":
+    main()
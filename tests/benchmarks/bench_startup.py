@@ -0,0 +1,127 @@
+"""
+Cold start: importing ``main`` in a fresh interpreter.
+
+Runs ``python -X importtime -c "import main"`` ``RUNS`` times and reports the
+wall time until the app object exists (what AgentCore Runtime waits for
+before ``/ping`` can answer), the import time of ``main`` and the top-level
+packages with the most self import time. A separate probe run counts the
+work done at import time that should be deferred to the lifespan warm-up:
+Secrets Manager reads, boto3 clients, MCP sessions and ``Agent`` instances.
+The probe stubs those calls, so the script runs offline.
+
+    uv run python tests/benchmarks/bench_startup.py [runs]
+"""
+
+import _common  # noqa: F401, I001
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+RUNS = 5
+TOP_PACKAGES = 10
+
+PROBE = """
+import json
+
+import boto3
+from aws_lambda_powertools.utilities import parameters
+from strands import Agent
+from strands.tools.mcp import MCPClient
+
+counts = {"secret_fetches": 0, "boto3_clients": 0, "mcp_sessions": 0, "agents": 0}
+
+
+def count(name, func, result=None):
+    def counted(*args, **kwargs):
+        counts[name] += 1
+        return result if func is None else func(*args, **kwargs)
+
+    return counted
+
+
+parameters.get_secret = count("secret_fetches", None, '{"TAVILY_API_KEY": "offline"}')
+boto3.client = count("boto3_clients", boto3.client)
+boto3.Session.client = count("boto3_clients", boto3.Session.client)
+MCPClient.start = count("mcp_sessions", None)
+Agent.__init__ = count("agents", Agent.__init__)
+
+import main  # noqa: E402, F401
+
+print(json.dumps(counts))
+"""
+
+
+def _env() -> dict[str, str]:
+    src = str(_common.ROOT / "src" / "agent")
+    return {**os.environ, "PYTHONPATH": src}
+
+
+def _import_main() -> tuple[float, list[tuple[int, int, str]]]:
+    """Import ``main`` in a new interpreter; return the wall time and the importtime rows."""
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        env=_env(),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    wall = time.perf_counter() - start
+    rows = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line.removeprefix("import time:").split("|")
+        rows.append((int(self_us), int(cumulative_us), module.strip()))
+    return wall, rows
+
+
+def _probe() -> dict[str, int]:
+    completed = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        env=_env(),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(completed.stdout.splitlines()[-1])
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else RUNS
+
+    walls = []
+    main_import = []
+    package_self: defaultdict[str, list[int]] = defaultdict(list)
+    for _ in range(runs):
+        wall, rows = _import_main()
+        walls.append(wall)
+        main_import.append(next(cum for _, cum, module in rows if module == "main"))
+        totals: defaultdict[str, int] = defaultdict(int)
+        for self_us, _, module in rows:
+            totals[module.split(".")[0]] += self_us
+        for package, total in totals.items():
+            package_self[package].append(total)
+
+    print(
+        f"cold start ({runs} runs): "
+        f"wall median={statistics.median(walls) * 1000:.0f}ms "
+        f"min={min(walls) * 1000:.0f}ms  "
+        f"import main median={statistics.median(main_import) / 1000:.0f}ms"
+    )
+    print("top packages by self import time (median):")
+    medians = {p: statistics.median(v) for p, v in package_self.items()}
+    for package, us in sorted(medians.items(), key=lambda item: -item[1])[
+        :TOP_PACKAGES
+    ]:
+        print(f"  {package:<28} {us / 1000:7.1f}ms")
+    print(f"work at import time: {_probe()}")
+
+
+if __name__ == "__main__":
+    main()
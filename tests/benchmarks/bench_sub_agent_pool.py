@@ -0,0 +1,86 @@
+"""
+Soak test for the sub-agent pool.
+
+Runs thousands of sub-agent invocations against a stub model, once through a
+single shared ``Agent`` (the previous behaviour) and once through ``AgentPool``,
+and reports RSS and per-call input tokens at the start and end of the run.
+
+    uv run python tests/benchmarks/bench_sub_agent_pool.py [invocations]
+"""
+
+import _common  # noqa: F401, I001
+
+import gc
+import resource
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from agent_pool import AgentPool
+from strands import Agent
+from stubs import StubModel
+
+
+def rss_mb() -> float:
+    statm = Path("/proc/self/statm")
+    if statm.exists():
+        pages = int(statm.read_text().split()[1])
+        return pages * resource.getpagesize() / 1024 / 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def create_agent() -> Agent:
+    return Agent(
+        name="soak_agent",
+        model=StubModel(text="晴れ、22°C です。" * 20),
+        callback_handler=None,
+    )
+
+
+def run(label: str, invoke, invocations: int, workers: int):
+    gc.collect()
+    rss_start = rss_mb()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        tokens = list(
+            executor.map(lambda i: invoke(f"大阪の天気は？ #{i}"), range(invocations))
+        )
+    gc.collect()
+    rss_end = rss_mb()
+    window = max(1, invocations // 10)
+    head = sum(tokens[:window]) / window
+    tail = sum(tokens[-window:]) / window
+    print(
+        f"{label:<8} invocations={invocations} "
+        f"rss_start={rss_start:.1f}MB rss_end={rss_end:.1f}MB "
+        f"input_tokens first10%={head:.0f} last10%={tail:.0f}"
+    )
+
+
+def main():
+    invocations = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+
+    shared = create_agent()
+    lock = threading.Lock()
+
+    def invoke_shared(prompt: str) -> int:
+        # 共有インスタンスは同時実行できないため直列化される
+        with lock:
+            result = shared(prompt)
+            return result.metrics.latest_agent_invocation.usage["inputTokens"]
+
+    pool = AgentPool("soak_agent", create_agent, max_size=4, prewarm=4)
+    pool.warm()
+
+    def invoke_pooled(prompt: str) -> int:
+        with pool.checkout() as agent:
+            result = agent(prompt)
+            return result.metrics.latest_agent_invocation.usage["inputTokens"]
+
+    run("shared", invoke_shared, invocations, workers=4)
+    run("pooled", invoke_pooled, invocations, workers=4)
+    print(pool.stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Overhead of the per-stage latency instrumentation.
+
+Measures a bare ``span`` (outside and inside an invocation), and a full
+``StubModel`` agent invocation with one tool call with and without
+``timing_hooks``, which times every model and tool call (median of
+``ROUNDS`` alternating rounds).
+
+    uv run python tests/benchmarks/bench_timings.py
+"""
+
+import _common  # noqa: F401, I001
+
+import asyncio
+import statistics
+import time
+
+from strands import Agent, tool
+from stubs import StubModel
+from timings import span, start_timings, timing_hooks
+
+SPAN_ITERATIONS = 200_000
+INVOCATIONS = 300
+ROUNDS = 5
+
+
+@tool
+async def lookup(city: str) -> str:
+    """Look up a city.
+    Args:
+        city: The name of the city
+    """
+    with span("geocode"):
+        return f"{city}: sunny"
+
+
+def _empty_span() -> None:
+    with span("geocode"):
+        pass
+
+
+async def _invoke(hooks: list) -> float:
+    agent = Agent(
+        name="main_agent",
+        model=StubModel(text="晴れです。", tool_calls=[("lookup", {"city": "大阪"})]),
+        tools=[lookup],
+        hooks=hooks,
+        callback_handler=None,
+    )
+    start_timings()
+    start = time.perf_counter()
+    await agent.invoke_async("大阪の天気は？")
+    return (time.perf_counter() - start) * 1_000_000
+
+
+def _mean_invocation(hooks: list) -> float:
+    async def run() -> float:
+        samples = [await _invoke(hooks) for _ in range(INVOCATIONS)]
+        return sum(samples) / len(samples)
+
+    return asyncio.run(run())
+
+
+def main():
+    outside = _common.timeit(_empty_span, SPAN_ITERATIONS)
+
+    async def inside_invocation() -> float:
+        start_timings()
+        return _common.timeit(_empty_span, SPAN_ITERATIONS)
+
+    inside = asyncio.run(inside_invocation())
+    print(f"span  outside an invocation {outside:.2f}us  inside {inside:.2f}us")
+
+    _mean_invocation([])  # warm-up
+    # 実行順による揺らぎを抑えるため交互に計測して中央値をとる
+    plain_rounds, hooked_rounds = [], []
+    for _ in range(ROUNDS):
+        plain_rounds.append(_mean_invocation([]))
+        hooked_rounds.append(_mean_invocation([timing_hooks]))
+    plain = statistics.median(plain_rounds)
+    hooked = statistics.median(hooked_rounds)
+    overhead = hooked - plain
+    print(
+        f"agent invocation (2 model calls, 1 tool call)  "
+        f"plain={plain:.0f}us  timed={hooked:.0f}us  "
+        f"overhead={overhead:.0f}us ({overhead / plain * 100:.1f}%)"
+    )
+
+
+if __name__ == "__main__":
+    main()
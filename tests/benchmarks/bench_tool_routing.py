@@ -0,0 +1,149 @@
+"""
+End-to-end latency of recorded conversations: sub-agent vs direct tool routing.
+
+Each recorded conversation is the user prompt plus the tool calls the main
+agent made for it. Both modes replay them on ``StubModel`` with
+``MODEL_LATENCY`` seconds per model call, against tool backends that take
+``BACKEND_LATENCY`` seconds. ``sub_agent`` goes main agent -> sub-agent LLM
+loop -> tool; ``direct`` has the main agent call the tool itself.
+
+    uv run python tests/benchmarks/bench_tool_routing.py
+"""
+
+import _common  # noqa: F401, I001
+
+import asyncio
+import time
+
+from strands import Agent, tool
+from stubs import StubModel
+
+MODEL_LATENCY = 0.25
+BACKEND_LATENCY = 0.05
+
+# (prompt, [(routed tool, input), ...]) recorded from the main agent
+RECORDED = [
+    ("大阪の天気は？", [("weather", {"city": "大阪"})]),
+    (
+        "東京と札幌の天気を教えて",
+        [("weather", {"city": "東京"}), ("weather", {"city": "札幌"})],
+    ),
+    ("Lambda の最新アップデートは？", [("aws_rss", {"keyword": "Lambda"})]),
+    (
+        "福岡の天気と S3 のニュース",
+        [("weather", {"city": "福岡"}), ("aws_rss", {"keyword": "S3"})],
+    ),
+]
+
+
+async def _backend(result: dict) -> dict:
+    await asyncio.sleep(BACKEND_LATENCY)
+    return result
+
+
+@tool
+async def get_weather(location: str) -> str:
+    """Get the current weather for a location.
+    Args:
+        location: The city or location name to get the weather for
+    """
+    return str(await _backend({"weather": "Overcast", "temperature_c": 22.5}))
+
+
+@tool
+async def get_aws_rss_feed(keyword: str) -> str:
+    """Fetch AWS-related RSS feed items based on keywords.
+    Args:
+        keyword: Keywords to filter RSS feed items
+    """
+    return str(await _backend({"items": [{"title": f"{keyword} update"}]}))
+
+
+async def _run_sub_agent(name: str, backend_tool, tool_input: dict) -> str:
+    sub_agent = Agent(
+        name=name,
+        model=StubModel(
+            text="結果です。",
+            tool_calls=[(backend_tool.tool_name, tool_input)],
+            delay=MODEL_LATENCY,
+        ),
+        tools=[backend_tool],
+        callback_handler=None,
+    )
+    return str(await sub_agent.invoke_async(str(tool_input)))
+
+
+@tool
+async def call_weather_agent(city: str) -> str:
+    """Call agent to get weather information using the weather_agent.
+    Args:
+        city: The name of the city
+    """
+    return await _run_sub_agent("weather_agent", get_weather, {"location": city})
+
+
+@tool
+async def call_aws_rss_agent(keyword: str) -> str:
+    """Call agent to fetch AWS RSS feed items using the aws_rss_agent.
+    Args:
+        keyword: The keyword to search for in the RSS feed
+    """
+    return await _run_sub_agent("aws_rss_agent", get_aws_rss_feed, {"keyword": keyword})
+
+
+@tool
+async def lookup_weather(city: str) -> dict:
+    """Get the current weather and the current time for a city.
+    Args:
+        city: The name of the city
+    """
+    report = await _backend({"weather": "Overcast", "temperature_c": 22.5})
+    return {"status": "success", "content": [{"json": report}]}
+
+
+@tool
+async def lookup_aws_rss_feed(keyword: str) -> dict:
+    """Search the AWS RSS feeds.
+    Args:
+        keyword: Keywords to filter RSS feed items
+    """
+    items = await _backend({"items": [{"title": f"{keyword} update"}]})
+    return {"status": "success", "content": [{"json": items}]}
+
+
+MODES = {
+    "sub_agent": {"weather": call_weather_agent, "aws_rss": call_aws_rss_agent},
+    "direct": {"weather": lookup_weather, "aws_rss": lookup_aws_rss_feed},
+}
+
+
+async def replay(tools: dict, prompt: str, calls: list[tuple[str, dict]]) -> float:
+    main_agent = Agent(
+        name="main_agent",
+        model=StubModel(
+            text="お答えします。",
+            tool_calls=[
+                (tools[route].tool_name, tool_input) for route, tool_input in calls
+            ],
+            delay=MODEL_LATENCY,
+        ),
+        tools=list(tools.values()),
+        callback_handler=None,
+    )
+    started = time.perf_counter()
+    await main_agent.invoke_async(prompt)
+    return (time.perf_counter() - started) * 1000
+
+
+async def main() -> None:
+    for mode, tools in MODES.items():
+        samples = [await replay(tools, prompt, calls) for prompt, calls in RECORDED]
+        print(
+            f"{mode:<9} conversations={len(samples)} "
+            f"p50={_common.percentile(samples, 50):,.0f}ms "
+            f"max={max(samples):,.0f}ms"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
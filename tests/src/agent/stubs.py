@@ -0,0 +1,578 @@
+"""Offline stand-ins for Bedrock used by the agent tests and benchmarks."""
+
+import asyncio
+import json
+import threading
+import time
+from collections.abc import AsyncIterator, Callable
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Self
+
+from botocore.exceptions import ClientError
+from pynamodb.exceptions import PutError
+from strands.models import Model
+
+
+def count_message_tokens(messages: list[dict]) -> int:
+    """Rough token count (4 chars per token) of every text block in ``messages``."""
+    chars = 0
+    for message in messages:
+        for block in message.get("content", []):
+            if "text" in block:
+                chars += len(block["text"])
+            elif "toolResult" in block:
+                chars += len(json.dumps(block["toolResult"], ensure_ascii=False))
+            elif "toolUse" in block:
+                chars += len(json.dumps(block["toolUse"], ensure_ascii=False))
+    return max(1, chars // 4)
+
+
+class StubModel(Model):
+    """
+    Deterministic model that optionally requests tools, then answers with ``text``.
+
+    On a turn whose last message is a user prompt, every entry of ``tool_calls``
+    is requested at once; once tool results come back the model answers with
+    ``text``. Input tokens are derived from the conversation size so history
+    growth is visible in the reported usage.
+    """
+
+    def __init__(
+        self,
+        text: str = "ok",
+        tool_calls: list[tuple[str, dict]] | None = None,
+        delay: float = 0.0,
+    ):
+        self.text = text
+        self.tool_calls = tool_calls or []
+        self.delay = delay
+        self.config: dict[str, Any] = {"model_id": "stub"}
+        self.calls: list[dict] = []
+
+    def update_config(self, **model_config: Any) -> None:
+        self.config.update(model_config)
+
+    def get_config(self) -> Any:
+        return self.config
+
+    async def structured_output(
+        self, output_model, prompt, system_prompt=None, **kwargs
+    ):
+        raise NotImplementedError
+        yield  # pragma: no cover
+
+    def _wants_tools(self, messages: list[dict]) -> bool:
+        if not self.tool_calls:
+            return False
+        last = messages[-1]["content"]
+        return not any("toolResult" in block for block in last)
+
+    async def stream(
+        self,
+        messages,
+        tool_specs=None,
+        system_prompt=None,
+        *,
+        tool_choice=None,
+        system_prompt_content=None,
+        invocation_state=None,
+        **kwargs,
+    ) -> AsyncIterator[dict]:
+        input_tokens = count_message_tokens(messages)
+        if system_prompt:
+            input_tokens += len(system_prompt) // 4
+        self.calls.append(
+            {
+                "messages": len(messages),
+                "input_tokens": input_tokens,
+                "tool_specs": tool_specs,
+                "system_prompt": system_prompt,
+                "system_prompt_content": system_prompt_content,
+                "kwargs": kwargs,
+            }
+        )
+        if self.delay:
+            await asyncio.sleep(self.delay)
+
+        yield {"messageStart": {"role": "assistant"}}
+        if self._wants_tools(messages):
+            for index, (name, tool_input) in enumerate(self.tool_calls):
+                yield {
+                    "contentBlockStart": {
+                        "start": {
+                            "toolUse": {"toolUseId": f"tool-{index}", "name": name}
+                        }
+                    }
+                }
+                yield {
+                    "contentBlockDelta": {
+                        "delta": {"toolUse": {"input": json.dumps(tool_input)}}
+                    }
+                }
+                yield {"contentBlockStop": {}}
+            stop_reason = "tool_use"
+        else:
+            yield {"contentBlockDelta": {"delta": {"text": self.text}}}
+            yield {"contentBlockStop": {}}
+            stop_reason = "end_turn"
+        yield {"messageStop": {"stopReason": stop_reason}}
+        output_tokens = max(1, len(self.text) // 4)
+        yield {
+            "metadata": {
+                "usage": {
+                    "inputTokens": input_tokens,
+                    "outputTokens": output_tokens,
+                    "totalTokens": input_tokens + output_tokens,
+                },
+                "metrics": {"latencyMs": int(self.delay * 1000)},
+            }
+        }
+
+
+class StubBedrockRuntime:
+    """
+    ``bedrock-runtime`` client whose ``converse_stream`` answers with ``text``.
+
+    Emulates prompt caching: the request prefix up to the last cache point
+    (system prompt, then tools) is written to the cache on first sight and
+    read from it afterwards, reported as ``cacheWriteInputTokens`` /
+    ``cacheReadInputTokens`` like Bedrock does.
+    """
+
+    def __init__(self, text: str = "ok"):
+        self.text = text
+        self.requests: list[dict] = []
+        self._cached_prefixes: set[str] = set()
+
+    def _cacheable_prefix(self, request: dict) -> str:
+        parts = []
+        prefix = ""
+        for section in (
+            request.get("system", []),
+            request.get("toolConfig", {}).get("tools", []),
+        ):
+            for block in section:
+                if "cachePoint" in block:
+                    prefix = json.dumps(parts, ensure_ascii=False)
+                else:
+                    parts.append(block)
+        return prefix
+
+    def converse_stream(self, **request) -> dict:
+        self.requests.append(request)
+        prefix = self._cacheable_prefix(request)
+        prefix_tokens = max(1, len(prefix) // 4) if prefix else 0
+        cache_usage = {}
+        if prefix in self._cached_prefixes:
+            cache_usage["cacheReadInputTokens"] = prefix_tokens
+        elif prefix:
+            self._cached_prefixes.add(prefix)
+            cache_usage["cacheWriteInputTokens"] = prefix_tokens
+        input_tokens = count_message_tokens(request["messages"])
+        output_tokens = max(1, len(self.text) // 4)
+        return {
+            "stream": [
+                {"messageStart": {"role": "assistant"}},
+                {
+                    "contentBlockDelta": {
+                        "delta": {"text": self.text},
+                        "contentBlockIndex": 0,
+                    }
+                },
+                {"contentBlockStop": {"contentBlockIndex": 0}},
+                {"messageStop": {"stopReason": "end_turn"}},
+                {
+                    "metadata": {
+                        "usage": {
+                            "inputTokens": input_tokens,
+                            "outputTokens": output_tokens,
+                            "totalTokens": input_tokens + output_tokens,
+                            **cache_usage,
+                        },
+                        "metrics": {"latencyMs": 1},
+                    }
+                },
+            ]
+        }
+
+
+class StubKnowledgeBaseClient:
+    """
+    ``bedrock-agent-runtime`` client answering ``retrieve`` / ``retrieve_and_generate``.
+
+    Both calls return ``chunks`` as retrieval results after ``retrieve_latency``
+    seconds; ``retrieve_and_generate`` additionally spends ``generation_latency``
+    seconds "generating" ``answer`` and counts the tokens that generation would
+    consume (retrieved chunks and query in, answer out). The first ``failures``
+    calls raise a ``ThrottlingException`` instead.
+    """
+
+    def __init__(
+        self,
+        chunks: list[tuple[str, dict[str, str]]] | None = None,
+        answer: str = "Use Server Components.",
+        retrieve_latency: float = 0.0,
+        generation_latency: float = 0.0,
+        failures: int = 0,
+    ):
+        self.failures = failures
+        self.chunks = chunks or [("React Server Components run on the server.", {})]
+        self.answer = answer
+        self.retrieve_latency = retrieve_latency
+        self.generation_latency = generation_latency
+        self.calls: list[tuple[str, dict]] = []
+        self.threads: list[str] = []
+        self.generation_input_tokens = 0
+        self.generation_output_tokens = 0
+
+    def _results(self) -> list[dict]:
+        return [
+            {
+                "content": {"text": text, "type": "TEXT"},
+                "location": {"type": "S3", "s3Location": {"uri": f"s3://kb/{i}.md"}},
+                "metadata": {"x-amz-bedrock-kb-source-uri": f"s3://kb/{i}.md"}
+                | metadata,
+                "score": round(0.9 - i * 0.05, 3),
+            }
+            for i, (text, metadata) in enumerate(self.chunks)
+        ]
+
+    def _maybe_throttle(self, operation: str) -> None:
+        if self.failures:
+            self.failures -= 1
+            raise ClientError(
+                {
+                    "Error": {"Code": "ThrottlingException", "Message": "Slow down"},
+                    "ResponseMetadata": {"HTTPStatusCode": 429},
+                },
+                operation,
+            )
+
+    def retrieve(self, **kwargs) -> dict:
+        self.calls.append(("retrieve", kwargs))
+        self.threads.append(threading.current_thread().name)
+        self._maybe_throttle("Retrieve")
+        time.sleep(self.retrieve_latency)
+        return {"retrievalResults": self._results()}
+
+    def retrieve_and_generate(self, **kwargs) -> dict:
+        self.calls.append(("retrieve_and_generate", kwargs))
+        self.threads.append(threading.current_thread().name)
+        self._maybe_throttle("RetrieveAndGenerate")
+        time.sleep(self.retrieve_latency + self.generation_latency)
+        context = "".join(text for text, _ in self.chunks) + kwargs["input"]["text"]
+        self.generation_input_tokens += max(1, len(context) // 4)
+        self.generation_output_tokens += max(1, len(self.answer) // 4)
+        return {
+            "output": {"text": self.answer},
+            "citations": [{"retrievedReferences": self._results()}],
+        }
+
+
+Route = Callable[[dict[str, str]], tuple[int, dict[str, str], bytes]]
+
+
+def flaky_route(route: Route, failures: int, status: int = 503) -> Route:
+    """Answer the first ``failures`` requests with ``status``, then defer to ``route``."""
+    remaining = failures
+
+    def flaky(headers: dict[str, str]) -> tuple[int, dict[str, str], bytes]:
+        nonlocal remaining
+        if remaining:
+            remaining -= 1
+            return status, {}, b""
+        return route(headers)
+
+    return flaky
+
+
+class LocalHttpServer:
+    """
+    Threaded HTTP server on 127.0.0.1 serving canned responses per path.
+
+    Each route receives the request headers and returns ``(status, headers, body)``.
+    ``delay`` seconds are slept before answering to emulate a slow upstream.
+    """
+
+    def __init__(self, routes: dict[str, Route], delay: float = 0.0):
+        self.routes = routes
+        self.delay = delay
+        self.requests: list[tuple[str, dict[str, str]]] = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):  # noqa: N802
+                path = self.path.split("?", 1)[0]
+                headers = dict(self.headers.items())
+                server.requests.append((path, headers))
+                if server.delay:
+                    time.sleep(server.delay)
+                route = server.routes.get(path)
+                status, response_headers, body = (
+                    route(headers) if route else (404, {}, b"")
+                )
+                self.send_response(status)
+                for key, value in response_headers.items():
+                    self.send_header(key, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> Self:
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+class FakeLogTable:
+    """
+    In-memory stand-in for a PynamoDB model class backed by DynamoDB.
+
+    Supports ``save`` and ``batch_write`` the way ``AgentCoreInvokeLogModel``
+    does, with optional per-call latency and injected throttling.
+    """
+
+    def __init__(self, latency: float = 0.0, throttle: int = 0):
+        self.latency = latency
+        self.throttle = throttle
+        self.items: list[Any] = []
+        self.batch_sizes: list[int] = []
+        self.calls = 0
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def _call(self, items: list[Any]) -> None:
+        self.gate.wait()
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if self.throttle:
+            self.throttle -= 1
+            raise PutError("Failed to batch write items: max_retry_attempts exceeded")
+        self.items.extend(items)
+
+    def save(self, item: Any) -> None:
+        self._call([item])
+
+    def batch_write(self):
+        table = self
+
+        class _BatchWrite:
+            def __init__(self):
+                self.pending: list[Any] = []
+
+            def save(self, item: Any) -> None:
+                self.pending.append(item)
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc_info):
+                table.batch_sizes.append(len(self.pending))
+                table._call(self.pending)
+
+        return _BatchWrite()
+
+
+class FakeAgentCoreMemory:
+    """
+    In-memory AgentCore Memory event store counting ``list_events`` reads.
+
+    Stands in for both ``MemoryClient`` (``list_events`` / ``create_event``) and
+    its ``bedrock-agentcore`` data-plane client (``data_plane``), the two clients
+    ``AgentCoreMemorySessionManager`` talks to.
+    """
+
+    def __init__(self):
+        self.events: dict[tuple[str, str], list[dict]] = {}
+        self.reads = 0
+        self._sequence = 0
+        self.data_plane = _FakeMemoryDataPlane(self)
+
+    def _append(
+        self, actor_id: str, session_id: str, payload: list, metadata: dict | None
+    ) -> dict:
+        self._sequence += 1
+        event = {
+            "actorId": actor_id,
+            "sessionId": session_id,
+            "eventId": f"{self._sequence:016d}",
+            "payload": payload,
+            "metadata": metadata or {},
+        }
+        self.events.setdefault((actor_id, session_id), []).append(event)
+        return event
+
+    def list_events(
+        self,
+        memory_id: str,
+        actor_id: str,
+        session_id: str,
+        event_metadata: list[dict] | None = None,
+        max_results: int = 100,
+        **kwargs,
+    ) -> list[dict]:
+        self.reads += 1
+        events = list(reversed(self.events.get((actor_id, session_id), [])))
+        for condition in event_metadata or []:
+            key = condition["left"]["metadataKey"]
+            value = condition["right"]["metadataValue"]
+            events = [event for event in events if event["metadata"].get(key) == value]
+        return events[:max_results]
+
+    def create_event(
+        self,
+        memory_id: str,
+        actor_id: str,
+        session_id: str,
+        messages: list[tuple[str, str]],
+        event_timestamp=None,
+        **kwargs,
+    ) -> dict:
+        payload = [
+            {"conversational": {"content": {"text": text}, "role": role.upper()}}
+            for text, role in messages
+        ]
+        return self._append(actor_id, session_id, payload, None)
+
+
+class _FakeMemoryDataPlane:
+    def __init__(self, memory: FakeAgentCoreMemory):
+        self.memory = memory
+
+    def create_event(self, **kwargs) -> dict:
+        event = self.memory._append(
+            kwargs["actorId"],
+            kwargs["sessionId"],
+            kwargs["payload"],
+            kwargs.get("metadata"),
+        )
+        return {"event": event}
+
+    def delete_event(self, **kwargs):
+        pass
+
+
+def build_rss_feed(
+    count: int,
+    prefix: str = "Amazon",
+    start: int = 0,
+    base_url: str = "https://aws.example.com",
+) -> bytes:
+    """RSS 2.0 document with ``count`` items, newest first, one minute apart."""
+    items = []
+    for i in range(start, start + count):
+        published = time.strftime(
+            "%a, %d %b %Y %H:%M:%S +0000", time.gmtime(1_700_000_000 - i * 60)
+        )
+        items.append(
+            f"<item><title>{prefix} service update {i}</title>"
+            f"<link>{base_url}/news/{i}</link>"
+            f"<pubDate>{published}</pubDate>"
+            f"<description>Now available in Asia Pacific (Tokyo) region #{i}</description></item>"
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+        f"<title>{prefix} feed</title>{''.join(items)}</channel></rss>"
+    ).encode()
+
+
+def rss_route(body: bytes, etag: str = '"v1"') -> Route:
+    """Route serving ``body`` with ETag support (304 on a matching If-None-Match)."""
+
+    def route(headers: dict[str, str]) -> tuple[int, dict[str, str], bytes]:
+        if headers.get("If-None-Match") == etag:
+            return 304, {"ETag": etag}, b""
+        return 200, {"Content-Type": "application/rss+xml", "ETag": etag}, body
+
+    return route
+
+
+class LocalMcpServer:
+    """
+    Streamable HTTP MCP server on 127.0.0.1 with one ``search`` tool.
+
+    JSON-RPC methods received by the server are counted in ``methods`` (e.g.
+    ``methods["initialize"]``), so tests can check how many sessions were
+    opened and how often the tools were listed. ``tool_delay`` seconds are
+    slept before ``search`` answers to emulate a hanging server; an empty
+    query makes the tool fail with an error result.
+    """
+
+    def __init__(self, tool_delay: float = 0.0):
+        import uvicorn
+        from mcp.server.fastmcp import FastMCP
+
+        mcp = FastMCP("stub", log_level="WARNING")
+        self.tool_delay = tool_delay
+
+        @mcp.tool()
+        async def search(query: str) -> str:
+            """Search the web."""
+            if not query:
+                raise ValueError("query must not be empty")
+            await asyncio.sleep(self.tool_delay)
+            return f"results for {query}"
+
+        self.methods: dict[str, int] = {}
+        app = mcp.streamable_http_app()
+
+        async def counting_app(scope, receive, send):
+            if scope["type"] != "http" or scope["method"] != "POST":
+                return await app(scope, receive, send)
+            body = b""
+            more_body = True
+            while more_body:
+                message = await receive()
+                body += message.get("body", b"")
+                more_body = message.get("more_body", False)
+            payload = json.loads(body)
+            for request in payload if isinstance(payload, list) else [payload]:
+                method = request.get("method")
+                if method is not None:
+                    self.methods[method] = self.methods.get(method, 0) + 1
+            replayed = False
+
+            async def replay():
+                nonlocal replayed
+                if replayed:
+                    return await receive()
+                replayed = True
+                return {"type": "http.request", "body": body, "more_body": False}
+
+            await app(scope, replay, send)
+
+        self._server = uvicorn.Server(
+            uvicorn.Config(counting_app, host="127.0.0.1", port=0, log_level="warning")
+        )
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.servers[0].sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}/mcp"
+
+    def __enter__(self) -> Self:
+        self._thread.start()
+        while not self._server.started:
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.should_exit = True
+        self._thread.join()
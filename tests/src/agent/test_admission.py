@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+from src.agent.admission import (
+    AdmissionController,
+    AdmissionRejectedError,
+    RejectionReasonEnum,
+)
+
+
+def test_queued_invocation_gets_the_released_slot():
+    controller = AdmissionController(max_in_flight=1, max_queue=1, queue_timeout=1)
+
+    async def run():
+        first = await controller.acquire("alice")
+        queued = asyncio.create_task(controller.acquire("bob"))
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejectedError) as rejected:
+            await controller.acquire("carol")
+        stats = controller.stats()
+        first.release()
+        first.release()
+        second = await queued
+        return rejected.value, stats, second
+
+    rejected, stats, second = asyncio.run(run())
+
+    assert rejected.reason is RejectionReasonEnum.queue_full
+    assert (stats["in_flight"], stats["queued"]) == (1, 1)
+    assert second.actor_id == "bob"
+    # 解放は1回だけ数え、枠は待っていた呼び出しにそのまま渡る
+    assert controller.stats() | {"admitted": 2} == {
+        "in_flight": 1,
+        "max_in_flight": 1,
+        "queued": 0,
+        "actors": 1,
+        "admitted": 2,
+        "rejected_actor_limit": 0,
+        "rejected_queue_full": 1,
+        "rejected_queue_timeout": 0,
+    }
+
+
+def test_waiting_too_long_is_rejected_with_retry_after():
+    controller = AdmissionController(max_in_flight=1, queue_timeout=0.05, retry_after=7)
+
+    async def run():
+        await controller.acquire("alice")
+        with pytest.raises(AdmissionRejectedError) as rejected:
+            await controller.acquire("bob")
+        return rejected.value
+
+    rejected = asyncio.run(run())
+
+    assert rejected.reason is RejectionReasonEnum.queue_timeout
+    assert rejected.retry_after == 7
+    assert controller.stats()["queued"] == 0
+    assert controller.stats()["actors"] == 1
+
+
+def test_one_actor_cannot_take_every_slot():
+    controller = AdmissionController(max_in_flight=10, max_per_actor=2)
+
+    async def run():
+        held = [await controller.acquire("alice") for _ in range(2)]
+        with pytest.raises(AdmissionRejectedError) as rejected:
+            await controller.acquire("alice")
+        other = await controller.acquire("bob")
+        held[0].release()
+        again = await controller.acquire("alice")
+        return rejected.value, other, again
+
+    rejected, other, again = asyncio.run(run())
+
+    assert rejected.reason is RejectionReasonEnum.actor_limit
+    assert (other.actor_id, again.actor_id) == ("bob", "alice")
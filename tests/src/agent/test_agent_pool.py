@@ -0,0 +1,111 @@
+import asyncio
+import threading
+
+import pytest
+from strands import Agent
+from stubs import StubModel
+
+from src.agent.agent_pool import AgentPool, AgentPoolTimeoutError
+
+
+def _stub_agent_factory():
+    return Agent(
+        name="stub_agent", model=StubModel(text="x" * 400), callback_handler=None
+    )
+
+
+def test_checkout_resets_history():
+    pool = AgentPool("stub_agent", _stub_agent_factory, max_size=1, prewarm=1)
+
+    input_tokens = []
+    for _ in range(20):
+        with pool.checkout() as agent:
+            result = agent("hello")
+            input_tokens.append(result.metrics.accumulated_usage["inputTokens"])
+            assert len(agent.messages) == 2
+
+    assert len(set(input_tokens)) == 1
+    assert pool.stats()["size"] == 1
+
+
+def test_prewarmed_agents_are_created_by_warm():
+    created = []
+
+    def factory():
+        created.append(_stub_agent_factory())
+        return created[-1]
+
+    pool = AgentPool("stub_agent", factory, max_size=3, prewarm=2)
+    assert created == []
+
+    pool.warm()
+    pool.warm()
+
+    assert len(created) == 2
+    with pool.checkout() as agent:
+        assert agent in created
+
+
+def test_pool_is_bounded_and_exclusive():
+    pool = AgentPool(
+        "stub_agent", _stub_agent_factory, max_size=2, checkout_timeout=0.1
+    )
+
+    with pool.checkout() as first, pool.checkout() as second:
+        assert first is not second
+        assert pool.stats()["in_use"] == 2
+        with pytest.raises(AgentPoolTimeoutError), pool.checkout():
+            pass
+
+    assert pool.stats() == {
+        "name": "stub_agent",
+        "size": 2,
+        "idle": 2,
+        "in_use": 0,
+        "max_size": 2,
+    }
+
+
+def test_waiting_caller_gets_released_agent():
+    pool = AgentPool("stub_agent", _stub_agent_factory, max_size=1, prewarm=1)
+    borrowed = []
+
+    def borrow():
+        with pool.checkout() as agent:
+            borrowed.append(agent)
+
+    with pool.checkout() as agent:
+        waiter = threading.Thread(target=borrow)
+        waiter.start()
+
+    waiter.join(timeout=5)
+    assert borrowed == [agent]
+
+
+def test_cancelled_async_checkout_does_not_leak_an_agent():
+    pool = AgentPool("stub_agent", _stub_agent_factory, max_size=1, prewarm=1)
+    pool.warm()
+
+    async def run():
+        async def wait_for_agent():
+            async with pool.acheckout():
+                pass
+
+        with pool.checkout():
+            # 待っている間に取り消される（サブエージェントのタイムアウトなど）
+            waiting = asyncio.create_task(wait_for_agent())
+            await asyncio.sleep(0.01)
+            waiting.cancel()
+            # Agent が渡された直後、再開する前に取り消される
+            handed_over = asyncio.create_task(wait_for_agent())
+            await asyncio.sleep(0.01)
+        handed_over.cancel()
+        for task in (waiting, handed_over):
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        async with pool.acheckout() as agent:
+            return agent
+
+    assert asyncio.run(run()) is not None
+    assert pool.stats()["in_use"] == 0
@@ -0,0 +1,82 @@
+import pytest
+from strands import Agent, tool
+from strands.tools.tool_provider import ToolProvider
+from stubs import StubModel
+
+from src.agent.agent_template import AgentTemplate
+
+
+@tool
+def lookup(city: str) -> str:
+    """Look up a city.
+    Args:
+        city: The name of the city
+    """
+    return f"{city}: sunny"
+
+
+def test_agents_share_the_template_tools_and_keep_their_own_state():
+    model = StubModel(text="done", tool_calls=[("lookup", {"city": "大阪"})])
+    template = AgentTemplate(
+        name="main_agent",
+        model=model,
+        tools=[lookup],
+        system_prompt="""
+            You are a kind AI assistant.
+            Answer in Japanese.
+        """,
+    )
+
+    first = template.create(callback_handler=None)
+    second = template.create(callback_handler=None)
+    first("天気は？")
+
+    assert template.system_prompt == "You are a kind AI assistant.\nAnswer in Japanese."
+    assert first.tool_registry is not second.tool_registry
+    assert second.messages == []
+    assert first.messages[-1]["content"][0]["text"] == "done"
+    # テンプレートのツール定義は素の Agent と同じものがモデルに渡る
+    plain = Agent(model=model, tools=[lookup], callback_handler=None)
+    assert model.calls[0]["tool_specs"] == plain.tool_registry.get_all_tool_specs()
+
+
+@tool
+def forecast(city: str) -> str:
+    """Forecast for a city.
+    Args:
+        city: The name of the city
+    """
+    return f"{city}: rain"
+
+
+def test_tools_registered_at_runtime_stay_on_their_agent():
+    template = AgentTemplate(
+        name="main_agent", model=StubModel(), tools=[lookup], system_prompt="x"
+    )
+    first = template.create(callback_handler=None)
+    second = template.create(callback_handler=None)
+
+    # structured_output も同じように一時的なツールを登録する
+    first.tool_registry.register_dynamic_tool(forecast)
+
+    assert set(first.tool_registry.get_all_tools_config()) == {"lookup", "forecast"}
+    assert set(second.tool_registry.get_all_tools_config()) == {"lookup"}
+    assert second.tool_registry.dynamic_tools == {}
+
+
+class EmptyToolProvider(ToolProvider):
+    async def load_tools(self, **kwargs):
+        return []
+
+    def add_consumer(self, consumer_id, **kwargs):
+        pass
+
+    def remove_consumer(self, consumer_id, **kwargs):
+        pass
+
+
+def test_tool_providers_are_rejected():
+    with pytest.raises(ValueError, match="Tool providers"):
+        AgentTemplate(
+            name="x", model=StubModel(), tools=[EmptyToolProvider()], system_prompt="x"
+        )
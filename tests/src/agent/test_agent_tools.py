@@ -0,0 +1,203 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+from stubs import LocalHttpServer, StubKnowledgeBaseClient, flaky_route
+
+from src.agent import agent_tools
+from src.agent.kb_cache import KnowledgeBaseCache
+
+
+class StubGeolocator:
+    def geocode(self, location):
+        return SimpleNamespace(latitude=34.69, longitude=135.50)
+
+
+def _weather_route(headers):
+    body = {"current": {"temperature_2m": 22.5, "weather_code": 3}}
+    return 200, {"Content-Type": "application/json"}, json.dumps(body).encode()
+
+
+def test_get_weather_is_async(monkeypatch):
+    monkeypatch.setattr(agent_tools, "get_geolocator", StubGeolocator)
+
+    with LocalHttpServer({"/v1/forecast": _weather_route}) as server:
+        monkeypatch.setattr(
+            agent_tools.weather_settings,
+            "weather_api_url",
+            f"{server.url}/v1/forecast",
+        )
+        result = asyncio.run(agent_tools.get_weather("大阪"))
+
+    assert result == "Overcast, 22.5°C"
+
+
+def test_weather_report_is_structured(monkeypatch):
+    monkeypatch.setattr(agent_tools, "get_geolocator", StubGeolocator)
+
+    with LocalHttpServer({"/v1/forecast": _weather_route}) as server:
+        monkeypatch.setattr(
+            agent_tools.weather_settings,
+            "weather_api_url",
+            f"{server.url}/v1/forecast",
+        )
+        report = asyncio.run(agent_tools.fetch_weather_report("大阪"))
+
+    assert report.model_dump() == {
+        "location": "大阪",
+        "status": "ok",
+        "weather": "Overcast",
+        "weather_code": 3,
+        "temperature_c": 22.5,
+    }
+
+
+def _dependency(name: str, **options):
+    # agent_tools が捕捉する例外と同じモジュールの Dependency を使う
+    return type(agent_tools.weather_api)(name, retry_base_delay=0, **options)
+
+
+def test_weather_api_errors_are_retried(monkeypatch):
+    monkeypatch.setattr(agent_tools, "get_geolocator", StubGeolocator)
+    monkeypatch.setattr(agent_tools, "weather_api", _dependency("weather_api"))
+
+    routes = {"/v1/forecast": flaky_route(_weather_route, failures=2)}
+    with LocalHttpServer(routes) as server:
+        monkeypatch.setattr(
+            agent_tools.weather_settings,
+            "weather_api_url",
+            f"{server.url}/v1/forecast",
+        )
+        result = asyncio.run(agent_tools.get_weather("大阪"))
+
+    assert result == "Overcast, 22.5°C"
+    assert len(server.requests) == 3
+
+
+def test_weather_api_outage_degrades_fast_once_the_circuit_opens(monkeypatch):
+    monkeypatch.setattr(agent_tools, "get_geolocator", StubGeolocator)
+    weather_api = _dependency("weather_api", max_attempts=2, failure_threshold=2)
+    monkeypatch.setattr(agent_tools, "weather_api", weather_api)
+
+    routes = {"/v1/forecast": flaky_route(_weather_route, failures=100)}
+    with LocalHttpServer(routes) as server:
+        monkeypatch.setattr(
+            agent_tools.weather_settings,
+            "weather_api_url",
+            f"{server.url}/v1/forecast",
+        )
+
+        async def run():
+            return [await agent_tools.get_weather("大阪") for _ in range(3)]
+
+        results = asyncio.run(run())
+
+    assert results == ["Weather data currently unavailable"] * 3
+    # 2回の呼び出しで各2回試した後はサーキットが開き、上流に送らない
+    assert len(server.requests) == 4
+    assert weather_api.stats()["short_circuits"] == 1
+
+
+def test_throttled_knowledge_base_is_retried(monkeypatch):
+    kb_client = StubKnowledgeBaseClient(failures=1)
+    monkeypatch.setattr(agent_tools, "get_kb_client", lambda: kb_client)
+    monkeypatch.setattr(agent_tools, "kb_response_cache", KnowledgeBaseCache())
+    monkeypatch.setattr(agent_tools, "knowledge_base", _dependency("knowledge_base"))
+
+    result = asyncio.run(agent_tools.get_frontend_best_practices("RSC"))
+
+    assert result == "Use Server Components."
+    assert len(kb_client.calls) == 2
+
+
+def test_knowledge_base_outage_returns_an_uncached_degraded_answer(monkeypatch):
+    kb_client = StubKnowledgeBaseClient(failures=1)
+    monkeypatch.setattr(agent_tools, "get_kb_client", lambda: kb_client)
+    monkeypatch.setattr(agent_tools, "kb_response_cache", KnowledgeBaseCache())
+    monkeypatch.setattr(
+        agent_tools, "knowledge_base", _dependency("knowledge_base", max_attempts=1)
+    )
+
+    async def run():
+        degraded = await agent_tools.get_frontend_best_practices("RSC")
+        recovered = await agent_tools.get_frontend_best_practices("RSC")
+        return degraded, recovered
+
+    degraded, recovered = asyncio.run(run())
+
+    assert degraded == agent_tools.KNOWLEDGE_BASE_UNAVAILABLE
+    assert recovered == "Use Server Components."
+
+
+def test_knowledge_base_call_runs_off_the_event_loop(monkeypatch):
+    kb_client = StubKnowledgeBaseClient()
+    monkeypatch.setattr(agent_tools, "get_kb_client", lambda: kb_client)
+    monkeypatch.setattr(agent_tools, "kb_response_cache", KnowledgeBaseCache())
+
+    result = asyncio.run(agent_tools.get_frontend_best_practices("RSC"))
+
+    assert result == "Use Server Components."
+    assert kb_client.threads[0].startswith("blocking-io")
+
+
+def test_knowledge_base_responses_are_cached(monkeypatch):
+    kb_client = StubKnowledgeBaseClient()
+    monkeypatch.setattr(agent_tools, "get_kb_client", lambda: kb_client)
+    monkeypatch.setattr(agent_tools, "kb_response_cache", KnowledgeBaseCache())
+
+    async def run():
+        await agent_tools.get_frontend_best_practices("React Server Components")
+        return await agent_tools.get_frontend_best_practices("react server components?")
+
+    assert asyncio.run(run()) == "Use Server Components."
+    assert len(kb_client.threads) == 1
+
+
+def test_retrieve_mode_returns_ranked_chunks_without_generation(monkeypatch):
+    kb_client = StubKnowledgeBaseClient(
+        chunks=[
+            ("| Data ID | 価格 |\n| 101 | 3000万円 |", {"Data ID": "101"}),
+            ("| Data ID | 価格 |\n| 205 | 4500万円 |", {"Data ID": "205"}),
+        ]
+    )
+    monkeypatch.setattr(agent_tools, "get_kb_client", lambda: kb_client)
+    monkeypatch.setattr(agent_tools, "estate_kb_response_cache", KnowledgeBaseCache())
+    monkeypatch.setattr(
+        agent_tools.estate_knowledge_base_settings, "estate_kb_mode", "retrieve"
+    )
+
+    result = asyncio.run(agent_tools.get_estate_info("渋谷区のマンション価格"))
+
+    assert [name for name, _ in kb_client.calls] == ["retrieve"]
+    assert kb_client.calls[0][1]["retrievalQuery"] == {"text": "渋谷区のマンション価格"}
+    assert result.index("[1] score=0.900 source=s3://kb/0.md\nData ID: 101") == 0
+    assert "[2] score=0.850 source=s3://kb/1.md\nData ID: 205\n| Data ID |" in result
+    assert kb_client.generation_output_tokens == 0
+
+
+def test_knowledge_base_cache_misses_for_a_different_number_of_results(monkeypatch):
+    kb_client = StubKnowledgeBaseClient()
+    monkeypatch.setattr(agent_tools, "get_kb_client", lambda: kb_client)
+    cache = KnowledgeBaseCache()
+
+    async def query(number_of_results: int):
+        return await agent_tools._query_knowledge_base(
+            cache,
+            "渋谷区のマンション価格",
+            mode="retrieve",
+            knowledge_base_id="estate-kb",
+            model_arn="arn:aws:bedrock:model",
+            number_of_results=number_of_results,
+        )
+
+    async def run():
+        await query(3)
+        await query(10)
+        await query(10)
+
+    asyncio.run(run())
+
+    assert [
+        call["retrievalConfiguration"]["vectorSearchConfiguration"]["numberOfResults"]
+        for _, call in kb_client.calls
+    ] == [3, 10]
@@ -0,0 +1,128 @@
+import asyncio
+
+from strands import Agent
+from stubs import StubModel
+
+from src.agent.compaction import TokenBudgetConversationManager, estimate_tokens
+from src.agent.models import CompactionAttribute
+
+
+def _history(turns: int, size: int = 400) -> list[dict]:
+    messages = []
+    for i in range(turns):
+        messages.append(
+            {"role": "user", "content": [{"text": f"question {i} " * size}]}
+        )
+        messages.append(
+            {
+                "role": "assistant",
+                "content": [
+                    {
+                        "toolUse": {
+                            "toolUseId": f"t{i}",
+                            "name": "call_weather_agent",
+                            "input": {"city": "大阪"},
+                        }
+                    }
+                ],
+            }
+        )
+        messages.append(
+            {
+                "role": "user",
+                "content": [
+                    {
+                        "toolResult": {
+                            "toolUseId": f"t{i}",
+                            "status": "success",
+                            "content": [{"text": "晴れ"}],
+                        }
+                    }
+                ],
+            }
+        )
+        messages.append({"role": "assistant", "content": [{"text": f"answer {i}"}]})
+    return messages
+
+
+def test_history_is_trimmed_to_whole_turns_within_budget():
+    manager = TokenBudgetConversationManager(token_budget=3000)
+    model = StubModel(text="ok")
+    agent = Agent(
+        model=model,
+        messages=_history(10),
+        conversation_manager=manager,
+        callback_handler=None,
+    )
+
+    agent("question 10")
+
+    # 1ターン ≒ 1000 トークンなので直近 2 ターンだけ残して新しい質問を送る
+    assert model.calls[0]["messages"] == 9
+    assert agent.messages[0]["content"][0]["text"].startswith("question 8")
+    assert manager.removed_message_count == 32
+    assert manager.last_compaction["evicted_messages"] == 32
+    assert manager.last_compaction["compacted_tokens"] <= 3000
+    assert manager.last_compaction["history_tokens"] > 10000
+
+
+def test_history_is_kept_whole_without_a_budget():
+    manager = TokenBudgetConversationManager()
+    model = StubModel(text="ok")
+    agent = Agent(
+        model=model,
+        messages=_history(10),
+        conversation_manager=manager,
+        callback_handler=None,
+    )
+
+    agent("question 10")
+
+    # 既定では圧縮しない（コンテキスト超過時の reduce_context だけが古いターンを落とす）
+    assert model.calls[0]["messages"] == 41
+    assert manager.removed_message_count == 0
+    assert manager.last_compaction["evicted_messages"] == 0
+
+
+def test_summarize_keeps_evicted_turns_as_rolling_summary():
+    manager = TokenBudgetConversationManager(token_budget=3000, summarize=True)
+    agent = Agent(
+        model=StubModel(text="大阪の天気を何度も尋ねた"),
+        messages=_history(4),
+        conversation_manager=manager,
+        callback_handler=None,
+    )
+
+    asyncio.run(manager.compact(agent))
+
+    summary, ack, first_kept = agent.messages[:3]
+    assert summary["role"] == "user"
+    assert summary["content"][0]["text"].endswith("大阪の天気を何度も尋ねた")
+    assert ack["role"] == "assistant"
+    assert first_kept["content"][0]["text"].startswith("question 2")
+    assert manager.last_compaction["summary_tokens"] > 0
+
+    # セッション復元時は要約が先頭に戻り、退避済みのメッセージは読み飛ばされる
+    restored = TokenBudgetConversationManager(token_budget=3000, summarize=True)
+    prepend = restored.restore_from_session(manager.get_state())
+    assert prepend == [summary, ack]
+    assert restored.removed_message_count == 8
+
+
+def test_short_history_is_left_untouched():
+    manager = TokenBudgetConversationManager(token_budget=3000)
+    agent = Agent(model=StubModel(), messages=_history(1), conversation_manager=manager)
+    tokens = estimate_tokens(agent.messages)
+
+    asyncio.run(manager.compact(agent))
+
+    assert len(agent.messages) == 4
+    assert manager.last_compaction == {
+        "history_tokens": tokens,
+        "compacted_tokens": tokens,
+        "evicted_messages": 0,
+        "summary_tokens": 0,
+    }
+    assert (
+        CompactionAttribute.from_stats(manager.last_compaction).HistoryTokens == tokens
+    )
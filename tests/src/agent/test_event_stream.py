@@ -0,0 +1,171 @@
+import asyncio
+import json
+import time
+
+import pytest
+from sse_starlette.event import ensure_bytes
+
+from src.agent.event_stream import (
+    SSE_SEPARATOR,
+    DeltaCoalescer,
+    coalesce_deltas,
+    encode_event,
+)
+from src.agent.models import EventTypeEnum, InvocationResponseModel
+
+EVENTS = [
+    {"messageStart": {"role": "assistant"}},
+    {"contentBlockStart": {"start": {"toolUse": {"toolUseId": "t1", "name": "x"}}}},
+    {"contentBlockDelta": {"delta": {"text": "大阪は晴れ"}, "contentBlockIndex": 0}},
+    {"contentBlockDelta": {"delta": {"text": 'line\nbreak\r\n "quoted"  '}}},
+    {"contentBlockDelta": {"delta": {"toolUse": {"input": '{"city": "大阪"}'}}}},
+    {"contentBlockStop": {"contentBlockIndex": 0}},
+    {"messageStop": {"stopReason": "end_turn"}},
+    {
+        "metadata": {
+            "usage": {"inputTokens": 10, "outputTokens": 5, "totalTokens": 15},
+            "metrics": {"latencyMs": 120},
+        }
+    },
+]
+
+
+def _legacy_frame(event: dict) -> bytes:
+    # 以前の main.parse_event_message と同じ手順（モデルを経由してから sse-starlette でフレーム化）
+    response = InvocationResponseModel(
+        event=EventTypeEnum[next(iter(event))],
+        data=json.dumps(event, ensure_ascii=False),
+    )
+    return ensure_bytes(response.model_dump(mode="json"), SSE_SEPARATOR)
+
+
+@pytest.mark.parametrize("event", EVENTS, ids=lambda event: next(iter(event)))
+def test_encoded_frames_match_the_previous_wire_format(event):
+    assert encode_event(event) == _legacy_frame(event)
+
+
+def test_frames_parse_back_like_the_proxy_client_does():
+    stream = b"".join(encode_event(event) for event in EVENTS).decode()
+    frames = [frame for frame in stream.split("\r\n\r\n") if frame]
+
+    parsed = []
+    for frame in frames:
+        fields = dict(line.split(": ", 1) for line in frame.split("\r\n"))
+        parsed.append((fields["event"], json.loads(fields["data"])))
+    assert parsed == [(next(iter(event)), event) for event in EVENTS]
+
+
+def test_unknown_event_type_is_rejected():
+    with pytest.raises(KeyError):
+        encode_event({"redactContent": {}})
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _delta(text: str, index: int = 0) -> dict:
+    return {"contentBlockDelta": {"delta": {"text": text}, "contentBlockIndex": index}}
+
+
+def test_coalescer_merges_text_deltas_and_keeps_event_order():
+    clock = FakeClock()
+    coalescer = DeltaCoalescer(max_chars=10, window=0.03, clock=clock)
+    tool_input = {"contentBlockDelta": {"delta": {"toolUse": {"input": "{}"}}}}
+    stream = [
+        {"messageStart": {"role": "assistant"}},
+        _delta("大阪"),
+        _delta("は"),
+        _delta("晴れ"),
+        {"contentBlockStop": {"contentBlockIndex": 0}},
+        _delta("0123456789", index=1),
+        _delta("ab", index=1),
+        _delta("cd", index=2),
+        tool_input,
+        {"messageStop": {"stopReason": "end_turn"}},
+    ]
+
+    sent = [event for event in stream for event in coalescer.push(event)]
+    sent += coalescer.flush()
+
+    assert sent == [
+        {"messageStart": {"role": "assistant"}},
+        _delta("大阪は晴れ"),
+        {"contentBlockStop": {"contentBlockIndex": 0}},
+        _delta("0123456789", index=1),  # max_chars reached
+        _delta("ab", index=1),  # next block starts
+        _delta("cd", index=2),
+        tool_input,  # tool input deltas are passed through as-is
+        {"messageStop": {"stopReason": "end_turn"}},
+    ]
+
+
+def test_coalescer_flushes_after_the_time_window():
+    clock = FakeClock()
+    coalescer = DeltaCoalescer(max_chars=512, window=0.03, clock=clock)
+
+    assert coalescer.push(_delta("a")) == []
+    clock.now = 0.01
+    assert coalescer.push(_delta("b")) == []
+    clock.now = 0.03
+    assert coalescer.push(_delta("c")) == [_delta("abc")]
+    clock.now = 0.05
+    assert coalescer.push(_delta("d")) == []
+    assert coalescer.flush() == [_delta("d")]
+    assert coalescer.flush() == []
+
+
+async def _upstream(*items):
+    for item in items:
+        if isinstance(item, float):
+            await asyncio.sleep(item)
+        else:
+            yield item
+
+
+async def _timed(messages) -> list[tuple[float, dict]]:
+    started = time.monotonic()
+    return [(time.monotonic() - started, msg) async for msg in messages]
+
+
+def test_buffered_text_is_sent_when_the_window_expires_without_new_events():
+    messages = _upstream(
+        {"event": _delta("a")},
+        {"event": _delta("b")},
+        0.5,  # the model stalls
+        {"event": _delta("c")},
+        {"event": {"contentBlockStop": {"contentBlockIndex": 0}}},
+        {"result": "done"},
+    )
+    coalescer = DeltaCoalescer(max_chars=512, window=0.03)
+
+    sent = asyncio.run(_timed(coalesce_deltas(messages, coalescer)))
+
+    assert [msg for _, msg in sent] == [
+        {"event": _delta("ab")},
+        {"event": _delta("c")},
+        {"event": {"contentBlockStop": {"contentBlockIndex": 0}}},
+        {"result": "done"},
+    ]
+    # "ab" goes out after the window, not when "c" arrives after the stall
+    assert sent[0][0] < 0.3
+    assert sent[1][0] >= 0.5
+
+
+def test_coalesce_deltas_raises_upstream_errors():
+    async def failing():
+        yield {"event": _delta("a")}
+        raise RuntimeError("model unavailable")
+
+    async def consume():
+        sent = []
+        with pytest.raises(RuntimeError, match="model unavailable"):
+            async for msg in coalesce_deltas(failing(), DeltaCoalescer(window=10)):
+                sent.append(msg)
+        return sent
+
+    assert asyncio.run(consume()) == []
@@ -0,0 +1,152 @@
+import asyncio
+import time
+
+from strands import Agent
+from stubs import StubModel
+
+from src.agent import main
+from src.agent.agent_pool import AgentPool
+from src.agent.fan_out import invoke_sub_agent
+
+SUB_AGENT_DELAY = 0.3
+
+
+def _pool(name: str, text: str, delay: float = SUB_AGENT_DELAY) -> AgentPool:
+    return AgentPool(
+        name=name,
+        factory=lambda: Agent(
+            model=StubModel(text=text, delay=delay), callback_handler=None
+        ),
+        max_size=2,
+    )
+
+
+def _ask_weather_and_news(monkeypatch, max_concurrency: int) -> tuple[str, float]:
+    monkeypatch.setattr(main, "weather_agent_pool", _pool("weather_agent", "晴れ"))
+    monkeypatch.setattr(main, "aws_rss_agent_pool", _pool("aws_rss_agent", "Lambda"))
+    main_agent = Agent(
+        model=StubModel(
+            text="大阪は晴れ、Lambda の新機能があります。",
+            tool_calls=[
+                ("call_weather_agent", {"city": "大阪"}),
+                ("call_aws_rss_agent", {"keyword": "Lambda"}),
+            ],
+        ),
+        tools=[main.call_weather_agent, main.call_aws_rss_agent],
+        callback_handler=None,
+    )
+
+    async def run():
+        # main が参照しているモジュールの上限を設定する
+        main.limit_fan_out(max_concurrency)
+        started = time.perf_counter()
+        result = await main_agent.invoke_async("大阪の天気と AWS の最新ニュースは？")
+        return str(result), time.perf_counter() - started
+
+    return asyncio.run(run())
+
+
+def test_independent_sub_agent_calls_overlap(monkeypatch):
+    answer, elapsed = _ask_weather_and_news(monkeypatch, max_concurrency=4)
+
+    assert answer.strip() == "大阪は晴れ、Lambda の新機能があります。"
+    # 2 つのサブエージェント（各 0.3 秒）が並行して走るので合計ではなく最大値で済む
+    assert elapsed < SUB_AGENT_DELAY * 1.7
+
+
+def test_concurrency_cap_serializes_sub_agents(monkeypatch):
+    _, elapsed = _ask_weather_and_news(monkeypatch, max_concurrency=1)
+
+    assert elapsed >= SUB_AGENT_DELAY * 2
+
+
+def test_slow_sub_agent_times_out_and_pool_recovers():
+    pool = _pool("search_agent", "done", delay=1.0)
+
+    async def run():
+        return await invoke_sub_agent(pool, "slow question", timeout=0.1)
+
+    started = time.perf_counter()
+    result = asyncio.run(run())
+
+    assert time.perf_counter() - started < 0.5
+    assert result == "search_agent did not respond within 0.1 seconds."
+    assert pool.stats()["in_use"] == 0
+
+
+def test_invocation_timings_break_down_sub_agents_and_tools(monkeypatch):
+    monkeypatch.setattr(main, "weather_agent_pool", _pool("weather_agent", "晴れ"))
+    monkeypatch.setattr(main, "aws_rss_agent_pool", _pool("aws_rss_agent", "Lambda"))
+    main_agent = Agent(
+        name="main_agent",
+        model=StubModel(
+            text="大阪は晴れです。",
+            tool_calls=[
+                ("call_weather_agent", {"city": "大阪"}),
+                ("call_aws_rss_agent", {"keyword": "Lambda"}),
+            ],
+        ),
+        tools=[main.call_weather_agent, main.call_aws_rss_agent],
+        hooks=[main.timing_hooks],
+        callback_handler=None,
+    )
+
+    async def run():
+        timings = main.start_timings()
+        await main_agent.invoke_async("大阪の天気と AWS の最新ニュースは？")
+        return timings.summary()
+
+    summary = asyncio.run(run())
+
+    stages = summary["stages"]
+    assert stages["model.main_agent"]["count"] == 2
+    for name in ("weather_agent", "aws_rss_agent"):
+        # 並行して走ったツールとサブエージェントがそれぞれ計測される
+        assert stages[f"tool.call_{name}"]["count"] == 1
+        assert stages[f"sub_agent.{name}"]["total_ms"] >= SUB_AGENT_DELAY * 1000
+        assert summary["sub_agents"][name]["calls"] == 1
+        assert summary["sub_agents"][name]["total_tokens"] > 0
+    assert summary["total_ms"] < SUB_AGENT_DELAY * 1700
+
+
+def test_sub_agent_model_and_tool_calls_are_in_the_breakdown(monkeypatch):
+    from src.agent import sub_agents
+
+    # 本物のファクトリ（フック付き）で、モデルだけをスタブにする
+    monkeypatch.setattr(
+        sub_agents,
+        "_model",
+        lambda agent_name: StubModel(
+            text="晴れです。",
+            tool_calls=[("current_time", {"timezone": "Asia/Tokyo"})],
+        ),
+    )
+    monkeypatch.setattr(
+        main,
+        "weather_agent_pool",
+        AgentPool(
+            name="weather_agent", factory=sub_agents.create_weather_agent, max_size=1
+        ),
+    )
+    main_agent = Agent(
+        name="main_agent",
+        model=StubModel(
+            text="晴れです。", tool_calls=[("call_weather_agent", {"city": "大阪"})]
+        ),
+        tools=[main.call_weather_agent],
+        hooks=[main.timing_hooks],
+        callback_handler=None,
+    )
+
+    async def run():
+        timings = main.start_timings()
+        await main_agent.invoke_async("大阪の天気は？")
+        return timings.summary()
+
+    stages = asyncio.run(run())["stages"]
+
+    assert stages["tool.call_weather_agent"]["count"] == 1
+    assert stages["sub_agent.weather_agent"]["count"] == 1
+    assert stages["sub_agent.weather_agent.model"]["count"] == 2
+    assert stages["sub_agent.weather_agent.tool.current_time"]["count"] == 1
+    assert "tool.current_time" not in stages
@@ -0,0 +1,102 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+from src.agent.geocoding import GeocodeCache, normalize_location
+
+
+class CountingGeocoder:
+    def __init__(self):
+        self.calls: list[tuple[str, float]] = []
+
+    def __call__(self, location):
+        self.calls.append((location, time.monotonic()))
+        if location == "nowhere":
+            return None
+        return SimpleNamespace(latitude=1.0, longitude=2.0)
+
+
+def test_normalize_location():
+    assert normalize_location("  Ｏｓａｋａ   City ") == "osaka city"
+
+
+def test_seeded_cities_skip_the_geocoder():
+    geocoder = CountingGeocoder()
+    cache = GeocodeCache(geocoder, min_interval=0)
+
+    point = asyncio.run(cache.lookup("大阪"))
+
+    assert (point.latitude, point.longitude) == (34.6937, 135.5023)
+    assert geocoder.calls == []
+    assert cache.stats()["hit_ratio"] == 1.0
+
+
+def test_misses_are_cached_rate_limited_and_coalesced():
+    geocoder = CountingGeocoder()
+    cache = GeocodeCache(geocoder, min_interval=0.05, seeds={})
+
+    async def run():
+        await asyncio.gather(*(cache.lookup("Kobe") for _ in range(5)))
+        await cache.lookup("kobe")
+        await cache.lookup("nowhere")
+        assert await cache.lookup("nowhere") is None
+
+    asyncio.run(run())
+
+    assert [location for location, _ in geocoder.calls] == ["Kobe", "nowhere"]
+    assert geocoder.calls[1][1] - geocoder.calls[0][1] >= 0.05
+    stats = cache.stats()
+    assert stats["upstream_calls"] == 2
+    assert stats["hits"] == 2
+    assert stats["misses"] == 6
+
+
+def test_lru_eviction_and_ttl():
+    geocoder = CountingGeocoder()
+    cache = GeocodeCache(geocoder, max_entries=1, ttl=0.05, min_interval=0, seeds={})
+
+    async def run():
+        await cache.lookup("a")
+        await cache.lookup("b")
+        await cache.lookup("a")  # evicted by "b"
+        await asyncio.sleep(0.06)
+        await cache.lookup("a")  # expired
+
+    asyncio.run(run())
+
+    assert [location for location, _ in geocoder.calls] == ["a", "b", "a", "a"]
+
+
+def test_sqlite_store_survives_restart(tmp_path):
+    db_path = str(tmp_path / "geocode.sqlite3")
+    geocoder = CountingGeocoder()
+
+    asyncio.run(GeocodeCache(geocoder, db_path=db_path, seeds={}).lookup("Kobe"))
+    restarted = GeocodeCache(geocoder, db_path=db_path, seeds={})
+    point = asyncio.run(restarted.lookup("kobe"))
+
+    assert point.latitude == 1.0
+    assert len(geocoder.calls) == 1
+
+
+def test_cancelled_lookup_does_not_hang_concurrent_lookups():
+    class SlowGeocoder(CountingGeocoder):
+        def __call__(self, location):
+            time.sleep(0.05)
+            return super().__call__(location)
+
+    geocoder = SlowGeocoder()
+    cache = GeocodeCache(geocoder, min_interval=0, seeds={})
+
+    async def run():
+        first = asyncio.create_task(cache.lookup("Kobe"))
+        await asyncio.sleep(0.01)
+        waiting = asyncio.create_task(cache.lookup("Kobe"))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        async with asyncio.timeout(1):
+            return await waiting
+
+    point = asyncio.run(run())
+
+    assert (point.latitude, point.longitude) == (1.0, 2.0)
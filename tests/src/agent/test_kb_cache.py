@@ -0,0 +1,152 @@
+import asyncio
+
+from src.agent.kb_cache import KnowledgeBaseCache, cache_key, normalize_query
+from src.agent.models import KnowledgeBaseResponse
+
+KB_ID = "kb-1"
+MODEL_ARN = "arn:aws:bedrock:model"
+
+
+def _key(
+    query: str,
+    knowledge_base_id: str = KB_ID,
+    model_arn: str = MODEL_ARN,
+    number_of_results: int = 5,
+    mode: str = "retrieve_and_generate",
+):
+    return cache_key(knowledge_base_id, mode, model_arn, number_of_results, query)
+
+
+def _generator(calls: list[str], text: str = "answer", delay: float = 0.0):
+    def generate(query: str):
+        async def call():
+            calls.append(query)
+            await asyncio.sleep(delay)
+            return KnowledgeBaseResponse(text=text, citations=[{"id": len(calls)}])
+
+        return call
+
+    return generate
+
+
+def test_normalize_query_ignores_case_width_and_trailing_punctuation():
+    assert normalize_query("  ＲＥＡＣＴ の  Hooks？ ") == normalize_query(
+        "react の hooks"
+    )
+
+
+def test_exact_cache_is_scoped_by_knowledge_base_and_model():
+    calls = []
+    generate = _generator(calls)
+    cache = KnowledgeBaseCache()
+
+    async def run():
+        await cache.get_or_generate(_key("Server Components"), generate("a"))
+        await cache.get_or_generate(_key("server components?"), generate("b"))
+        await cache.get_or_generate(
+            _key("Server Components", knowledge_base_id="kb-2"), generate("c")
+        )
+        await cache.get_or_generate(
+            _key("Server Components", model_arn="other"), generate("d")
+        )
+
+    asyncio.run(run())
+
+    assert calls == ["a", "c", "d"]
+    assert cache.stats() | {"hit_ratio": None} == {
+        "entries": 3,
+        "hits": 1,
+        "similar_hits": 0,
+        "misses": 3,
+        "hit_ratio": None,
+    }
+
+
+def test_exact_cache_is_scoped_by_mode_and_number_of_results():
+    calls = []
+    generate = _generator(calls)
+    cache = KnowledgeBaseCache(similarity_threshold=0.5)
+
+    async def run():
+        await cache.get_or_generate(_key("hooks", number_of_results=3), generate("a"))
+        await cache.get_or_generate(_key("hooks", number_of_results=10), generate("b"))
+        await cache.get_or_generate(
+            _key("hooks", model_arn=None, mode="retrieve", number_of_results=3),
+            generate("c"),
+        )
+        await cache.get_or_generate(_key("Hooks?", number_of_results=10), generate("d"))
+
+    asyncio.run(run())
+
+    # 件数やモードが違えば類似検索でも別のエントリになる
+    assert calls == ["a", "b", "c"]
+    assert cache.stats()["hits"] == 1
+
+
+def test_similarity_mode_matches_rephrased_queries():
+    cache = KnowledgeBaseCache(similarity_threshold=0.6)
+    cache.put(
+        _key("Next.js の App Router のベストプラクティス"),
+        KnowledgeBaseResponse(text="cached"),
+    )
+
+    similar = cache.get(_key("Next.jsのApp Routerのベストプラクティスは？"))
+    unrelated = cache.get(_key("React のテスト戦略"))
+
+    assert similar is not None and similar.text == "cached"
+    assert unrelated is None
+    assert cache.stats()["similar_hits"] == 1
+
+
+def test_entries_expire_and_are_evicted_by_size():
+    cache = KnowledgeBaseCache(max_entries=2, ttl=0)
+    cache.put(_key("a"), KnowledgeBaseResponse(text="a"))
+    assert cache.get(_key("a")) is None
+
+    cache = KnowledgeBaseCache(max_entries=2)
+    for query in ["a", "b", "c"]:
+        cache.put(_key(query), KnowledgeBaseResponse(text=query))
+    assert cache.get(_key("a")) is None
+    assert cache.get(_key("c")).text == "c"
+
+
+def test_concurrent_misses_share_one_request():
+    calls = []
+    generate = _generator(calls, delay=0.05)
+    cache = KnowledgeBaseCache()
+
+    async def run():
+        return await asyncio.gather(
+            *(cache.get_or_generate(_key("hooks"), generate(str(i))) for i in range(5))
+        )
+
+    results = asyncio.run(run())
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+
+
+def test_waiting_callers_take_over_when_the_first_call_is_cancelled():
+    calls = []
+    generate = _generator(calls, delay=0.05)
+    cache = KnowledgeBaseCache()
+
+    async def run():
+        leader = asyncio.create_task(
+            cache.get_or_generate(_key("Hooks"), generate("leader"))
+        )
+        await asyncio.sleep(0.01)
+        followers = [
+            asyncio.create_task(cache.get_or_generate(_key("Hooks"), generate(name)))
+            for name in ("a", "b")
+        ]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        async with asyncio.timeout(1):
+            return await asyncio.gather(*followers)
+
+    responses = asyncio.run(run())
+
+    # 取り消された呼び出しの代わりに待っていた呼び出しの1つが生成する
+    assert calls == ["leader", "a"]
+    assert [r.citations for r in responses] == [[{"id": 2}], [{"id": 2}]]
@@ -0,0 +1,71 @@
+import asyncio
+
+from stubs import FakeLogTable
+
+from src.agent.log_writer import DropPolicyEnum, InvocationLogWriter
+
+
+def _writer(table: FakeLogTable, **kwargs) -> InvocationLogWriter:
+    kwargs.setdefault("flush_interval", 0.01)
+    kwargs.setdefault("retry_base_delay", 0.001)
+    return InvocationLogWriter(model=table, **kwargs)
+
+
+def test_batches_and_flushes_on_stop():
+    table = FakeLogTable()
+
+    async def run():
+        writer = _writer(table, flush_interval=1.0)
+        writer.start()
+        for i in range(60):
+            assert await writer.enqueue(f"item-{i}")
+        await writer.stop()
+        return writer.stats()
+
+    stats = asyncio.run(run())
+
+    assert len(table.items) == 60
+    assert max(table.batch_sizes) == 25
+    assert stats["written"] == 60
+    assert stats["queue_depth"] == 0
+
+
+def test_retries_throttled_batches():
+    table = FakeLogTable(throttle=2)
+
+    async def run():
+        writer = _writer(table)
+        writer.start()
+        await writer.enqueue("item")
+        await writer.stop()
+        return writer.stats()
+
+    stats = asyncio.run(run())
+
+    assert table.items == ["item"]
+    assert stats["retries"] == 2
+    assert stats["failed"] == 0
+
+
+def test_drop_policies_when_queue_is_full():
+    async def run(policy: DropPolicyEnum) -> tuple[FakeLogTable, dict]:
+        table = FakeLogTable()
+        table.gate.clear()
+        writer = _writer(table, max_queue_size=2, batch_size=1, drop_policy=policy)
+        writer.start()
+        await writer.enqueue("first")
+        await asyncio.sleep(0.05)  # the worker holds "first" behind the closed gate
+        results = [await writer.enqueue(item) for item in ("a", "b", "c")]
+        table.gate.set()
+        await writer.stop()
+        return table, writer.stats() | {"results": results}
+
+    table, stats = asyncio.run(run(DropPolicyEnum.drop_newest))
+    assert stats["results"] == [True, True, False]
+    assert table.items == ["first", "a", "b"]
+    assert stats["dropped"] == 1
+
+    table, stats = asyncio.run(run(DropPolicyEnum.drop_oldest))
+    assert stats["results"] == [True, True, True]
+    assert table.items == ["first", "b", "c"]
+    assert stats["dropped"] == 1
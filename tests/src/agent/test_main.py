@@ -1,3 +1,11 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+# main と同じモジュールから import する（src.agent.admission は別のモジュールになり、例外クラスが一致しない）
+from admission import AdmissionController
 from strands.agent.agent_result import AgentResult
 from strands.telemetry.metrics import (
     AgentInvocation,
@@ -6,8 +14,12 @@ from strands.telemetry.metrics import (
     ToolMetrics,
     Trace,
 )
+from stubs import StubModel
 
-from src.agent.main import parse_event_message, parse_result_message
+from src.agent import main
+from src.agent.event_stream import encode_event
+from src.agent.main import parse_result_message
+from src.agent.models import WeatherReport
 
 
 def test_parse_result_message():
@@ -89,7 +101,7 @@ def test_parse_result_message():
     )
 
 
-def test_parse_event_message():
+def test_encode_event_message():
     msg_list = [
         {"event": {"messageStart": {"role": "assistant"}}},
         {
@@ -155,7 +167,211 @@ def test_parse_event_message():
     ]
 
     for msg in msg_list:
-        response_model = parse_event_message(msg)
-        assert response_model.event is not None
-        assert response_model.data is not None
-        assert isinstance(response_model.data, str)
+        frame = encode_event(msg["event"]).decode()
+        fields = dict(line.split(": ", 1) for line in frame.strip().split("\r\n"))
+        assert fields["event"] == next(iter(msg["event"]))
+        assert json.loads(fields["data"]) == msg["event"]
+
+
+@pytest.fixture
+def stub_invocation(monkeypatch):
+    """Run /invocations on StubModel with one sub-agent call and no AWS access."""
+
+    async def invoke_sub_agent(pool, prompt, timeout=None):
+        return "大阪は晴れです。"
+
+    saved_logs = []
+
+    async def save_invocation_log(*args, **kwargs):
+        saved_logs.append(kwargs)
+
+    monkeypatch.setattr(
+        main.main_agent_template,
+        "model",
+        StubModel(
+            text="大阪の天気は晴れです。" * 20,
+            tool_calls=[("call_weather_agent", {"city": "大阪"})],
+        ),
+    )
+    monkeypatch.setattr(main, "invoke_sub_agent", invoke_sub_agent)
+    monkeypatch.setattr(main, "save_invocation_log", save_invocation_log)
+    monkeypatch.setattr(
+        main, "CachedAgentCoreMemorySessionManager", lambda **kwargs: None
+    )
+    return saved_logs
+
+
+def _invoke(body: dict) -> bytes:
+    async def post() -> bytes:
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://agent"
+        ) as client:
+            response = await client.post("/invocations", json=body)
+            return response.content
+
+    return asyncio.run(post())
+
+
+def _event_types(body: bytes) -> list[str]:
+    return [
+        line.removeprefix("event: ")
+        for line in body.decode().split("\r\n")
+        if line.startswith("event: ")
+    ]
+
+
+def test_invocation_streams_only_subscribed_events(stub_invocation):
+    everything = _invoke({"prompt": "大阪の天気は？"})
+    subscribed = _invoke(
+        {
+            "prompt": "大阪の天気は？",
+            "events": ["contentBlockDelta", "metadata", "toolProgress"],
+        }
+    )
+
+    assert set(_event_types(everything)) == {
+        "messageStart",
+        "contentBlockStart",
+        "contentBlockDelta",
+        "contentBlockStop",
+        "messageStop",
+        "metadata",
+    }
+    assert _event_types(subscribed) == [
+        "toolProgress",  # call_weather_agent running
+        "contentBlockDelta",  # tool input
+        "metadata",
+        "toolProgress",  # call_weather_agent succeeded
+        "contentBlockDelta",
+        "metadata",
+    ]
+    assert b'"status": "success"' in subscribed
+    assert len(subscribed) < len(everything)
+
+
+def test_invocation_log_has_a_latency_breakdown(stub_invocation):
+    _invoke({"prompt": "大阪の天気は？"})
+
+    timings = stub_invocation[0]["timings"]
+    assert set(timings["stages"]) == {
+        "memory_hydration",
+        "compaction",
+        "model.main_agent",
+        "tool.call_weather_agent",
+    }
+    assert timings["stages"]["model.main_agent"]["count"] == 2
+    assert 0 < timings["time_to_first_token_ms"] <= timings["total_ms"]
+
+
+def _scrape() -> dict[str, float]:
+    async def get() -> str:
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://agent"
+        ) as client:
+            response = await client.get("/metrics")
+            assert response.headers["content-type"].startswith("text/plain")
+            return response.text
+
+    samples = {}
+    for line in asyncio.run(get()).splitlines():
+        if not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            samples[name] = float(value)
+    return samples
+
+
+def test_metrics_aggregate_invocations(stub_invocation):
+    before = _scrape()
+    _invoke({"prompt": "大阪の天気は？"})
+    after = _scrape()
+
+    def delta(name: str) -> float:
+        return after[name] - before.get(name, 0)
+
+    assert delta("agent_invocations_total") == 1
+    assert after["agent_invocations_in_flight"] == 0
+    assert delta("agent_invocation_first_event_seconds_count") == 1
+    assert delta("agent_invocation_duration_seconds_count") == 1
+    assert delta('agent_tool_calls_total{tool="call_weather_agent"}') == 1
+    assert delta('agent_tool_errors_total{tool="call_weather_agent"}') == 0
+    assert delta('agent_tokens_total{type="output"}') > 0
+    # コンポーネントの stats() も出力される
+    assert "agent_log_writer_queue_depth" in after
+    assert 'agent_sub_agent_pool_max_size{pool="weather_agent"}' in after
+    assert 'agent_mcp_session_connected{server="tavily"}' in after
+    assert after['agent_dependency_state{name="weather_api"}'] == 0
+
+
+def test_invocations_over_the_limit_get_429(stub_invocation, monkeypatch):
+    controller = AdmissionController(max_per_actor=1, retry_after=3)
+    monkeypatch.setattr(main, "admission_controller", controller)
+    held = asyncio.run(controller.acquire("alice"))
+
+    async def post(actor_id: str) -> httpx.Response:
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://agent"
+        ) as client:
+            return await client.post(
+                "/invocations", json={"prompt": "大阪の天気は？", "actor_id": actor_id}
+            )
+
+    rejected = asyncio.run(post("alice"))
+    admitted = asyncio.run(post("bob"))
+
+    assert rejected.status_code == 429
+    assert rejected.headers["retry-after"] == "3"
+    assert admitted.status_code == 200
+    # 完了したストリームの枠は返され、保持中の alice の分だけが残る
+    assert controller.stats()["in_flight"] == 1
+    held.release()
+    assert controller.stats()["in_flight"] == 0
+
+
+class FailingModel(StubModel):
+    async def stream(self, *args, **kwargs):
+        raise RuntimeError("model unavailable")
+        yield
+
+
+def test_failed_invocations_release_their_slot(stub_invocation, monkeypatch):
+    controller = AdmissionController(max_in_flight=2, max_per_actor=1)
+    monkeypatch.setattr(main, "admission_controller", controller)
+    monkeypatch.setattr(main.main_agent_template, "model", FailingModel())
+
+    async def post() -> None:
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://agent"
+        ) as client:
+            await client.post(
+                "/invocations", json={"prompt": "大阪の天気は？", "actor_id": "alice"}
+            )
+
+    for _ in range(3):
+        # モデルの例外はタスクグループ経由で ExceptionGroup として届く
+        with pytest.raises(Exception, match="model unavailable|unhandled errors"):
+            asyncio.run(post())
+
+    # 失敗した呼び出しの枠も返され、同じ actor が続けて呼び出せる
+    assert controller.stats()["in_flight"] == 0
+    assert controller.stats()["admitted"] == 3
+
+
+def test_lookup_weather_returns_json_for_the_main_agent(monkeypatch):
+    async def fetch_weather_report(location):
+        return WeatherReport(
+            location=location, status="ok", weather="Overcast", temperature_c=22.5
+        )
+
+    monkeypatch.setattr(main, "fetch_weather_report", fetch_weather_report)
+
+    result = asyncio.run(main.lookup_weather("大阪"))
+
+    report = result["content"][0]["json"]
+    assert result["status"] == "success"
+    assert report["weather"] == "Overcast"
+    assert report["temperature_c"] == 22.5
+    assert report["current_time"].endswith("+09:00")
@@ -0,0 +1,178 @@
+import asyncio
+import time
+
+from mcp.client.streamable_http import streamable_http_client
+from strands import Agent
+from stubs import LocalMcpServer, StubModel
+
+from src.agent.mcp_sessions import McpSessionManager
+
+
+def _search_agent(client, query: str) -> Agent:
+    model = StubModel(text="done", tool_calls=[("search", {"query": query})])
+    return Agent(model=model, tools=[client], callback_handler=None)
+
+
+def _tool_result(agent: Agent) -> str:
+    return agent.messages[2]["content"][0]["toolResult"]["content"][0]["text"]
+
+
+def test_agents_share_one_session_opened_at_startup():
+    with LocalMcpServer() as server:
+        manager = McpSessionManager(health_check_interval=3600)
+        client = manager.register("search", lambda: streamable_http_client(server.url))
+
+        async def run():
+            await manager.start()
+            agents = [_search_agent(client, f"q{i}") for i in range(3)]
+            await asyncio.gather(*(agent.invoke_async("検索して") for agent in agents))
+            await manager.stop()
+            return agents
+
+        agents = asyncio.run(run())
+
+    assert [_tool_result(agent) for agent in agents] == [
+        "results for q0",
+        "results for q1",
+        "results for q2",
+    ]
+    assert server.methods["initialize"] == 1
+    assert server.methods["tools/list"] == 1
+    assert server.methods["tools/call"] == 3
+    assert manager.stats()["search"]["connects"] == 1
+    assert client.client is None
+
+
+def test_broken_session_is_reconnected_and_tools_rebound():
+    with LocalMcpServer() as server:
+        manager = McpSessionManager(health_check_interval=3600)
+        client = manager.register("search", lambda: streamable_http_client(server.url))
+
+        async def run():
+            await manager.start()
+            agent = _search_agent(client, "before")
+            healthy = await manager.check(client)
+            client.client.stop(None, None, None)
+            recovered = await manager.check(client)
+            await agent.invoke_async("検索して")
+            await manager.stop()
+            return agent, healthy, recovered
+
+        agent, healthy, recovered = asyncio.run(run())
+
+    assert (healthy, recovered) == (True, False)
+    # エージェント作成後の再接続でも、同じツールが新しいセッションで動く
+    assert _tool_result(agent) == "results for before"
+    assert server.methods["initialize"] == 2
+    assert client.stats() | {"tools": 1} == {
+        "connected": False,
+        "tools": 1,
+        "connects": 2,
+        "reconnects": 1,
+        "health_check_failures": 1,
+    }
+
+
+def test_hanging_mcp_server_answers_fast_and_opens_the_circuit():
+    with LocalMcpServer(tool_delay=10) as server:
+        manager = McpSessionManager(health_check_interval=3600)
+        client = manager.register("search", lambda: streamable_http_client(server.url))
+        client.dependency = type(client.dependency)(
+            "mcp_search", timeout=0.2, max_attempts=1, failure_threshold=1
+        )
+
+        async def run():
+            await manager.start()
+            agents = [_search_agent(client, f"q{i}") for i in range(2)]
+            start = time.perf_counter()
+            for agent in agents:
+                await agent.invoke_async("検索して")
+            elapsed = time.perf_counter() - start
+            await manager.stop()
+            return agents, elapsed
+
+        agents, elapsed = asyncio.run(run())
+
+    # 1回目は期限で打ち切り、2回目はサーキットが開いていて待たない
+    assert elapsed < 2
+    assert [_tool_result(agent) for agent in agents] == [
+        "mcp_search is unavailable: timeout. Answer without this tool.",
+        "mcp_search is unavailable: circuit_open. Answer without this tool.",
+    ]
+    assert server.methods["tools/call"] == 1
+
+
+def test_tool_errors_do_not_open_the_circuit():
+    with LocalMcpServer() as server:
+        manager = McpSessionManager(health_check_interval=3600)
+        client = manager.register("search", lambda: streamable_http_client(server.url))
+        client.dependency = type(client.dependency)(
+            "mcp_search", max_attempts=1, failure_threshold=1
+        )
+
+        async def run():
+            await manager.start()
+            # モデルが不正な引数で呼んだツールのエラーはサーバーの障害ではない
+            failed = [_search_agent(client, "") for _ in range(2)]
+            for agent in failed:
+                await agent.invoke_async("検索して")
+            ok = _search_agent(client, "after")
+            await ok.invoke_async("検索して")
+            await manager.stop()
+            return failed, ok
+
+        failed, ok = asyncio.run(run())
+
+    assert all("query must not be empty" in _tool_result(a) for a in failed)
+    assert _tool_result(ok) == "results for after"
+    assert client.dependency.stats()["failures"] == 0
+    assert server.methods["tools/call"] == 3
+
+
+def test_broken_session_counts_as_a_server_failure():
+    with LocalMcpServer() as server:
+        manager = McpSessionManager(health_check_interval=3600)
+        client = manager.register("search", lambda: streamable_http_client(server.url))
+        client.dependency = type(client.dependency)("mcp_search", max_attempts=1)
+
+        async def run():
+            await manager.start()
+            agent = _search_agent(client, "q")
+            client.client.stop(None, None, None)
+            await agent.invoke_async("検索して")
+            await manager.stop()
+            return agent
+
+        agent = asyncio.run(run())
+
+    assert _tool_result(agent) == (
+        "mcp_search is unavailable: error. Answer without this tool."
+    )
+    assert client.dependency.stats()["failures"] == 1
+
+
+def test_failed_call_on_a_live_session_counts_as_a_server_failure():
+    # _RaisingMcpClient は strands の非公開メソッドを上書きしているため、
+    # インストール済みの strands で呼び出し中の例外がそこを通ることを確かめる
+    with LocalMcpServer() as server:
+        manager = McpSessionManager(health_check_interval=3600)
+        client = manager.register("search", lambda: streamable_http_client(server.url))
+        client.dependency = type(client.dependency)("mcp_search", max_attempts=1)
+
+        def reset(*args, **kwargs):
+            raise ConnectionResetError("connection reset by peer")
+
+        async def run():
+            await manager.start()
+            agent = _search_agent(client, "q")
+            client.client._create_call_tool_coroutine = reset
+            await agent.invoke_async("検索して")
+            await manager.stop()
+            return agent
+
+        agent = asyncio.run(run())
+
+    assert _tool_result(agent) == (
+        "mcp_search is unavailable: error. Answer without this tool."
+    )
+    assert client.dependency.stats()["failures"] == 1
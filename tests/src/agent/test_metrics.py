@@ -0,0 +1,36 @@
+from src.agent.metrics import MetricsRegistry
+
+
+def test_registry_renders_prometheus_text():
+    registry = MetricsRegistry()
+    calls = registry.counter("tool_calls_total", "Tool calls.", ("tool",))
+    latency = registry.histogram(
+        "invocation_duration_seconds", "Duration.", buckets=(0.5, 1.0)
+    )
+    registry.register_collector(
+        "pool",
+        lambda: {'a"b': {"name": "x", "idle": 2, "connected": True, "age": None}},
+        label="pool",
+    )
+
+    calls.inc(2, ("call_weather_agent",))
+    calls.inc(1, ("call_weather_agent",))
+    for value in (0.2, 0.5, 3.0):
+        latency.observe(value)
+
+    assert registry.render().splitlines() == [
+        "# HELP agent_tool_calls_total Tool calls.",
+        "# TYPE agent_tool_calls_total counter",
+        'agent_tool_calls_total{tool="call_weather_agent"} 3',
+        "# HELP agent_invocation_duration_seconds Duration.",
+        "# TYPE agent_invocation_duration_seconds histogram",
+        'agent_invocation_duration_seconds_bucket{le="0.5"} 2',
+        'agent_invocation_duration_seconds_bucket{le="1.0"} 2',
+        'agent_invocation_duration_seconds_bucket{le="+Inf"} 3',
+        "agent_invocation_duration_seconds_sum 3.7",
+        "agent_invocation_duration_seconds_count 3",
+        "# TYPE agent_pool_idle gauge",
+        'agent_pool_idle{pool="a\\"b"} 2',
+        "# TYPE agent_pool_connected gauge",
+        'agent_pool_connected{pool="a\\"b"} 1',
+    ]
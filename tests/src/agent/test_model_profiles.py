@@ -0,0 +1,47 @@
+import pytest
+
+from src.agent.settings import ModelSettings
+
+
+def test_agents_get_the_model_of_their_profile(monkeypatch):
+    monkeypatch.setenv(
+        "MODEL_PROFILES",
+        '{"router": {"model_id": "small-model", "max_tokens": 256, "temperature": 0.2}}',
+    )
+    monkeypatch.setenv("AGENT_MODEL_PROFILES", '{"main_agent": "router"}')
+    settings = ModelSettings(model_id="large-model", max_tokens=4096, top_p=0.8)
+
+    router = settings.get_agent_model("main_agent").get_config()
+    answerer = settings.get_agent_model("estate_agent").get_config()
+
+    assert router["model_id"] == "small-model"
+    assert router["max_tokens"] == 256
+    assert router["temperature"] == 0.2
+    assert router["top_p"] == 0.8  # 未指定の項目は既定の設定を引き継ぐ
+    assert answerer["model_id"] == "large-model"
+    assert answerer["max_tokens"] == 4096
+    assert "temperature" not in answerer
+
+
+def test_unknown_profile_is_rejected_when_settings_load():
+    with pytest.raises(ValueError, match="tiny"):
+        ModelSettings(
+            model_id="large-model", agent_model_profiles={"main_agent": "tiny"}
+        )
+
+    with pytest.raises(ValueError, match="tiny"):
+        ModelSettings(model_id="large-model").get_profile("tiny")
+
+
+def test_unset_sampling_parameters_are_left_out_of_the_request():
+    settings = ModelSettings(
+        model_id="jp.anthropic.claude-sonnet-4-5-20250929-v1:0",
+        model_profiles={"creative": {"temperature": 1.0}},
+    )
+
+    default = settings.get_model()._format_request([])
+    creative = settings.get_model("creative")._format_request([])
+
+    # temperature と top_p の両方を送ると Claude Sonnet 4.5 では拒否される
+    assert default["inferenceConfig"] == {"maxTokens": 2048}
+    assert creative["inferenceConfig"] == {"maxTokens": 2048, "temperature": 1.0}
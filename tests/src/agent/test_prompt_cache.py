@@ -0,0 +1,64 @@
+from strands import Agent, tool
+from stubs import StubBedrockRuntime
+
+from src.agent.models import UsageAttribute
+from src.agent.settings import ModelSettings
+
+CACHE_POINT = {"cachePoint": {"type": "default"}}
+
+
+@tool
+def get_weather(city: str) -> str:
+    """Get the weather.
+    Args:
+        city: The name of the city
+    """
+    return "sunny"
+
+
+def _agent(settings: ModelSettings, name: str, client: StubBedrockRuntime) -> Agent:
+    model = settings.get_agent_model(name)
+    model.client = client
+    return Agent(
+        name=name,
+        model=model,
+        system_prompt=settings.system_prompt(name, "You are a weather agent."),
+        tools=[get_weather],
+        callback_handler=None,
+    )
+
+
+def test_cache_points_follow_the_system_prompt_and_tools():
+    settings = ModelSettings(model_id="stub", prompt_cache_enabled=True)
+    client = StubBedrockRuntime(text="晴れです")
+
+    first = _agent(settings, "weather_agent", client)("大阪の天気は？")
+    second = _agent(settings, "weather_agent", client)("東京の天気は？")
+
+    request = client.requests[0]
+    assert request["system"] == [{"text": "You are a weather agent."}, CACHE_POINT]
+    assert request["toolConfig"]["tools"][-1] == CACHE_POINT
+
+    written = UsageAttribute.from_usage(first.metrics.accumulated_usage)
+    read = UsageAttribute.from_usage(second.metrics.accumulated_usage)
+    assert written.CacheWriteInputTokens > 0
+    assert written.CacheReadInputTokens == 0
+    assert read.CacheReadInputTokens == written.CacheWriteInputTokens
+    assert read.CacheWriteInputTokens == 0
+
+
+def test_caching_can_be_turned_off_per_agent():
+    settings = ModelSettings(
+        model_id="stub",
+        prompt_cache_enabled=True,
+        prompt_cache_agents={"search_agent": False},
+    )
+    client = StubBedrockRuntime()
+
+    result = _agent(settings, "search_agent", client)("検索して")
+
+    request = client.requests[0]
+    assert CACHE_POINT not in request["system"]
+    assert CACHE_POINT not in request["toolConfig"]["tools"]
+    usage = UsageAttribute.from_usage(result.metrics.accumulated_usage)
+    assert usage.CacheReadInputTokens == usage.CacheWriteInputTokens == 0
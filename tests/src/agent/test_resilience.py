@@ -0,0 +1,134 @@
+import asyncio
+import time
+
+import pytest
+
+from src.agent.resilience import (
+    CircuitStateEnum,
+    Dependency,
+    DependencyRegistry,
+    DependencyUnavailableError,
+)
+from src.agent.settings import ResilienceSettings
+
+
+class Upstream:
+    """Async call failing with ``error`` for the first ``failures`` calls."""
+
+    def __init__(self, failures: int = 0, error: Exception | None = None):
+        self.failures = failures
+        self.error = error or ConnectionError("refused")
+        self.calls = 0
+
+    async def __call__(self) -> str:
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise self.error
+        return "ok"
+
+
+def test_transient_errors_are_retried_within_the_deadline():
+    dependency = Dependency("upstream", max_attempts=3, retry_base_delay=0)
+    upstream = Upstream(failures=2)
+
+    assert asyncio.run(dependency.call(upstream)) == "ok"
+    assert upstream.calls == 3
+    assert dependency.stats()["retries"] == 2
+    assert dependency.breaker.state is CircuitStateEnum.closed
+
+
+def test_non_transient_errors_are_raised_without_retrying():
+    dependency = Dependency("upstream", failure_threshold=1)
+    upstream = Upstream(failures=1, error=ValueError("bad request"))
+
+    with pytest.raises(ValueError):
+        asyncio.run(dependency.call(upstream))
+
+    assert upstream.calls == 1
+    # 依存先は応答しているのでサーキットは開かない
+    assert dependency.breaker.state is CircuitStateEnum.closed
+
+
+def test_deadline_covers_every_attempt():
+    dependency = Dependency("upstream", timeout=0.05, max_attempts=5)
+
+    async def hang() -> None:
+        await asyncio.sleep(10)
+
+    start = time.perf_counter()
+    with pytest.raises(DependencyUnavailableError) as error:
+        asyncio.run(dependency.call(hang))
+
+    assert error.value.reason == "timeout"
+    assert time.perf_counter() - start < 1
+    assert dependency.stats()["timeouts"] == 1
+
+
+def test_circuit_opens_short_circuits_and_recovers_after_a_probe():
+    dependency = Dependency(
+        "upstream", max_attempts=1, failure_threshold=2, reset_timeout=0.05
+    )
+    upstream = Upstream(failures=2)
+
+    async def run() -> list[str]:
+        reasons = []
+        for _ in range(3):
+            try:
+                await dependency.call(upstream)
+            except DependencyUnavailableError as e:
+                reasons.append(e.reason)
+        await asyncio.sleep(0.05)
+        reasons.append(await dependency.call(upstream))
+        return reasons
+
+    assert asyncio.run(run()) == ["error", "error", "circuit_open", "ok"]
+    assert upstream.calls == 3
+    assert dependency.breaker.state is CircuitStateEnum.closed
+    assert dependency.stats() | {"retry_tokens": 0} == {
+        "state": 0,
+        "consecutive_failures": 0,
+        "opens": 1,
+        "calls": 3,
+        "retries": 0,
+        "failures": 2,
+        "timeouts": 0,
+        "short_circuits": 1,
+        "retry_tokens": 0,
+    }
+
+
+def test_retry_budget_limits_retries_across_calls():
+    dependency = Dependency(
+        "upstream", max_attempts=3, retry_base_delay=0, retry_ratio=0
+    )
+    dependency.budget.tokens = 1
+    upstream = Upstream(failures=100)
+
+    async def run() -> None:
+        for _ in range(3):
+            with pytest.raises(DependencyUnavailableError):
+                await dependency.call(upstream)
+
+    asyncio.run(run())
+
+    # 予算の1回分だけ再試行し、それ以降は1回で諦める
+    assert upstream.calls == 4
+    assert dependency.stats()["retries"] == 1
+
+
+def test_overrides_from_the_environment_keep_their_field_types(monkeypatch):
+    monkeypatch.setenv(
+        "RESILIENCE_OVERRIDES", '{"weather_api": {"max_attempts": 2, "timeout": 5}}'
+    )
+    overrides = ResilienceSettings().resilience_overrides
+
+    registry = DependencyRegistry(
+        overrides={
+            name: o.model_dump(exclude_none=True) for name, o in overrides.items()
+        }
+    )
+    weather_api = registry.register("weather_api", max_attempts=3)
+
+    assert weather_api.max_attempts == 2
+    assert isinstance(weather_api.max_attempts, int)
+    assert weather_api.timeout == 5.0
@@ -0,0 +1,127 @@
+import asyncio
+import time
+
+from stubs import LocalHttpServer, build_rss_feed, flaky_route, rss_route
+
+from src.agent.resilience import Dependency
+from src.agent.rss_feed import RssFeedCache
+
+
+def test_conditional_refresh_keeps_snapshot():
+    with LocalHttpServer({"/feed": rss_route(build_rss_feed(3))}) as server:
+        cache = RssFeedCache([f"{server.url}/feed"])
+
+        async def run():
+            first = (await cache.get_index()).items
+            await cache.refresh()
+            second = (await cache.get_index()).items
+            return first, second
+
+        first, second = asyncio.run(run())
+
+    assert [item.title for item in first] == [
+        "Amazon service update 0",
+        "Amazon service update 1",
+        "Amazon service update 2",
+    ]
+    assert second is first
+    assert server.requests[1][1]["If-None-Match"] == '"v1"'
+    assert cache.stats()["refreshes"] == 1
+    assert cache.stats()["not_modified"] == 1
+
+
+def test_snapshot_reads_do_not_hit_the_network():
+    with LocalHttpServer({"/feed": rss_route(build_rss_feed(3))}) as server:
+        cache = RssFeedCache([f"{server.url}/feed"])
+
+        async def run():
+            for _ in range(10):
+                (await cache.get_index()).items
+
+        asyncio.run(run())
+
+    assert len(server.requests) == 1
+
+
+def test_feeds_are_fetched_concurrently_and_merged():
+    whats_new = build_rss_feed(3, prefix="Amazon", base_url="https://aws.example.com")
+    blog = build_rss_feed(2, prefix="Blog", start=2, base_url="https://aws.example.com")
+
+    with (
+        LocalHttpServer({"/feed": rss_route(whats_new)}, delay=0.3) as first,
+        LocalHttpServer({"/feed": rss_route(blog)}, delay=0.3) as second,
+        LocalHttpServer({"/feed": rss_route(blog)}, delay=2.0) as stuck,
+    ):
+        cache = RssFeedCache(
+            [f"{first.url}/feed", f"{second.url}/feed", f"{stuck.url}/feed"],
+            timeout=0.6,
+        )
+        started = time.perf_counter()
+        items = asyncio.run(cache.get_index()).items
+        elapsed = time.perf_counter() - started
+
+    assert elapsed < 1.0
+    # news/2 is in both feeds; the first feed wins and results stay newest first
+    assert [item.link for item in items] == [
+        "https://aws.example.com/news/0",
+        "https://aws.example.com/news/1",
+        "https://aws.example.com/news/2",
+        "https://aws.example.com/news/3",
+    ]
+    assert items[2].title == "Amazon service update 2"
+    assert cache.stats()["errors"] == 1
+
+
+def test_background_refresh_and_first_read_fetch_once():
+    with LocalHttpServer({"/feed": rss_route(build_rss_feed(3))}, delay=0.2) as server:
+        cache = RssFeedCache([f"{server.url}/feed"])
+
+        async def run():
+            cache.start()
+            await asyncio.sleep(0)
+            index = await cache.get_index()
+            await cache.stop()
+            return index
+
+        index = asyncio.run(run())
+
+    assert len(index) == 3
+    assert len(server.requests) == 1
+
+
+def test_cold_start_outage_returns_an_empty_index():
+    with LocalHttpServer({}) as server:
+        cache = RssFeedCache([f"{server.url}/missing", f"{server.url}/gone"])
+        index = asyncio.run(cache.get_index())
+
+    assert len(index) == 0
+    assert cache.fetched_at is not None
+    assert cache.stats()["errors"] == 2
+
+
+def test_feed_fetches_are_retried_and_stop_at_an_open_circuit():
+    feed = rss_route(build_rss_feed(3))
+    routes = {"/feed": flaky_route(feed, failures=1), "/down": flaky_route(feed, 100)}
+    with LocalHttpServer(routes) as server:
+        up = RssFeedCache(
+            [f"{server.url}/feed"],
+            dependency=Dependency("aws_rss", retry_base_delay=0),
+        )
+        down = RssFeedCache(
+            [f"{server.url}/down"],
+            dependency=Dependency("aws_rss", max_attempts=1, failure_threshold=1),
+        )
+
+        async def run():
+            index = await up.get_index()
+            await down.refresh()
+            await down.refresh()
+            return index
+
+        index = asyncio.run(run())
+
+    # 503 は1回だけ再試行し、止まっているフィードはサーキットが開いたら取りに行かない
+    assert len(index) == 3
+    assert [path for path, _ in server.requests] == ["/feed", "/feed", "/down"]
+    assert down.dependency.stats()["short_circuits"] == 1
+    assert down.stats()["errors"] == 2
@@ -0,0 +1,141 @@
+import random
+
+from src.agent.models import RssItem
+from src.agent.rss_index import RssIndex, normalize_text, split_keywords, tokenize
+
+
+def _item(index: int, title: str, summary: str = "") -> RssItem:
+    return RssItem(
+        title=title,
+        link=f"https://aws.example.com/{index}",
+        published=f"Mon, {10 + index:02d} Feb 2026 00:00:00 +0000",
+        summary=summary,
+    )
+
+
+ITEMS = [
+    _item(0, "AWS Lambda adds Python 3.14 runtime", "Available in all regions"),
+    _item(1, "Amazon S3 バケットの新機能", "東京リージョンで利用可能になりました"),
+    _item(
+        2, "Amazon Bedrock AgentCore Runtime", "Now available in Asia Pacific (Tokyo)"
+    ),
+    _item(3, "AWS Lambda SnapStart for Python", "大阪リージョンで利用可能"),
+]
+
+
+def test_tokenize_mixes_words_and_bigrams():
+    assert tokenize("amazon s3 バケット") == ["amazon", "s3", "バケ", "ケッ", "ット"]
+    assert split_keywords("Lambda、Python  東京") == ["lambda", "python", "東京"]
+
+
+def test_results_are_ranked_newest_first():
+    index = RssIndex(ITEMS)
+
+    titles = [item.title for item in index.search("lambda", 10)]
+
+    assert titles == [
+        "AWS Lambda SnapStart for Python",
+        "AWS Lambda adds Python 3.14 runtime",
+    ]
+
+
+def test_and_or_queries():
+    index = RssIndex(ITEMS)
+
+    assert [item.link for item in index.search("lambda 大阪", 10)] == [
+        "https://aws.example.com/3"
+    ]
+    assert [item.link for item in index.search("lambda 大阪", 10, match_all=False)] == [
+        "https://aws.example.com/3",
+        "https://aws.example.com/0",
+    ]
+
+
+def test_substring_semantics_for_japanese_and_prefixes():
+    index = RssIndex(ITEMS)
+
+    assert [item.link for item in index.search("東京", 10)] == [
+        "https://aws.example.com/1"
+    ]
+    assert [item.link for item in index.search("バケット", 10)] == [
+        "https://aws.example.com/1"
+    ]
+    assert [item.link for item in index.search("阪", 10)] == [
+        "https://aws.example.com/3"
+    ]
+    assert [item.link for item in index.search("agentc", 10)] == [
+        "https://aws.example.com/2"
+    ]
+    assert index.search("lambda", 1)[0].link == "https://aws.example.com/3"
+    assert index.search("glacier", 10) == []
+
+
+def test_infix_ascii_terms_match_inside_words():
+    index = RssIndex(
+        [
+            _item(0, "Amazon DynamoDB zero-ETL", "amazons3 integration"),
+            _item(1, "Amazon RDS for Db2"),
+        ]
+    )
+
+    assert [item.link for item in index.search("db", 10)] == [
+        "https://aws.example.com/1",
+        "https://aws.example.com/0",
+    ]
+    assert [item.link for item in index.search("namodb", 10)] == [
+        "https://aws.example.com/0"
+    ]
+    assert [item.link for item in index.search("s3", 10)] == [
+        "https://aws.example.com/0"
+    ]
+    assert [item.link for item in index.search("zon-dynam", 10)] == []
+    assert [item.link for item in index.search("odb zero-e", 10)] == [
+        "https://aws.example.com/0"
+    ]
+
+
+def _linear_search(items: list[RssItem], keyword: str, max_items: int, match_all):
+    # 索引を導入する前の線形走査
+    terms = split_keywords(keyword)
+    matches = all if match_all else any
+    result = []
+    for item in RssIndex(items).items:
+        text = normalize_text(f"{item.title}\n{item.summary}")
+        if not terms or matches(term in text for term in terms):
+            result.append(item)
+            if len(result) >= max_items:
+                break
+    return result
+
+
+def test_search_matches_the_linear_scan_for_random_queries():
+    rng = random.Random(0)
+    words = [
+        "amazon", "dynamodb", "amazons3", "s3", "lambda", "python3.14", "db2",
+        "ec2", "agentcore", "東京リージョン", "大阪", "バケット", "の", "zero-etl",
+    ]  # fmt: skip
+    items = [
+        _item(
+            i % 18,
+            " ".join(rng.choices(words, k=rng.randint(1, 5))),
+            "".join(
+                rng.choice([" ", "、", "", "."]) + w for w in rng.choices(words, k=3)
+            ),
+        )
+        for i in range(60)
+    ]
+    texts = [normalize_text(f"{item.title}\n{item.summary}") for item in items]
+    index = RssIndex(items)
+
+    for _ in range(500):
+        terms = []
+        for _ in range(rng.randint(1, 2)):
+            text = rng.choice(texts)
+            start = rng.randrange(len(text))
+            terms.append(text[start : start + rng.randint(1, 8)].strip() or "x")
+        keyword = " ".join(terms)
+        match_all = rng.random() < 0.5
+        max_items = rng.choice([1, 5, 100])
+        assert index.search(keyword, max_items, match_all) == _linear_search(
+            items, keyword, max_items, match_all
+        ), keyword
@@ -0,0 +1,93 @@
+from types import SimpleNamespace
+
+import pytest
+from bedrock_agentcore.memory.integrations.strands import session_manager
+from bedrock_agentcore.memory.integrations.strands.config import AgentCoreMemoryConfig
+from strands import Agent
+from stubs import FakeAgentCoreMemory, StubModel
+
+from src.agent.session_cache import (
+    CachedAgentCoreMemorySessionManager,
+    SessionHistoryCache,
+)
+
+
+@pytest.fixture
+def memory(monkeypatch) -> FakeAgentCoreMemory:
+    memory = FakeAgentCoreMemory()
+    monkeypatch.setattr(session_manager, "MemoryClient", lambda **kwargs: memory)
+    monkeypatch.setattr(
+        session_manager.boto3,
+        "Session",
+        lambda **kwargs: SimpleNamespace(
+            region_name="ap-northeast-1",
+            client=lambda *args, **kwargs: memory.data_plane,
+        ),
+    )
+    return memory
+
+
+def _turn(memory: FakeAgentCoreMemory, cache, prompt: str) -> tuple[Agent, int]:
+    """Run one conversation turn and return the agent and the reads it caused."""
+    reads = memory.reads
+    config = AgentCoreMemoryConfig(
+        memory_id="memory", session_id="session-1", actor_id="user-1"
+    )
+    if cache is None:
+        manager = session_manager.AgentCoreMemorySessionManager(config)
+    else:
+        manager = CachedAgentCoreMemorySessionManager(config, cache=cache)
+    agent = Agent(
+        model=StubModel(text=f"answer to {prompt}"),
+        session_manager=manager,
+        callback_handler=None,
+    )
+    agent(prompt)
+    return agent, memory.reads - reads
+
+
+def test_follow_up_turns_skip_the_history_fetch(memory):
+    cache = SessionHistoryCache()
+    _turn(memory, cache, "first")
+
+    agent, reads = _turn(memory, cache, "second")
+    uncached_agent, uncached_reads = _turn(memory, None, "third")
+
+    # キャッシュあり: バージョン確認の agent 読み込みのみ
+    assert reads == 1
+    assert [message["content"][0]["text"] for message in agent.messages] == [
+        "first",
+        "answer to first",
+        "second",
+        "answer to second",
+    ]
+    # キャッシュなし: session / agent / 全履歴に加え、同期のたびに agent を読み直す
+    assert uncached_reads == 6
+    assert len(uncached_agent.messages) == 6
+
+
+def test_version_mismatch_reloads_history(memory):
+    cache = SessionHistoryCache()
+    _turn(memory, cache, "first")
+    _turn(memory, cache, "second")
+    assert cache.stats()["hits"] == 1
+
+    # 別プロセス（別キャッシュ）が同じセッションに書き込む
+    _turn(memory, SessionHistoryCache(), "elsewhere")
+    agent, _ = _turn(memory, cache, "third")
+
+    assert cache.stats()["invalidations"] == 1
+    assert len(agent.messages) == 8
+    assert agent.messages[4]["content"][0]["text"] == "elsewhere"
+
+
+def test_cache_is_bounded_and_expires():
+    cache = SessionHistoryCache(max_sessions=2)
+    for key in [("a", "1"), ("b", "1"), ("c", "1")]:
+        cache.entry(key)
+    assert cache.get(("a", "1")) is None
+    assert cache.get(("c", "1")) is not None
+
+    cache = SessionHistoryCache(ttl=0)
+    cache.entry(("a", "1"))
+    assert cache.get(("a", "1")) is None
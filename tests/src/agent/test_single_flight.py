@@ -0,0 +1,51 @@
+import asyncio
+
+import pytest
+
+from src.agent.single_flight import SingleFlight
+
+
+def test_concurrent_callers_share_the_result_and_the_error():
+    flight = SingleFlight()
+    calls = []
+
+    async def fetch(result):
+        calls.append(result)
+        await asyncio.sleep(0.01)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    async def run():
+        shared = await asyncio.gather(
+            flight.run("a", lambda: fetch(1)), flight.run("a", lambda: fetch(2))
+        )
+        failed = await asyncio.gather(
+            flight.run("b", lambda: fetch(ValueError("down"))),
+            flight.run("b", lambda: fetch(3)),
+            return_exceptions=True,
+        )
+        return shared, failed
+
+    shared, failed = asyncio.run(run())
+
+    assert shared == [1, 1]
+    assert [type(e) for e in failed] == [ValueError, ValueError]
+    assert len(calls) == 2
+    assert len(flight) == 0
+
+
+def test_cancelled_waiter_does_not_cancel_the_call():
+    flight = SingleFlight()
+
+    async def run():
+        leader = asyncio.create_task(flight.run("a", lambda: asyncio.sleep(0.02, 1)))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flight.run("a", lambda: asyncio.sleep(0, 2)))
+        await asyncio.sleep(0)
+        follower.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await follower
+        return await leader
+
+    assert asyncio.run(run()) == 1
@@ -0,0 +1,48 @@
+import asyncio
+
+from src.agent import startup
+from src.agent.mcp_sessions import McpSessionManager
+
+
+class StubPool:
+    def __init__(self, name):
+        self.name = name
+        self.warmed = 0
+
+    def warm(self):
+        self.warmed += 1
+
+
+def _unavailable():
+    raise ConnectionError("Secrets Manager is unreachable")
+
+
+def test_warm_up_prepares_everything_and_tolerates_failures(monkeypatch):
+    pools = (StubPool("weather_agent"), StubPool("search_agent"))
+    manager = McpSessionManager(health_check_interval=3600)
+    monkeypatch.setattr(startup, "get_tavily_client", _unavailable)
+    monkeypatch.setattr(startup, "get_kb_client", lambda: "kb")
+    monkeypatch.setattr(startup, "get_geolocator", lambda: "geolocator")
+    monkeypatch.setattr(startup, "sub_agent_pools", pools)
+    monkeypatch.setattr(startup, "mcp_session_manager", manager)
+
+    async def run():
+        durations = await startup.warm_up()
+        started = manager._task is not None
+        await manager.stop()
+        return durations, started
+
+    durations, started = asyncio.run(run())
+
+    assert list(durations) == [
+        "tavily_client",
+        "kb_client",
+        "geolocator",
+        "weather_agent",
+        "search_agent",
+    ]
+    # 失敗した準備は初回利用時に改めて行う
+    assert durations["tavily_client"] is None
+    assert all(durations[name] is not None for name in list(durations)[1:])
+    assert [pool.warmed for pool in pools] == [1, 1]
+    assert started
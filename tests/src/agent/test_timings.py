@@ -0,0 +1,33 @@
+import asyncio
+
+from src.agent.timings import current_timings, span, start_timings
+
+
+def test_spans_are_aggregated_per_stage():
+    async def lookup(delay: float):
+        with span("geocode"):
+            await asyncio.sleep(delay)
+
+    async def run():
+        timings = start_timings()
+        # 並行タスクも呼び出し元の計測に記録される
+        await asyncio.gather(lookup(0.02), lookup(0.05))
+        timings.first_token()
+        timings.first_token()
+        return timings.summary()
+
+    summary = asyncio.run(run())
+
+    geocode = summary["stages"]["geocode"]
+    assert geocode["count"] == 2
+    assert 50 <= geocode["max_ms"] < geocode["total_ms"]
+    assert summary["time_to_first_token_ms"] <= summary["total_ms"]
+
+
+def test_span_outside_an_invocation_is_a_no_op():
+    async def run():
+        with span("geocode"):
+            pass
+        return current_timings()
+
+    assert asyncio.run(run()) is None